@@ -0,0 +1,268 @@
+import threading
+import time
+import wave
+
+import numpy as np
+
+SAMPLE_RATE = 16000  # what the Vosk recognizer is fed: 16 kHz mono int16
+RING_BUFFER_SECONDS = 30  # capture headroom before samples are dropped
+
+
+class AudioSource:
+    """A stream of 16 kHz mono int16 PCM for transcribe_audio_input().
+
+    Use as a context manager. read(frames) returns raw bytes and an empty
+    bytes object once the source is exhausted. Live sources (a microphone)
+    never run out, so their turns are ended by the candidate instead.
+    """
+
+    sample_rate = SAMPLE_RATE
+    live = False
+
+    def open(self):
+        pass
+
+    def close(self):
+        pass
+
+    def read(self, frames):
+        raise NotImplementedError
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, *_exc):
+        self.close()
+
+
+class RingBuffer:
+    """Preallocated buffer of int16 samples between a capture callback and a reader.
+
+    write() never blocks, so it is safe to call from a PortAudio callback: when
+    the reader falls behind and the buffer is full, the incoming samples that do
+    not fit are dropped and counted instead of overwriting unread audio.
+    """
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.overflows = 0  # writes that had to drop samples
+        self.dropped_frames = 0
+        self._samples = np.zeros(capacity, dtype=np.int16)
+        self._written = 0  # total samples ever written / read; positions are taken modulo capacity
+        self._read = 0
+        self._closed = False
+        self._cond = threading.Condition()
+
+    def __len__(self):
+        with self._cond:
+            return self._written - self._read
+
+    @property
+    def closed(self):
+        return self._closed
+
+    def write(self, data):
+        samples = np.frombuffer(data, dtype=np.int16)
+        with self._cond:
+            free = self.capacity - (self._written - self._read)
+            if len(samples) > free:
+                self.overflows += 1
+                self.dropped_frames += len(samples) - free
+                samples = samples[:free]
+            start = self._written % self.capacity
+            first = min(len(samples), self.capacity - start)
+            self._samples[start:start + first] = samples[:first]
+            self._samples[:len(samples) - first] = samples[first:]
+            self._written += len(samples)
+            self._cond.notify()
+
+    def read(self, frames, timeout=None):
+        """Returns up to frames samples as bytes, waiting until that many are buffered.
+
+        Returns fewer once the buffer is closed or the timeout expires, and an
+        empty bytes object once it is closed and drained.
+        """
+        with self._cond:
+            self._cond.wait_for(lambda: self._written - self._read >= frames or self._closed, timeout)
+            count = min(frames, self._written - self._read)
+            start = self._read % self.capacity
+            first = min(count, self.capacity - start)
+            data = self._samples[start:start + first].tobytes() + self._samples[:count - first].tobytes()
+            self._read += count
+            return data
+
+    def close(self):
+        """Marks the end of the stream; the reader drains what is left and stops."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+
+class RingBufferSource(AudioSource):
+    """A source whose samples are pushed into a ring buffer by a producer thread.
+
+    Capture runs independently of recognition: the producer (a device callback
+    or a file feeder) only copies samples into the buffer, and
+    transcribe_audio_input() consumes them at its own pace.
+    """
+
+    def __init__(self, buffer_seconds=RING_BUFFER_SECONDS):
+        self.ring = RingBuffer(int(buffer_seconds * self.sample_rate))
+        self.overflows = 0  # overflows reported by the producer itself (e.g. PortAudio)
+
+    @property
+    def dropped_frames(self):
+        return self.ring.dropped_frames
+
+    def read(self, frames):
+        while True:
+            data = self.ring.read(frames, timeout=0.5)
+            if data or self.ring.closed:
+                return data
+
+    def capture_stats(self):
+        return {
+            "overflows": self.overflows + self.ring.overflows,
+            "dropped_frames": self.ring.dropped_frames,
+            "dropped_seconds": self.ring.dropped_frames / self.sample_rate,
+        }
+
+    def report_capture_stats(self):
+        stats = self.capture_stats()
+        if stats["overflows"]:
+            print(f"Audio capture: {stats['overflows']} overflows, "
+                  f"{stats['dropped_frames']} frames ({stats['dropped_seconds']:.2f}s) dropped")
+
+
+class MicrophoneSource(RingBufferSource):
+    """The default input device, captured by a sounddevice callback into a ring buffer."""
+
+    live = True
+
+    def __init__(self, device=None, blocksize=2000, buffer_seconds=RING_BUFFER_SECONDS):
+        super().__init__(buffer_seconds)
+        self.device = device
+        self.blocksize = blocksize
+        self._stream = None
+
+    def _callback(self, indata, _frames, _time, status):
+        if status.input_overflow:
+            self.overflows += 1
+        self.ring.write(indata)
+
+    def open(self):
+        import sounddevice as sd
+
+        device = self.device
+        if device is None:
+            device = sd.query_devices(None, 'input')['index']
+        self._stream = sd.RawInputStream(samplerate=self.sample_rate, blocksize=self.blocksize,
+                                         device=device, dtype='int16', channels=1,
+                                         callback=self._callback)
+        self._stream.start()
+
+    def close(self):
+        if self._stream is not None:
+            self._stream.stop()
+            self._stream.close()
+            self._stream = None
+            self.ring.close()
+            self.report_capture_stats()
+
+
+def to_recognizer_pcm(samples, sample_rate, channels):
+    """Converts int16 samples of any rate/channel count to 16 kHz mono int16 bytes."""
+    samples = np.asarray(samples, dtype=np.int16)
+    if channels > 1:
+        samples = samples.reshape(-1, channels).mean(axis=1)
+    if sample_rate != SAMPLE_RATE and len(samples):
+        duration = len(samples) / sample_rate
+        target = np.arange(int(duration * SAMPLE_RATE)) / SAMPLE_RATE
+        samples = np.interp(target, np.arange(len(samples)) / sample_rate, samples)
+    return np.asarray(samples).astype(np.int16).tobytes()
+
+
+def read_wav_pcm(path):
+    """Reads a 16-bit WAV file as 16 kHz mono int16 bytes."""
+    with wave.open(path, "rb") as wav:
+        if wav.getsampwidth() != 2:
+            raise ValueError(f"{path}: only 16-bit PCM WAV files are supported")
+        frames = wav.readframes(wav.getnframes())
+        return to_recognizer_pcm(np.frombuffer(frames, dtype="<i2"), wav.getframerate(), wav.getnchannels())
+
+
+class WavFileSource(AudioSource):
+    """A recorded answer in a WAV file; the turn ends when the file does.
+
+    With realtime=True, reads are paced like a live microphone.
+    """
+
+    def __init__(self, path, realtime=False):
+        self.path = path
+        self.realtime = realtime
+        self._pcm = b""
+        self._offset = 0
+        self._started = None
+
+    def open(self):
+        self._pcm = read_wav_pcm(self.path)
+        self._offset = 0
+        self._started = time.perf_counter()
+
+    @property
+    def duration(self):
+        return len(self._pcm) / 2 / self.sample_rate
+
+    def read(self, frames):
+        chunk = self._pcm[self._offset:self._offset + frames * 2]
+        self._offset += len(chunk)
+        if self.realtime and chunk:
+            due = self._started + self._offset / 2 / self.sample_rate
+            delay = due - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+        return chunk
+
+
+class WavCaptureSource(RingBufferSource):
+    """Replays a WAV file through the ring buffer the way a device callback would.
+
+    A feeder thread writes blocksize frames every blocksize/sample_rate seconds
+    (divided by speed), so overflow and drop handling can be exercised without
+    a microphone: a recognizer slower than the feed shows up as dropped frames.
+    """
+
+    def __init__(self, path, blocksize=2000, speed=1.0, buffer_seconds=RING_BUFFER_SECONDS):
+        super().__init__(buffer_seconds)
+        self.path = path
+        self.blocksize = blocksize
+        self.speed = speed
+        self._stop = threading.Event()
+        self._feeder = None
+
+    def _feed(self, pcm):
+        block_bytes = self.blocksize * 2
+        interval = self.blocksize / self.sample_rate / self.speed
+        due = time.perf_counter()
+        for offset in range(0, len(pcm), block_bytes):
+            if self._stop.is_set():
+                break
+            self.ring.write(pcm[offset:offset + block_bytes])
+            due += interval
+            delay = due - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+        self.ring.close()
+
+    def open(self):
+        pcm = read_wav_pcm(self.path)
+        self._feeder = threading.Thread(target=self._feed, args=(pcm,), daemon=True)
+        self._feeder.start()
+
+    def close(self):
+        if self._feeder is not None:
+            self._stop.set()
+            self._feeder.join()
+            self._feeder = None
+            self.report_capture_stats()
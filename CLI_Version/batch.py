@@ -0,0 +1,166 @@
+"""Offline processing of recorded interviews.
+
+    python batch.py RECORDINGS_DIR [--out batch_output] [--workers N] [--force]
+
+RECORDINGS_DIR holds one folder per candidate with one WAV file per answer.
+Answers are matched to interview_questions in natural sort order
+(answer1.wav, answer2.wav, ...). Each candidate goes through STT, validation,
+summary and JSON extraction, and candidates are spread across a process pool.
+"""
+import argparse
+import json
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+
+from config import interview_questions, WRAP_UP_TIMEOUT, WRAP_UP_SINGLE_CALL, SESSION_DB_PATH
+from prompts import validation_chain, summary_chain, json_chain, wrap_up_chain
+from audio_source import WavFileSource
+from session_log import SessionLog, BOT, CANDIDATE
+from session_store import SessionStore
+from utils import (
+    transcribe_audio_input,
+    load_vosk_model,
+    wrap_up_interview,
+    write_json_output,
+)
+
+
+# Each worker process opens its own connection on first use
+session_store = SessionStore(SESSION_DB_PATH) if SESSION_DB_PATH else None
+
+
+def _natural_key(name):
+    return [int(part) if part.isdigit() else part.lower() for part in re.split(r"(\d+)", name)]
+
+
+def find_answer_files(candidate_dir):
+    names = [n for n in os.listdir(candidate_dir) if n.lower().endswith(".wav")]
+    return [os.path.join(candidate_dir, n) for n in sorted(names, key=_natural_key)]
+
+
+def find_candidates(recordings_dir):
+    candidates = []
+    for name in sorted(os.listdir(recordings_dir), key=_natural_key):
+        path = os.path.join(recordings_dir, name)
+        if os.path.isdir(path) and find_answer_files(path):
+            candidates.append(path)
+    return candidates
+
+
+def process_candidate(candidate_dir, out_dir):
+    """Runs one recorded interview through the pipeline and writes its outputs to out_dir."""
+    start = time.perf_counter()
+    started_at = datetime.now()
+    os.makedirs(out_dir, exist_ok=True)
+    answers = find_answer_files(candidate_dir)
+    if len(answers) > len(interview_questions):
+        print(f"{candidate_dir}: ignoring {len(answers) - len(interview_questions)} extra answer files")
+
+    user_responses = {}
+    validations = []
+    with SessionLog(os.path.join(out_dir, "interview_session.jsonl")) as session_log:
+        for question, answer_path in zip(interview_questions, answers):
+            session_log.write(question, speaker=BOT)
+            transcription = transcribe_audio_input(source=WavFileSource(answer_path))
+            session_log.write(transcription, speaker=CANDIDATE)
+            session_log.end_turn()
+
+            if transcription:
+                verdict = validation_chain.invoke(
+                    {"question": question, "answer": transcription}
+                )["text"].strip()
+            else:
+                verdict = "no response"
+            validations.append({
+                "question": question,
+                "file": os.path.basename(answer_path),
+                "valid": verdict.lower().startswith("yes"),
+                "feedback": verdict,
+            })
+            user_responses[question] = transcription
+
+        summary, structured_data, timings = wrap_up_interview(
+            user_responses,
+            summary_chain,
+            json_chain,
+            wrap_up_chain=wrap_up_chain if WRAP_UP_SINGLE_CALL else None,
+            timeout=WRAP_UP_TIMEOUT,
+        )
+        with open(os.path.join(out_dir, "interview_summary.txt"), "w", encoding="utf-8") as f:
+            f.write(summary)
+        write_json_output(structured_data, filename=os.path.join(out_dir, "interview_responses.json"))
+        write_json_output(validations, filename=os.path.join(out_dir, "validation.json"))
+
+        session_log.set_speaker_name(CANDIDATE, structured_data.get("Name") or "User")
+        session_log.export_csv(os.path.join(out_dir, "interview_session.csv"))
+        if session_store:
+            # Reprocessing a candidate replaces their earlier record
+            session_store.record(
+                f"batch-{os.path.basename(candidate_dir)}",
+                started_at=started_at,
+                profile=structured_data,
+                summary=summary,
+                answers=user_responses,
+                transcript=session_log.resolved_lines(),
+                source="batch",
+                output_dir=out_dir,
+            )
+
+    return {
+        "candidate": os.path.basename(candidate_dir),
+        "answers": len(validations),
+        "valid_answers": sum(v["valid"] for v in validations),
+        "seconds": time.perf_counter() - start,
+        "wrap_up_timings": timings,
+    }
+
+
+def _init_worker():
+    # Each worker process loads the model once and reuses it for all its candidates
+    load_vosk_model()
+
+
+def run_batch(recordings_dir, out_root, workers=None, force=False):
+    candidates = find_candidates(recordings_dir)
+    if not force:
+        candidates = [
+            c for c in candidates
+            if not os.path.exists(os.path.join(out_root, os.path.basename(c), "interview_responses.json"))
+        ]
+    print(f"Processing {len(candidates)} candidates with {workers or os.cpu_count()} workers")
+
+    os.makedirs(out_root, exist_ok=True)
+    start = time.perf_counter()
+    failures = 0
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool, \
+            open(os.path.join(out_root, "batch_results.jsonl"), "a", encoding="utf-8") as results:
+        futures = {
+            pool.submit(process_candidate, c, os.path.join(out_root, os.path.basename(c))): c
+            for c in candidates
+        }
+        for done, future in enumerate(as_completed(futures), 1):
+            candidate = os.path.basename(futures[future])
+            try:
+                result = future.result()
+                print(f"[{done}/{len(futures)}] {candidate}: {result['valid_answers']}/"
+                      f"{result['answers']} valid answers in {result['seconds']:.1f}s")
+            except Exception as e:
+                failures += 1
+                result = {"candidate": candidate, "error": str(e)}
+                print(f"[{done}/{len(futures)}] {candidate}: failed: {e}")
+            results.write(json.dumps(result, ensure_ascii=False) + "\n")
+            results.flush()
+    print(f"Done in {time.perf_counter() - start:.1f}s, {failures} failed")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Process recorded interviews from WAV files.")
+    parser.add_argument("recordings_dir", help="folder with one subfolder of answer WAVs per candidate")
+    parser.add_argument("--out", default="batch_output", help="where per-candidate results are written")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--force", action="store_true", help="reprocess candidates that already have results")
+    args = parser.parse_args()
+    run_batch(args.recordings_dir, args.out, workers=args.workers, force=args.force)
@@ -0,0 +1,409 @@
+"""Reproducible end-to-end latency benchmark for run_interview().
+
+    python benchmark.py ANSWERS_DIR [--runs 3] [--llm-latency 0.5] [--tts fake|gtts|espeak|config]
+                        [--compare-tts gtts espeak] [--capture] [--llm-server]
+                        [--out bench.json]
+
+Drives the real interview loop with recorded answers (ANSWERS_DIR holds WAV
+files played in natural sort order, one per turn), a deterministic fake chat
+model in place of Claude, and a null audio sink instead of speaker playback.
+STT runs on the real Vosk model. Time to first audio is measured for the
+TTS backend the run uses, and --compare-tts measures it for each listed
+backend on the interview's own lines. With --capture, answers are replayed through
+the callback ring buffer at speaking speed, as from a microphone. With --llm-server,
+the chains call a local stub of the Messages API (stub_llm_server.py) through the
+real client, so its timeouts, retries and connection reuse are part of the run.
+Both the fake model and the stub report token usage, which is summed per chain
+under llm_tokens.
+Results are written as JSON so runs can be compared across commits.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import time
+import zlib
+from datetime import datetime
+
+import numpy as np
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+from stub_llm_server import StubLLMServer, prompt_text, reply_for, usage_for
+
+# The benchmark must not hit caches left over from real interviews or earlier runs
+os.environ["LLM_CACHE_ENABLED"] = "0"
+
+
+class FakeChatModel(BaseChatModel):
+    """Deterministic stand-in for ChatAnthropic with configurable latency.
+
+    Replies are picked from the prompt so every chain gets a well-formed answer;
+    jitter is derived from a hash of the prompt, so runs are repeatable.
+    """
+
+    latency: float = 0.5
+    jitter: float = 0.0
+
+    @property
+    def _llm_type(self):
+        return "fake-benchmark"
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        prompt = prompt_text(None, [{"content": m.content} for m in messages])
+        spread = (zlib.crc32(prompt.encode("utf-8")) % 1000) / 1000 * 2 - 1
+        time.sleep(max(self.latency + self.jitter * spread, 0))
+        text = reply_for(prompt)
+        message = AIMessage(content=text, usage_metadata=usage_metadata(usage_for(prompt, text)))
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+
+def usage_metadata(usage):
+    """Anthropic usage as langchain_anthropic reports it; input_tokens includes cached tokens."""
+    cache_read = usage["cache_read_input_tokens"]
+    cache_creation = usage["cache_creation_input_tokens"]
+    input_tokens = usage["input_tokens"] + cache_read + cache_creation
+    return {
+        "input_tokens": input_tokens,
+        "output_tokens": usage["output_tokens"],
+        "total_tokens": input_tokens + usage["output_tokens"],
+        "input_token_details": {"cache_read": cache_read, "cache_creation": cache_creation},
+    }
+
+
+def percentiles(samples):
+    if not samples:
+        return {"count": 0}
+    ms = np.asarray(samples) * 1000
+    return {
+        "count": len(ms),
+        "mean_ms": float(ms.mean()),
+        "p50_ms": float(np.percentile(ms, 50)),
+        "p90_ms": float(np.percentile(ms, 90)),
+        "p95_ms": float(np.percentile(ms, 95)),
+        "p99_ms": float(np.percentile(ms, 99)),
+        "max_ms": float(ms.max()),
+    }
+
+
+def natural_key(path):
+    return [int(t) if t.isdigit() else t.lower() for t in re.split(r"(\d+)", os.path.basename(path))]
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "HEAD"], cwd=os.path.dirname(os.path.abspath(__file__)),
+            stderr=subprocess.DEVNULL, text=True,
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class Recorder:
+    """Collects stage durations and the candidate-to-bot response gap per turn."""
+
+    def __init__(self):
+        self.stages = {}
+        self.turn_gaps = []
+        self.stt_audio_seconds = 0.0
+        self.stt_decode_seconds = 0.0
+        self.capture_overflows = 0
+        self.capture_dropped_frames = 0
+        self._answer_ended = None
+        self._speak_started = None
+
+    def add(self, stage, seconds):
+        self.stages.setdefault(stage, []).append(seconds)
+
+    def timed(self, stage, fn):
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self.add(stage, time.perf_counter() - start)
+        return wrapper
+
+    def answer_ended(self):
+        self._answer_ended = time.perf_counter()
+
+    def speak_started(self):
+        self._speak_started = time.perf_counter()
+
+    def bot_started(self):
+        now = time.perf_counter()
+        if self._answer_ended is not None:
+            self.turn_gaps.append(now - self._answer_ended)
+            self._answer_ended = None
+        if self._speak_started is not None:
+            self.add("tts.time_to_first_audio", now - self._speak_started)
+            self._speak_started = None
+
+
+class FakeTTSBackend:
+    """Fixed-latency synthesis of silent PCM, so runs stay offline and repeatable."""
+
+    name = "fake"
+
+    def __init__(self, latency):
+        self.latency = latency
+
+    def available(self):
+        return True
+
+    def synthesize(self, text):
+        from tts_cache import CachedAudio
+
+        time.sleep(self.latency)
+        seconds = 0.3 * max(len(text.split()), 1)
+        return CachedAudio(b"\0\0" * int(24000 * seconds), 24000, 2, 1)
+
+
+def compare_tts_backends(names, texts):
+    """Time to first audio of each backend over texts, each synthesized once, uncached."""
+    from tts_backends import make_backend
+
+    results = {}
+    for name in names:
+        backend = make_backend(name)
+        if not backend.available():
+            results[name] = {"available": False}
+            continue
+        samples, errors = [], 0
+        for text in texts:
+            start = time.perf_counter()
+            try:
+                backend.synthesize(text)
+            except Exception:
+                errors += 1
+                continue
+            samples.append(time.perf_counter() - start)
+        results[name] = {"available": True, "errors": errors, "time_to_first_audio": percentiles(samples)}
+    return results
+
+
+class TimedChain:
+    def __init__(self, name, chain, recorder):
+        self.name = name
+        self.chain = chain
+        self.recorder = recorder
+
+    def invoke(self, inputs, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return self.chain.invoke(inputs, *args, **kwargs)
+        finally:
+            self.recorder.add(f"llm.{self.name}", time.perf_counter() - start)
+
+    def __getattr__(self, name):
+        return getattr(self.chain, name)
+
+
+def run_benchmark(answers_dir, runs=3, llm_latency=0.5, llm_jitter=0.1, tts="fake",
+                  tts_latency=0.3, realtime=False, capture=False, compare_tts=(), verbose=False,
+                  llm_server=False, llm_error_rate=0.0):
+    stub = None
+    if llm_server:
+        # The real client over HTTP: timeouts, retries and connection reuse are exercised
+        stub = StubLLMServer(latency=llm_latency, jitter=llm_jitter, error_rate=llm_error_rate, seed=0).start()
+        os.environ["ANTHROPIC_BASE_URL"] = stub.url
+        os.environ.setdefault("ANTHROPIC_API_KEY", "stub")
+    import config
+    if stub is None:
+        config.llm = FakeChatModel(latency=llm_latency, jitter=llm_jitter)
+
+    import main
+    import utils
+    from audio_source import WavFileSource, WavCaptureSource, AudioSource
+    from tts_cache import TTSCache
+    from tts_backends import TTSEngine, make_backend
+
+    answers = sorted(
+        (os.path.join(answers_dir, n) for n in os.listdir(answers_dir) if n.lower().endswith(".wav")),
+        key=natural_key,
+    )
+    if not answers:
+        raise SystemExit(f"No WAV files in {answers_dir}")
+
+    recorder = Recorder()
+    utils.load_vosk_model()
+    main.build_chains()  # the client's own setup is not part of any turn
+
+    # Null audio sink: playback costs nothing but marks when the bot starts speaking
+    def null_play(_audio):
+        recorder.bot_started()
+    utils.play = null_play
+
+    # TTS: one backend (or the configured fallback chain), timed per synthesis
+    if tts == "fake":
+        utils.tts_engine = TTSEngine([FakeTTSBackend(tts_latency)])
+    elif tts != "config":
+        utils.tts_engine = TTSEngine([make_backend(tts)])
+    for backend in utils.tts_engine.backends:
+        backend.synthesize = recorder.timed("tts.synthesis", backend.synthesize)
+
+    def timed_speak(fn):
+        def wrapper(*args, **kwargs):
+            recorder.speak_started()
+            return fn(*args, **kwargs)
+        return wrapper
+    main.speak_text_in_memory = timed_speak(main.speak_text_in_memory)
+    main.speak_text_streaming = timed_speak(main.speak_text_streaming)
+
+    # STT: replay the recorded answers in order; once they run out, silence ends the Q&A
+    class Silence(AudioSource):
+        def read(self, frames):
+            return b""
+
+    pending = []
+
+    def next_source():
+        if not pending:
+            return Silence()
+        if capture:
+            return WavCaptureSource(pending.pop(0))
+        return WavFileSource(pending.pop(0), realtime=realtime)
+    utils.audio_source_factory = next_source
+
+    original_transcribe = main.transcribe_audio_input
+
+    def timed_transcribe(*args, **kwargs):
+        source = utils.audio_source_factory()
+        start = time.perf_counter()
+        text = original_transcribe(*args, source=source, **kwargs)
+        elapsed = time.perf_counter() - start
+        recorder.add("stt.transcribe", elapsed)
+        if isinstance(source, WavFileSource):
+            recorder.stt_audio_seconds += source.duration
+            recorder.stt_decode_seconds += elapsed
+        elif isinstance(source, WavCaptureSource):
+            stats = source.capture_stats()
+            recorder.capture_overflows += stats["overflows"]
+            recorder.capture_dropped_frames += stats["dropped_frames"]
+        recorder.answer_ended()
+        return text
+    main.transcribe_audio_input = timed_transcribe
+
+    for name in ("validation_chain", "json_chain", "summary_chain", "wrap_up_chain",
+                 "qa_chain", "no_question_chain"):
+        setattr(main, name, TimedChain(name[:-len("_chain")], getattr(main, name), recorder))
+
+    workdir = tempfile.mkdtemp(prefix="hr-agent-bench-")
+    cwd = os.getcwd()
+    interview_seconds = []
+    os.chdir(workdir)
+    try:
+        for run in range(runs):
+            # Fresh in-memory TTS cache per run so synthesis is measured every time
+            main.tts_cache = utils.tts_cache = TTSCache(cache_dir=None)
+            pending[:] = answers
+            start = time.perf_counter()
+            output = contextlib.nullcontext() if verbose else contextlib.redirect_stdout(io.StringIO())
+            with output:
+                main.run_interview()
+            interview_seconds.append(time.perf_counter() - start)
+            print(f"run {run + 1}/{runs}: {interview_seconds[-1]:.2f}s", file=sys.stderr)
+    finally:
+        os.chdir(cwd)
+        if stub is not None:
+            stub.close()
+
+    tts_lines = list(main.interview_questions) + [
+        main.GREETING, main.NO_RESPONSE_PROMPT, main.VALIDATION_FAILED_PROMPT, main.QA_PROMPT,
+        main.NO_INFO_RESPONSE, main.CLOSING_LINE,
+    ]
+    stt = recorder.stages.get("stt.transcribe", [])
+    return {
+        "commit": git_commit(),
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "config": {
+            "answers": len(answers),
+            "runs": runs,
+            "llm_latency": llm_latency,
+            "llm_jitter": llm_jitter,
+            "tts": tts,
+            "tts_latency": tts_latency if tts == "fake" else None,
+            "realtime_audio": realtime,
+            "capture": capture,
+            "llm_server": llm_server,
+            "llm_error_rate": llm_error_rate if llm_server else None,
+        },
+        "interview": percentiles(interview_seconds),
+        "turn_gap": percentiles(recorder.turn_gaps),
+        "stages": {stage: percentiles(samples) for stage, samples in sorted(recorder.stages.items())},
+        "stt": {
+            "audio_seconds": recorder.stt_audio_seconds,
+            "decode_seconds": recorder.stt_decode_seconds,
+            "real_time_factor": (recorder.stt_decode_seconds / recorder.stt_audio_seconds
+                                 if recorder.stt_audio_seconds else None),
+            "turns": len(stt),
+            "capture_overflows": recorder.capture_overflows,
+            "capture_dropped_frames": recorder.capture_dropped_frames,
+        },
+        "tts": {
+            "backend": tts,
+            "synthesis": percentiles(recorder.stages.get("tts.synthesis", [])),
+            "time_to_first_audio": percentiles(recorder.stages.get("tts.time_to_first_audio", [])),
+        },
+        "tts_backends": compare_tts_backends(compare_tts, tts_lines),
+        "llm_client": main.llm_client.stats(),
+        "llm_server": stub.stats() if stub is not None else None,
+        "llm_tokens": llm_token_report(main.token_usage),
+    }
+
+
+
+def llm_token_report(usage):
+    """Token counts per chain over all runs, with the estimated cost."""
+    stats = usage.stats()
+    total = {field: sum(c[field] for c in stats.values()) for field in
+             ("calls", "input_tokens", "cache_read_tokens", "cache_creation_tokens", "output_tokens")}
+    cost = usage.cost(total) if stats else {"total": 0.0, "cache_write": 0.0, "saved": 0.0}
+    return {
+        "chains": {chain: dict(c, mean_seconds=c["seconds"] / c["calls"]) for chain, c in sorted(stats.items())},
+        "total": total,
+        "cached_input_share": total["cache_read_tokens"] / total["input_tokens"] if total["input_tokens"] else 0.0,
+        "estimated_cost_usd": cost["total"],
+        "estimated_cache_write_usd": cost["cache_write"],
+        "estimated_saved_by_caching_usd": cost["saved"],
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark run_interview() with stubbed LLM and audio.")
+    parser.add_argument("answers_dir", help="folder of answer WAV files, one per turn")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--llm-latency", type=float, default=0.5, help="seconds per fake LLM call")
+    parser.add_argument("--llm-jitter", type=float, default=0.1, help="+/- seconds of deterministic jitter")
+    parser.add_argument("--llm-server", action="store_true",
+                        help="call a local stub of the Messages API through the real client instead of a fake model")
+    parser.add_argument("--llm-error-rate", type=float, default=0.0,
+                        help="share of stub server requests that fail with 529/500/429")
+    parser.add_argument("--tts", choices=["fake", "gtts", "espeak", "config"], default="fake",
+                        help="TTS backend for the runs; config uses TTS_BACKENDS with fallback")
+    parser.add_argument("--compare-tts", nargs="*", default=[], choices=["gtts", "espeak"],
+                        help="also measure time to first audio of these backends")
+    parser.add_argument("--tts-latency", type=float, default=0.3, help="seconds per fake synthesis")
+    parser.add_argument("--realtime", action="store_true", help="feed answers at speaking speed")
+    parser.add_argument("--capture", action="store_true",
+                        help="feed answers through the capture ring buffer at speaking speed")
+    parser.add_argument("--verbose", action="store_true", help="show the interview's own output")
+    parser.add_argument("--out", default="bench_output.json")
+    args = parser.parse_args()
+
+    report = run_benchmark(
+        args.answers_dir, runs=args.runs, llm_latency=args.llm_latency, llm_jitter=args.llm_jitter,
+        tts=args.tts, tts_latency=args.tts_latency, realtime=args.realtime, capture=args.capture,
+        compare_tts=args.compare_tts, verbose=args.verbose, llm_server=args.llm_server,
+        llm_error_rate=args.llm_error_rate,
+    )
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(json.dumps({k: report[k] for k in ("interview", "turn_gap", "stt", "tts_backends", "llm_client", "llm_server", "llm_tokens")}, indent=2))
+    print(f"Full report written to {args.out}")
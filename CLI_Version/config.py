@@ -1,22 +1,54 @@
 # config.py
 import os
+import threading
 from dotenv import load_dotenv
-from langchain_anthropic import ChatAnthropic
 
 # Load environment variables from .env file
 load_dotenv()
 ANTHROPIC_API_KEY = os.getenv("ANTHROPIC_API_KEY")
 
-llm = None
-if ANTHROPIC_API_KEY:
-    print("Using Claude (Anthropic API)")
-    llm = ChatAnthropic(
-        model="claude-sonnet-4-20250514",
-        temperature=0,
-        anthropic_api_key=ANTHROPIC_API_KEY,
-    )
-else:
-    print("ANTHROPIC_API_KEY not found. LLM functionality will be disabled.")
+_llm_lock = threading.Lock()
+
+
+def get_llm():
+    """The shared chat model, or None without an API key.
+
+    Created on first use: importing langchain_anthropic alone takes about a
+    second. Assigning config.llm beforehand (as the benchmark does) replaces it.
+    """
+    with _llm_lock:
+        if "llm" not in globals():
+            llm = None
+            if ANTHROPIC_API_KEY:
+                from langchain_anthropic import ChatAnthropic
+
+                print("Using Claude (Anthropic API)")
+                # One client for every chain: its HTTP connections are pooled and
+                # kept alive. Retries are left to llm_client.LLMClient.
+                llm = ChatAnthropic(
+                    model="claude-sonnet-4-20250514",
+                    temperature=0,
+                    anthropic_api_key=ANTHROPIC_API_KEY,
+                    default_request_timeout=LLM_TIMEOUT,
+                    max_retries=0,
+                    **({"anthropic_api_url": LLM_BASE_URL} if LLM_BASE_URL else {}),
+                )
+            else:
+                print("ANTHROPIC_API_KEY not found. LLM functionality will be disabled.")
+            globals()["llm"] = llm
+        return globals()["llm"]
+
+
+def __getattr__(name):
+    # `config.llm` and `from config import llm` still work; they create the model
+    if name == "llm":
+        return get_llm()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+# Preload the speech model, LLM client and chains, FAQ index and fixed speech in
+# a background thread at startup instead of on first use
+WARM_UP = os.getenv("WARM_UP", "1") == "1"
 
 # Interview questions
 interview_questions = [
@@ -27,5 +59,93 @@ interview_questions = [
     "Are you ready to start immediately? If not, when?",
 ]
 
+# Text-to-speech backends in order of preference: "gtts" (Google, needs network)
+# and "espeak" (espeak-ng, local). A backend that errors or takes longer than
+# TTS_TIMEOUT seconds is skipped for TTS_RETRY_AFTER seconds in favour of the next.
+TTS_BACKENDS = [name.strip() for name in os.getenv("TTS_BACKENDS", "gtts,espeak").split(",") if name.strip()]
+TTS_TIMEOUT = float(os.getenv("TTS_TIMEOUT", "4"))
+TTS_RETRY_AFTER = float(os.getenv("TTS_RETRY_AFTER", "60"))
+TTS_LANG = "en"
+TTS_TLD = "co.uk"
+ESPEAK_VOICE = os.getenv("ESPEAK_VOICE", "en-gb")
+
 # FAQ document placeholder
-FAQ_DOCUMENT = None
\ No newline at end of file
+FAQ_DOCUMENT = None
+
+# FAQ files (.md/.txt/.csv) indexed for retrieval; only the top-k passages go into qa_prompt
+# (by default next to this file, whatever the working directory)
+_HERE = os.path.dirname(os.path.abspath(__file__))
+FAQ_DIR = os.getenv("FAQ_DIR", os.path.join(_HERE, "faq"))
+FAQ_INDEX_PATH = os.getenv("FAQ_INDEX_PATH", os.path.join(_HERE, ".faq_index"))
+FAQ_TOP_K = int(os.getenv("FAQ_TOP_K", "3"))
+
+# End each answer automatically once the candidate stops talking: seconds of
+# trailing silence, the longest answer allowed, and how long to wait for a
+# candidate who says nothing. Enter / End Turn still end a turn by hand.
+ENDPOINTING = os.getenv("ENDPOINTING", "1") == "1"
+ENDPOINT_TRAILING_SILENCE = float(os.getenv("ENDPOINT_TRAILING_SILENCE", "1.2"))
+ENDPOINT_MAX_ANSWER_SECONDS = float(os.getenv("ENDPOINT_MAX_ANSWER_SECONDS", "120"))
+ENDPOINT_NO_INPUT_TIMEOUT = float(os.getenv("ENDPOINT_NO_INPUT_TIMEOUT", "15"))
+
+# Validate the answer-so-far while the candidate is still speaking and reuse the
+# verdict when the final transcript is at least this similar to it
+SPECULATIVE_VALIDATION = os.getenv("SPECULATIVE_VALIDATION", "1") == "1"
+SPECULATIVE_MIN_SIMILARITY = 0.9
+
+# When the validation LLM call fails: ask the candidate to answer again (0) or
+# accept the answer unchecked (1), marked as such in the session log and store
+VALIDATION_FAILURE_ACCEPTS = os.getenv("VALIDATION_FAILURE_ACCEPTS", "0") == "1"
+
+# Generate the Q&A answer while the LLM decides whether the reply is a question
+# at all; faster, but the answer call is billed even when it is then dropped
+SPECULATIVE_QA_ANSWER = os.getenv("SPECULATIVE_QA_ANSWER", "0") == "1"
+
+# End-of-interview summary/JSON generation: seconds before giving up, and whether
+# to ask for both in a single LLM call instead of two parallel ones
+WRAP_UP_TIMEOUT = float(os.getenv("WRAP_UP_TIMEOUT", "60"))
+WRAP_UP_SINGLE_CALL = os.getenv("WRAP_UP_SINGLE_CALL", "0") == "1"
+
+# Answer "any questions?" replies locally when confident; otherwise ask no_question_chain
+INTENT_FAST_PATH = os.getenv("INTENT_FAST_PATH", "1") == "1"
+INTENT_CONFIDENCE_THRESHOLD = 0.9
+
+# Cache of LLM responses (all chains run at temperature 0); list chain names in
+# LLM_CACHE_DISABLED_CHAINS (comma-separated, e.g. "validation,qa") to bypass it
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "1") == "1"
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", "llm_cache.sqlite3")
+LLM_CACHE_TTL = float(os.getenv("LLM_CACHE_TTL", str(7 * 24 * 3600)))
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "5000"))
+LLM_CACHE_DISABLED_CHAINS = {
+    name.strip() for name in os.getenv("LLM_CACHE_DISABLED_CHAINS", "").split(",") if name.strip()
+}
+
+# Anthropic API endpoint; point it at stub_llm_server.py to test without the real service
+LLM_BASE_URL = os.getenv("ANTHROPIC_BASE_URL")
+# Requests in flight at once across all interviews, seconds per attempt (default
+# and per chain, e.g. "validation=10,qa=15"), retries after a timeout, connection
+# error, 429 or 5xx, and seconds the bot may spend on LLM calls once an answer ends
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))
+LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", "30"))
+LLM_CHAIN_TIMEOUTS = {
+    "validation": 10.0, "no_question": 8.0, "qa": 15.0,
+    **{
+        name.strip(): float(seconds)
+        for name, _, seconds in (
+            item.partition("=") for item in os.getenv("LLM_CHAIN_TIMEOUTS", "").split(",") if "=" in item
+        )
+    },
+}
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "2"))
+LLM_TURN_BUDGET = float(os.getenv("LLM_TURN_BUDGET", "20")) or None
+
+# Prices (USD per million tokens) estimate each interview's cost. Cache prices
+# apply only to tokens the API reports as read from or written to its prompt
+# cache; the prompts carry no cache markers, as none of them is as long as the
+# shortest prefix the API caches (1024 tokens for Sonnet).
+LLM_PRICES = {"input": 3.0, "cache_creation": 3.75, "cache_read": 0.30, "output": 15.0}
+
+# Each interview's files go to a folder of its own under SESSION_OUTPUT_DIR, and
+# every finished interview is recorded in the SQLite database at SESSION_DB_PATH
+# (empty to disable); see session_store.py to look up or export candidates
+SESSION_OUTPUT_DIR = os.getenv("SESSION_OUTPUT_DIR", "sessions")
+SESSION_DB_PATH = os.getenv("SESSION_DB_PATH", os.path.join(SESSION_OUTPUT_DIR, "interviews.sqlite3"))
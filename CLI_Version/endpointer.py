@@ -0,0 +1,101 @@
+import numpy as np
+
+FRAME_SECONDS = 0.02
+
+
+class Endpointer:
+    """Decides when the candidate has finished answering, from the audio itself.
+
+    Each 20 ms frame is classified as speech or silence from its energy
+    relative to an adaptive noise floor, with the zero-crossing rate catching
+    quiet unvoiced sounds (s, f, th) that energy alone misses. The floor starts
+    at the quietest frame of the first calibration_seconds, and never rises
+    above max_noise_floor_db, so an answer that starts at once (or a click on
+    the first frame) is not learnt as background noise. The turn ends
+    once trailing_silence seconds of silence follow speech and the recognizer
+    has finalized a segment since, so a mid-sentence pause the recognizer
+    still considers open does not cut the answer short. Silence twice that
+    long ends the turn regardless. The turn also ends after max_answer seconds
+    in total, or after no_input_timeout seconds without any speech.
+
+    All timing is counted in samples, so recorded audio is endpointed exactly
+    like a live microphone.
+    """
+
+    def __init__(self, sample_rate=16000, trailing_silence=1.2, max_answer=120.0,
+                 no_input_timeout=10.0, speech_margin_db=12.0, min_speech=0.3,
+                 calibration_seconds=0.2, max_noise_floor_db=-40.0):
+        self.sample_rate = sample_rate
+        self.frame_samples = int(sample_rate * FRAME_SECONDS)
+        self.trailing_silence = trailing_silence
+        self.max_answer = max_answer
+        self.no_input_timeout = no_input_timeout
+        self.speech_margin_db = speech_margin_db
+        self.min_speech = min_speech
+        self.max_noise_floor_db = max_noise_floor_db
+
+        self.noise_floor_db = None
+        self._calibration_frames = max(int(round(calibration_seconds / FRAME_SECONDS)), 1)
+        self.elapsed = 0.0  # seconds of audio seen
+        self.speech_seconds = 0.0
+        self.silence_seconds = 0.0  # since the last speech frame
+        self.final_since_speech = False
+        self._pending = np.zeros(0, dtype=np.int16)
+
+    def _frame_features(self, frames):
+        samples = frames.astype(np.float32) / 32768.0
+        rms = np.sqrt(np.mean(samples ** 2, axis=1))
+        energy_db = 20 * np.log10(np.maximum(rms, 1e-5))
+        signs = np.signbit(frames)
+        zcr = np.mean(signs[:, 1:] != signs[:, :-1], axis=1)
+        return energy_db, zcr
+
+    def _is_speech(self, energy_db, zcr):
+        calibrating = self._calibration_frames > 0
+        if calibrating:
+            self._calibration_frames -= 1
+            floor = energy_db if self.noise_floor_db is None else min(self.noise_floor_db, energy_db)
+            self.noise_floor_db = min(floor, self.max_noise_floor_db)
+        above_floor = energy_db - self.noise_floor_db
+        speech = above_floor > self.speech_margin_db or (
+            above_floor > self.speech_margin_db / 2 and zcr > 0.3
+        )
+        if not speech and not calibrating:
+            # Follow the floor down quickly and up slowly, so speech is not learnt as noise
+            rate = 0.2 if energy_db < self.noise_floor_db else 0.02
+            floor = self.noise_floor_db + rate * (energy_db - self.noise_floor_db)
+            self.noise_floor_db = min(floor, self.max_noise_floor_db)
+        return speech
+
+    def update(self, pcm, final=False):
+        """Feeds one block of int16 PCM; returns why the turn ended, or None.
+
+        final is True when the recognizer finalized a non-empty segment on this block.
+        """
+        samples = np.concatenate([self._pending, np.frombuffer(pcm, dtype=np.int16)])
+        usable = len(samples) - len(samples) % self.frame_samples
+        self._pending = samples[usable:]
+        if usable:
+            frames = samples[:usable].reshape(-1, self.frame_samples)
+            for energy_db, zcr in zip(*self._frame_features(frames)):
+                self.elapsed += FRAME_SECONDS
+                if self._is_speech(energy_db, zcr):
+                    self.speech_seconds += FRAME_SECONDS
+                    self.silence_seconds = 0.0
+                    self.final_since_speech = False
+                else:
+                    self.silence_seconds += FRAME_SECONDS
+        if final:
+            self.final_since_speech = True
+        return self.reason()
+
+    def reason(self):
+        if self.elapsed >= self.max_answer:
+            return "max answer length"
+        if self.speech_seconds < self.min_speech:
+            return "no input" if self.elapsed >= self.no_input_timeout else None
+        if self.silence_seconds >= 2 * self.trailing_silence:
+            return "silence"
+        if self.silence_seconds >= self.trailing_silence and self.final_since_speech:
+            return "silence"
+        return None
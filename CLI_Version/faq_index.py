@@ -0,0 +1,292 @@
+import csv
+import hashlib
+import io
+import json
+import os
+import re
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+FAQ_EXTENSIONS = (".md", ".markdown", ".txt", ".csv")
+
+_STOPWORDS = {
+    "a", "an", "the", "and", "or", "of", "to", "in", "on", "for", "is", "are", "was",
+    "be", "it", "this", "that", "with", "as", "at", "by", "i", "you", "we", "my",
+    "your", "our", "do", "does", "can", "will", "me", "there", "any", "about",
+}
+
+
+def tokenize(text):
+    return [t for t in re.findall(r"[a-z0-9']+", text.lower()) if t not in _STOPWORDS]
+
+
+def _file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 16), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def chunk_text(text, chunk_words=120, overlap_words=30):
+    """Splits Markdown/plain text into passages of roughly chunk_words words.
+
+    Paragraphs are kept together where possible, each passage carries the
+    heading it falls under, and oversized paragraphs are windowed with overlap.
+    """
+    passages = []
+    heading = ""
+    current = []
+
+    def flush():
+        if current:
+            body = " ".join(current)
+            passages.append(f"{heading}\n{body}" if heading else body)
+            current.clear()
+
+    for block in re.split(r"\n\s*\n", text):
+        block = block.strip()
+        if not block:
+            continue
+        if block.startswith("#"):
+            flush()
+            lines = block.splitlines()
+            heading = lines[0].lstrip("#").strip()
+            block = " ".join(lines[1:]).strip()
+            if not block:
+                continue
+        words = block.split()
+        if len(words) > chunk_words:
+            flush()
+            step = max(chunk_words - overlap_words, 1)
+            for start in range(0, len(words), step):
+                current.extend(words[start:start + chunk_words])
+                flush()
+                if start + chunk_words >= len(words):
+                    break
+            continue
+        if sum(len(p.split()) for p in current) + len(words) > chunk_words:
+            flush()
+        current.append(" ".join(words))
+    flush()
+    return passages
+
+
+def chunk_csv(text):
+    """One passage per row, written as "column: value" pairs."""
+    reader = csv.DictReader(io.StringIO(text))
+    passages = []
+    for row in reader:
+        fields = [f"{k}: {v.strip()}" for k, v in row.items() if k and v and v.strip()]
+        if fields:
+            passages.append("\n".join(fields))
+    return passages
+
+
+class FAQIndex:
+    """BM25 index over FAQ files, persisted and refreshed incrementally.
+
+    Only passages relevant to a question are sent to qa_chain instead of the
+    whole FAQ. refresh() re-chunks just the files whose size, mtime or content
+    changed; the BM25 weights themselves are cheap to rebuild from the stored
+    tokens.
+    """
+
+    def __init__(self, faq_dir, index_path, chunk_words=120, overlap_words=30, k1=1.5, b=0.75):
+        self.faq_dir = faq_dir
+        self.index_path = index_path
+        self.chunk_words = chunk_words
+        self.overlap_words = overlap_words
+        self.k1 = k1
+        self.b = b
+        self._files = {}  # path -> {"mtime", "size", "sha256", "passages", "tokens"}
+        self._index = None  # (weights csc matrix, vocabulary, passages)
+        self._refresh_lock = threading.Lock()
+        self._latencies = deque(maxlen=1000)
+        self._queries = 0
+        self._stats_lock = threading.Lock()
+        self._loaded = False  # the persisted index (and scipy) are loaded on first use
+
+    # Building
+    def _faq_files(self):
+        if not self.faq_dir or not os.path.isdir(self.faq_dir):
+            return []
+        paths = []
+        for root, _dirs, files in os.walk(self.faq_dir):
+            for name in sorted(files):
+                if name.lower().endswith(FAQ_EXTENSIONS):
+                    paths.append(os.path.join(root, name))
+        return sorted(paths)
+
+    def _chunk_file(self, path):
+        with open(path, encoding="utf-8") as f:
+            text = f.read()
+        if path.lower().endswith(".csv"):
+            return chunk_csv(text)
+        return chunk_text(text, self.chunk_words, self.overlap_words)
+
+    def refresh(self):
+        """Re-indexes added, changed and removed FAQ files. Returns True if anything changed."""
+        with self._refresh_lock:
+            self._ensure_loaded()
+            changed = False
+            files = {}
+            for path in self._faq_files():
+                st = os.stat(path)
+                entry = self._files.get(path)
+                if entry and entry["mtime"] == st.st_mtime and entry["size"] == st.st_size:
+                    files[path] = entry
+                    continue
+                sha256 = _file_sha256(path)
+                if entry and entry["sha256"] == sha256:
+                    entry.update(mtime=st.st_mtime, size=st.st_size)
+                    files[path] = entry
+                    continue
+                passages = self._chunk_file(path)
+                files[path] = {
+                    "mtime": st.st_mtime,
+                    "size": st.st_size,
+                    "sha256": sha256,
+                    "passages": passages,
+                    "tokens": [tokenize(p) for p in passages],
+                }
+                changed = True
+            if set(files) != set(self._files):
+                changed = True
+            self._files = files
+            if changed or self._index is None:
+                self._build()
+                self._save()
+            return changed
+
+    def _build(self):
+        vocabulary = {}
+        rows, cols, counts, passages, lengths = [], [], [], [], []
+        for path, entry in self._files.items():
+            for passage, tokens in zip(entry["passages"], entry["tokens"]):
+                doc = len(passages)
+                passages.append({"source": os.path.relpath(path, self.faq_dir), "text": passage})
+                lengths.append(len(tokens))
+                term_counts = {}
+                for token in tokens:
+                    term = vocabulary.setdefault(token, len(vocabulary))
+                    term_counts[term] = term_counts.get(term, 0) + 1
+                rows.extend([doc] * len(term_counts))
+                cols.extend(term_counts.keys())
+                counts.extend(term_counts.values())
+
+        from scipy import sparse
+
+        n_docs, n_terms = len(passages), len(vocabulary)
+        tf = sparse.csr_matrix(
+            (np.asarray(counts, dtype=np.float32), (rows, cols)), shape=(n_docs, n_terms)
+        )
+        if n_docs:
+            lengths = np.asarray(lengths, dtype=np.float32)
+            avg_length = max(lengths.mean(), 1.0)
+            df = np.bincount(tf.indices, minlength=n_terms)
+            idf = np.log(1.0 + (n_docs - df + 0.5) / (df + 0.5)).astype(np.float32)
+            # BM25 term weight for every non-zero (doc, term) entry
+            norm = self.k1 * (1 - self.b + self.b * lengths / avg_length)
+            doc_of_entry = np.repeat(np.arange(n_docs), np.diff(tf.indptr))
+            tf.data = idf[tf.indices] * tf.data * (self.k1 + 1) / (tf.data + norm[doc_of_entry])
+        self._index = (tf.tocsc(), vocabulary, passages)
+
+    # Persistence
+    def _ensure_loaded(self):
+        if not self._loaded:
+            self._loaded = True
+            self._load()
+
+    def _save(self):
+        if not self.index_path:
+            return
+        from scipy import sparse
+
+        os.makedirs(self.index_path, exist_ok=True)
+        weights, vocabulary, _passages = self._index
+        sparse.save_npz(os.path.join(self.index_path, "weights.npz"), weights)
+        tmp_path = os.path.join(self.index_path, "files.json.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"faq_dir": self.faq_dir, "files": self._files, "vocabulary": vocabulary}, f)
+        os.replace(tmp_path, os.path.join(self.index_path, "files.json"))
+
+    def _load(self):
+        if not self.index_path:
+            return
+        from scipy import sparse
+
+        try:
+            with open(os.path.join(self.index_path, "files.json"), encoding="utf-8") as f:
+                data = json.load(f)
+            weights = sparse.load_npz(os.path.join(self.index_path, "weights.npz")).tocsc()
+        except (OSError, ValueError) as e:
+            if not isinstance(e, FileNotFoundError):
+                print(f"Ignoring unreadable FAQ index: {e}")
+            return
+        if data.get("faq_dir") != self.faq_dir:
+            return
+        self._files = data["files"]
+        passages = [
+            {"source": os.path.relpath(path, self.faq_dir), "text": passage}
+            for path, entry in self._files.items()
+            for passage in entry["passages"]
+        ]
+        self._index = (weights, data["vocabulary"], passages)
+
+    # Querying
+    def search(self, query, k=3):
+        """Returns up to k (score, passage) pairs, best first; passages that share no terms are skipped."""
+        if not self._loaded:
+            with self._refresh_lock:
+                self._ensure_loaded()
+        start = time.perf_counter()
+        results = []
+        if self._index is not None:
+            weights, vocabulary, passages = self._index
+            terms = [vocabulary[t] for t in tokenize(query) if t in vocabulary]
+            if terms and passages:
+                scores = np.asarray(weights[:, terms].sum(axis=1)).ravel()
+                k = min(k, len(scores))
+                top = np.argpartition(-scores, k - 1)[:k]
+                top = top[np.argsort(-scores[top])]
+                results = [(float(scores[i]), passages[i]) for i in top if scores[i] > 0]
+        with self._stats_lock:
+            self._latencies.append(time.perf_counter() - start)
+            self._queries += 1
+        return results
+
+    def context_for(self, question, k=3):
+        """Joins the top-k passages for question into a prompt-ready string."""
+        return "\n\n".join(
+            f"[{passage['source']}]\n{passage['text']}" for _score, passage in self.search(question, k)
+        )
+
+    def __len__(self):
+        return len(self._index[2]) if self._index else 0
+
+    def stats(self, since=None):
+        """Top-k retrieval latency in milliseconds over recent queries.
+
+        With since (an earlier stats() result), only the queries made after it
+        count; latencies are kept for the last 1000 queries.
+        """
+        with self._stats_lock:
+            queries = self._queries
+            latencies = list(self._latencies)
+        if since:
+            queries -= since.get("queries", 0)
+            latencies = latencies[len(latencies) - min(queries, len(latencies)):]
+        latencies = np.asarray(latencies) * 1000
+        if not len(latencies):
+            return {"passages": len(self), "queries": queries}
+        return {
+            "passages": len(self),
+            "queries": queries,
+            "last_ms": float(latencies[-1]),
+            "p50_ms": float(np.percentile(latencies, 50)),
+            "p95_ms": float(np.percentile(latencies, 95)),
+        }
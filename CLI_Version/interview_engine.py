@@ -0,0 +1,327 @@
+"""Runs one interview as an asyncio coroutine.
+
+The interview moves through the same stages as before (question, answer
+validation, Q&A, wrap-up), but work that does not depend on the candidate is
+started as early as possible instead of strictly in turn:
+
+- every fixed line (greeting, questions, prompts) is synthesized in the
+  background in the order it will be spoken, so the next question's audio is
+  ready while the current answer is still being validated;
+- the FAQ index is refreshed while the questions are asked;
+- when a Q&A reply needs the LLM to tell whether it is a question, the FAQ
+  passages for it are looked up meanwhile; with speculative_answer the answer
+  itself is generated at the same time too, and dropped if it turns out not to
+  be a question (a call already sent by then is still billed);
+- the closing line plays while the summary is generated.
+
+Blocking stages (playback, transcription, LLM calls) run in worker threads
+through asyncio.to_thread, which carries the caller's contextvars along, so
+timing spans and per-session state work as they do in a plain thread. The
+checkpoint runs before each of them, so an ended session starts no more
+speech, transcription or LLM calls, and its background work is dropped.
+"""
+import asyncio
+import threading
+
+import metrics
+from session_log import BOT, CANDIDATE
+
+MAX_VALIDATION_ATTEMPTS = 4
+TTS_PREFETCH_CONCURRENCY = 2
+
+
+def _no_checkpoint():
+    pass
+
+
+class InterviewEngine:
+    """State machine for one interview.
+
+    The speak, transcribe and chain callables are the ones main.py uses, passed
+    in when the interview starts so wrappers installed on main (UI events,
+    the benchmark's timers) apply.
+    """
+
+    def __init__(self, session_log, questions, lines, *, speak, speak_streaming, synthesize,
+                 transcribe, new_endpointer, validation_chain, qa_chain, no_question_chain,
+                 faq_index, faq_document="", faq_top_k=3, intent_classifier=None,
+                 new_speculation=None, llm_client=None, checkpoint=None,
+                 speculative_answer=False, accept_on_validation_error=False):
+        self.session_log = session_log
+        self.questions = list(questions)
+        self.lines = lines  # greeting, no_response, qa_prompt, no_info, closing
+        self.speak = speak
+        self.speak_streaming = speak_streaming
+        self.synthesize = synthesize
+        self.transcribe = transcribe
+        self.new_endpointer = new_endpointer
+        self.validation_chain = validation_chain
+        self.qa_chain = qa_chain
+        self.no_question_chain = no_question_chain
+        self.faq_index = faq_index
+        self.faq_document = faq_document
+        self.faq_top_k = faq_top_k
+        self.intent_classifier = intent_classifier
+        self.new_speculation = new_speculation
+        self.llm_client = llm_client  # its turn budget starts when an answer ends
+        self.checkpoint = checkpoint or _no_checkpoint
+        self.speculative_answer = speculative_answer
+        # When the validation call fails: ask again, or accept the answer marked as unchecked
+        self.accept_on_validation_error = accept_on_validation_error
+        self.state = "idle"  # idle -> greeting -> question -> listening -> validating -> ... -> qa -> closing -> done
+        self.user_responses = {}
+        self._prefetched = {}
+
+    # Speech
+
+    def _synthesize_quietly(self, text):
+        try:
+            self.synthesize(text)
+        except Exception as e:
+            print(f"TTS prefetch failed for {text!r}: {e}")
+
+    def _cancelled(self):
+        try:
+            self.checkpoint()
+        except Exception:
+            return True
+        return False
+
+    async def _to_thread(self, fn, *args, **kwargs):
+        """asyncio.to_thread, unless the session has ended (then checkpoint raises)."""
+        self.checkpoint()
+        return await asyncio.to_thread(fn, *args, **kwargs)
+
+    def _prefetch(self, texts):
+        """Starts synthesizing texts in order, a few at a time, into the TTS cache."""
+        limit = asyncio.Semaphore(TTS_PREFETCH_CONCURRENCY)
+
+        async def prefetch(text):
+            async with limit:
+                if not self._cancelled():
+                    await asyncio.to_thread(self._synthesize_quietly, text)
+
+        for text in texts:
+            if text not in self._prefetched:
+                self._prefetched[text] = asyncio.create_task(prefetch(text))
+
+    async def _speak(self, text):
+        # Waiting for a pending prefetch avoids synthesizing the same line twice
+        pending = self._prefetched.pop(text, None)
+        if pending is not None:
+            await pending
+        await self._to_thread(self.speak, text)
+
+    async def _speak_streaming(self, text):
+        await self._to_thread(self.speak_streaming, text)
+
+    async def _listen(self, on_segment=None):
+        self.state = "listening"
+        metrics.next_turn()
+        kwargs = {"endpointer": self.new_endpointer()}
+        if on_segment is not None:
+            kwargs["on_segment"] = on_segment
+        if self.llm_client:
+            # Speculative calls made while the candidate speaks are not on the clock
+            self.llm_client.clear_turn()
+        text = await self._to_thread(self.transcribe, **kwargs)
+        self.checkpoint()
+        if self.llm_client:
+            self.llm_client.start_turn()
+        return text
+
+    # Stages
+
+    async def run(self, finish):
+        """Runs the interview, then finish(user_responses) while the closing line plays.
+
+        Returns what finish returned.
+        """
+        lines = self.lines
+        self._prefetch(
+            [lines["greeting"], *self.questions, lines["no_response"], lines["validation_failed"],
+             lines["qa_prompt"], lines["no_info"], lines["closing"]]
+        )
+        # Picks up FAQ files edited since the last interview, in time for the Q&A
+        faq_refresh = asyncio.create_task(asyncio.to_thread(self.faq_index.refresh))
+        try:
+            self.state = "greeting"
+            await self._speak(lines["greeting"])
+            for question in self.questions:
+                await self._ask(question)
+            await faq_refresh
+            await self._questions_and_answers()
+
+            self.state = "closing"
+            self.checkpoint()  # an ended interview gets no wrap-up
+            if self.llm_client:
+                self.llm_client.clear_turn()  # wrap-up has its own timeout
+            _, result = await asyncio.gather(
+                self._speak(lines["closing"]),
+                asyncio.to_thread(finish, self.user_responses),
+            )
+            self.state = "done"
+            return result
+        finally:
+            for task in [faq_refresh, *self._prefetched.values()]:
+                task.cancel()
+
+    async def _ask(self, question):
+        self.state = "question"
+        self.checkpoint()
+        self.session_log.write(question, speaker=BOT)
+        await self._speak(question)
+
+        transcription = None
+        is_valid = False
+        unchecked = False
+        validation_attempts = 0
+        while not is_valid and validation_attempts < MAX_VALIDATION_ATTEMPTS:
+            speculation = self.new_speculation(question) if self.new_speculation else None
+            try:
+                transcription = await self._listen(
+                    on_segment=self._speculate_with(speculation) if speculation else None
+                )
+            except BaseException:
+                if speculation:
+                    speculation.close()
+                raise
+            if not transcription:
+                await self._speak(self.lines["no_response"])
+                validation_attempts += 1
+                continue
+
+            self.state = "validating"
+            # Reuse the verdict computed while the candidate was speaking, if still valid
+            validation_response = None
+            if speculation:
+                # May wait for a speculative call on nearly the same text to finish
+                validation_response = await self._to_thread(speculation.verdict_for, transcription)
+            if validation_response is None:
+                self.checkpoint()  # outside the try: an ended session is not a failed validation
+                try:
+                    validation_response = (await asyncio.to_thread(
+                        self.validation_chain.invoke, {"question": question, "answer": transcription}
+                    ))["text"]
+                except Exception as e:
+                    if not self.accept_on_validation_error:
+                        print(f"Validation call failed ({type(e).__name__}: {e}); asking again")
+                        await self._speak(self.lines["validation_failed"])
+                        validation_attempts += 1
+                        continue
+                    print(f"Validation call failed ({type(e).__name__}: {e}); accepting the answer unchecked")
+                    validation_response = "yes"
+                    unchecked = True
+
+            if validation_response.strip().lower().startswith("yes"):
+                is_valid = True
+            else:
+                feedback = validation_response.lstrip("no").strip()
+                await self._speak_streaming(f"{feedback}.")
+                validation_attempts += 1
+
+        if is_valid:
+            if unchecked:
+                # So the log, the summary and the store show it was never validated
+                transcription = f"Not validated (validation call failed): {transcription}"
+            self.session_log.write(transcription, speaker=CANDIDATE)
+            self.user_responses[question] = transcription
+        else:
+            self.user_responses[question] = (
+                f"No valid response after {validation_attempts} attempts: {transcription}"
+            )
+        self.session_log.end_turn()
+        print("-" * 50)
+
+    def _speculate_with(self, speculation):
+        """on_segment for the transcriber: starts no speculative call once the session has ended."""
+        def submit(text_so_far):
+            if self._cancelled():
+                speculation.close()
+            else:
+                speculation.submit(text_so_far)
+        return submit
+
+    def _classify(self, user_question):
+        try:
+            if self.intent_classifier:
+                return self.intent_classifier.classify(user_question, self.no_question_chain)
+            return self.no_question_chain.invoke({"user_input": user_question})["text"].strip().lower()
+        except Exception as e:
+            # Without the LLM the Q&A could not answer anyway; move on to the wrap-up
+            print(f"Intent classification failed, ending the Q&A: {e}")
+            return "no_question"
+
+    def _faq_context(self, user_question):
+        # Only the passages relevant to this question are sent to the LLM
+        if len(self.faq_index):
+            return self.faq_index.context_for(user_question, k=self.faq_top_k)
+        return self.faq_document
+
+    def _answer(self, user_question, faq_context=None, cancelled=None):
+        """The LLM's answer from the FAQ, or None when there is nothing to answer from (or it failed).
+
+        A set cancelled event stops it before the LLM call; once sent, the call
+        runs to the end, since the HTTP request cannot be withdrawn.
+        """
+        if faq_context is None:
+            faq_context = self._faq_context(user_question)
+        if not faq_context or (cancelled is not None and cancelled.is_set()):
+            return None
+        try:
+            return self.qa_chain.invoke({"FAQ_DOCUMENT": faq_context, "question": user_question})["text"]
+        except Exception as e:
+            print(f"Q&A answer failed: {e}")
+            return None
+
+    def _needs_llm_intent(self, user_question):
+        return self.intent_classifier is None or self.intent_classifier.predict(user_question)[0] is None
+
+    async def _questions_and_answers(self):
+        self.state = "qa"
+        await self._speak(self.lines["qa_prompt"])
+        self.session_log.write(self.lines["qa_prompt"], speaker=BOT)
+        self.session_log.end_turn()
+        while True:
+            user_question = await self._listen()
+            self.session_log.write(user_question, speaker=CANDIDATE)
+
+            self.state = "answering"
+            answer = context = None
+            cancelled = threading.Event()
+            if self._needs_llm_intent(user_question):
+                # Overlap the intent call with the answer (or only the FAQ lookup),
+                # so a question is answered without waiting for the two in turn
+                if self.speculative_answer:
+                    answer = asyncio.create_task(self._to_thread(self._answer, user_question, None, cancelled))
+                else:
+                    context = asyncio.create_task(self._to_thread(self._faq_context, user_question))
+            try:
+                intent = await self._to_thread(self._classify, user_question)
+            except BaseException:
+                cancelled.set()
+                for task in (answer, context):
+                    if task is not None:
+                        task.cancel()
+                raise
+            if intent == "no_question":
+                # Cancelling the task alone would leave its thread free to call the LLM
+                cancelled.set()
+                for task in (answer, context):
+                    if task is not None:
+                        task.cancel()
+                self.session_log.end_turn()
+                break
+            if answer is not None:
+                answer = await answer
+            else:
+                faq_context = await context if context is not None else None
+                answer = await self._to_thread(self._answer, user_question, faq_context)
+
+            if answer is not None:
+                await self._speak_streaming(answer)
+                self.session_log.write(answer, speaker=BOT)
+            else:
+                await self._speak(self.lines["no_info"])
+                self.session_log.write("No information available to answer the question.", speaker=BOT)
+            self.session_log.end_turn()
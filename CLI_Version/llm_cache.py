@@ -0,0 +1,176 @@
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+
+import metrics
+
+
+def _normalize(value):
+    if isinstance(value, str):
+        return re.sub(r"\s+", " ", value).strip().casefold()
+    return value
+
+
+def prompt_fingerprint(chain):
+    """Hash of the chain's prompt (system part and template) and model, so edited prompts miss the cache."""
+    prompt = getattr(chain, "prompt", None)
+    template = getattr(prompt, "template", None) or repr(prompt)
+    system = getattr(chain, "system", None) or ""
+    model = getattr(getattr(chain, "llm", None), "model", "")
+    return hashlib.sha256(f"{model}\n{system}\n{template}".encode("utf-8")).hexdigest()
+
+
+class LLMResponseCache:
+    """SQLite-backed cache of chain outputs with TTL and size-based eviction.
+
+    Safe to share between interview threads; all access goes through one
+    connection guarded by a lock. The connection is opened on first use, and
+    again in a forked worker process, which must not reuse its parent's.
+    """
+
+    def __init__(self, path, ttl_seconds=7 * 24 * 3600, max_entries=5000):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._conn = None
+        self._pid = None
+
+    def _connection(self):
+        if self._conn is None or self._pid != os.getpid():
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute(
+                """CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    chain TEXT NOT NULL,
+                    response TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_used REAL NOT NULL
+                )"""
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS responses_last_used ON responses (last_used)")
+            conn.execute("CREATE INDEX IF NOT EXISTS responses_created_at ON responses (created_at)")
+            conn.commit()
+            self._conn, self._pid = conn, os.getpid()
+        return self._conn
+
+    @staticmethod
+    def make_key(fingerprint, inputs):
+        normalized = {k: _normalize(v) for k, v in sorted(inputs.items())}
+        payload = json.dumps([fingerprint, normalized], ensure_ascii=False, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _count(self, chain, outcome):
+        counters = self._counters.setdefault(chain, {"hits": 0, "misses": 0})
+        counters[outcome] += 1
+
+    def get(self, chain, key):
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            row = conn.execute(
+                "SELECT response, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or now - row[1] > self.ttl_seconds:
+                self._count(chain, "misses")
+                return None
+            conn.execute("UPDATE responses SET last_used = ? WHERE key = ?", (now, key))
+            conn.commit()
+            self._count(chain, "hits")
+            return row[0]
+
+    def put(self, chain, key, response):
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            conn.execute(
+                "INSERT OR REPLACE INTO responses (key, chain, response, created_at, last_used) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, chain, response, now, now),
+            )
+            self._evict(conn, now)
+            conn.commit()
+
+    def _evict(self, conn, now):
+        conn.execute("DELETE FROM responses WHERE created_at < ?", (now - self.ttl_seconds,))
+        (count,) = conn.execute("SELECT COUNT(*) FROM responses").fetchone()
+        if count > self.max_entries:
+            conn.execute(
+                "DELETE FROM responses WHERE key IN "
+                "(SELECT key FROM responses ORDER BY last_used LIMIT ?)",
+                (count - self.max_entries,),
+            )
+
+    def stats(self, since=None):
+        """Per-chain hit and miss counters, optionally relative to an earlier snapshot."""
+        with self._lock:
+            stats = {chain: dict(counters) for chain, counters in self._counters.items()}
+        if since:
+            for chain, counters in list(stats.items()):
+                for name in ("hits", "misses"):
+                    counters[name] -= since.get(chain, {}).get(name, 0)
+                if not counters["hits"] + counters["misses"]:
+                    del stats[chain]
+        return stats
+
+    def clear(self):
+        with self._lock:
+            conn = self._connection()
+            conn.execute("DELETE FROM responses")
+            conn.commit()
+
+
+class CachedChain:
+    """Wraps a chain so identical (normalized) inputs are answered from the cache.
+
+    Calls that reach the model go through client (an llm_client.LLMClient)
+    when one is given, which passes the chain a timeout for each attempt.
+    """
+
+    def __init__(self, name, chain, cache=None, enabled=True, client=None):
+        self.name = name
+        self.chain = chain
+        self.cache = cache
+        self.client = client
+        self.enabled = enabled and cache is not None
+        self._fingerprint = None  # computed on first use, when a lazy chain has been built
+
+    def invoke(self, inputs, *args, **kwargs):
+        with metrics.span(f"llm.{self.name}"):
+            return self._invoke(inputs, *args, **kwargs)
+
+    def _call_model(self, inputs, *args, **kwargs):
+        if self.client is None:
+            return self.chain.invoke(inputs, *args, **kwargs)
+        return self.client.call(
+            self.name, lambda timeout: self.chain.invoke(inputs, *args, timeout=timeout, **kwargs)
+        )
+
+    def _invoke(self, inputs, *args, **kwargs):
+        if not self.enabled:
+            return self._call_model(inputs, *args, **kwargs)
+        if self._fingerprint is None:
+            self._fingerprint = prompt_fingerprint(self.chain)
+        key = LLMResponseCache.make_key(self._fingerprint, inputs)
+        text = self.cache.get(self.name, key)
+        if text is not None:
+            return {**inputs, "text": text}
+        result = self._call_model(inputs, *args, **kwargs)
+        self.cache.put(self.name, key, result["text"])
+        return result
+
+    def __getattr__(self, name):
+        return getattr(self.chain, name)
+
+
+def format_cache_stats(stats):
+    parts = [f"{chain} {c['hits']}/{c['hits'] + c['misses']}" for chain, c in sorted(stats.items())]
+    return "LLM cache hits: " + (", ".join(parts) if parts else "no lookups")
@@ -1,13 +1,132 @@
-from langchain.prompts import PromptTemplate
-from langchain.chains import LLMChain
-from config import llm
+import threading
+import time
+
+from config import (
+    get_llm,
+    LLM_CACHE_ENABLED,
+    LLM_CACHE_PATH,
+    LLM_CACHE_TTL,
+    LLM_CACHE_MAX_ENTRIES,
+    LLM_CACHE_DISABLED_CHAINS,
+    LLM_MAX_CONCURRENCY,
+    LLM_TIMEOUT,
+    LLM_CHAIN_TIMEOUTS,
+    LLM_MAX_RETRIES,
+    LLM_TURN_BUDGET,
+    LLM_PRICES,
+)
+from llm_cache import LLMResponseCache, CachedChain
+from llm_client import LLMClient
+from llm_usage import TokenUsage
+
+# Shared response cache for every chain below
+llm_cache = LLMResponseCache(
+    LLM_CACHE_PATH, ttl_seconds=LLM_CACHE_TTL, max_entries=LLM_CACHE_MAX_ENTRIES
+) if LLM_CACHE_ENABLED else None
+
+# Timeouts, concurrency limit and retries for every chain below
+llm_client = LLMClient(
+    max_concurrency=LLM_MAX_CONCURRENCY,
+    timeout=LLM_TIMEOUT,
+    timeouts=LLM_CHAIN_TIMEOUTS,
+    max_retries=LLM_MAX_RETRIES,
+    turn_budget=LLM_TURN_BUDGET,
+)
+
+# Tokens and latency of every call that reaches the model
+token_usage = TokenUsage(prices=LLM_PRICES)
 
-# Check if LLM is initialized before creating chains
-if llm is None:
-    raise ValueError("LLM not initialized. Please set ANTHROPIC_API_KEY.")
+
+class LazyChain:
+    """A prompt and the shared chat model, set up on first use.
+
+    The prompt is a static system part (the instructions, the same on every
+    call) and a short human part with the inputs; every call's token usage
+    and latency are recorded in usage.
+
+    invoke() returns the inputs plus the model's reply under "text", as
+    LLMChain does, and takes a timeout for the request. Importing langchain
+    and creating the LLM client take seconds, so importing this module does
+    neither; build_chains() does both ahead of time.
+    """
+
+    def __init__(self, template, system=None, name=None, usage=None):
+        self.template = template
+        self.system = system
+        self.name = name
+        self.usage = usage
+        self._prompt = None
+        self._system_prompt = None
+        self._llm = None
+        self._lock = threading.Lock()
+
+    def build(self):
+        with self._lock:
+            if self._prompt is None:
+                from langchain_core.prompts import PromptTemplate
+
+                llm = get_llm()
+                if llm is None:
+                    raise ValueError("LLM not initialized. Please set ANTHROPIC_API_KEY.")
+                self._llm = llm
+                if self.system:
+                    self._system_prompt = PromptTemplate.from_template(self.system)
+                self._prompt = PromptTemplate.from_template(self.template)
+        return self
+
+    @property
+    def prompt(self):
+        return self.build()._prompt
+
+    @property
+    def llm(self):
+        return self.build()._llm
+
+    def messages(self, inputs):
+        from langchain_core.messages import HumanMessage, SystemMessage
+
+        self.build()
+        messages = []
+        if self._system_prompt is not None:
+            messages.append(SystemMessage(content=self._system_prompt.format(**inputs)))
+        messages.append(HumanMessage(content=self._prompt.format(**inputs)))
+        return messages
+
+    def invoke(self, inputs, timeout=None):
+        messages = self.messages(inputs)
+        kwargs = {} if timeout is None else {"timeout": timeout}
+        start = time.perf_counter()
+        message = self._llm.invoke(messages, **kwargs)
+        if self.usage is not None:
+            self.usage.record(self.name, getattr(message, "usage_metadata", None), time.perf_counter() - start)
+        return {**inputs, "text": message.content}
+
+
+_chains = []
+
+
+def cached_chain(name, system, template):
+    chain = CachedChain(
+        name,
+        LazyChain(template, system=system, name=name, usage=token_usage),
+        llm_cache,
+        enabled=name not in LLM_CACHE_DISABLED_CHAINS,
+        client=llm_client,
+    )
+    _chains.append(chain)
+    return chain
+
+
+def build_chains():
+    """Creates the LLM client and every chain now instead of on first use."""
+    for chain in _chains:
+        chain.chain.build()
+
+# Each chain's prompt is a static system part and a short human part with
+# what changes from call to call
 
 # Prompt for validation
-validation_prompt = PromptTemplate.from_template(
+validation_system = (
     """You are a senior recruiter in an IT office. Your task is to evaluate the user's answer to the interview question.
 
 1. Check if the answer addresses the main points of the question, even if not perfectly phrased, do not judge too strickt. The answers may be short, however, they should still be relevant to the question asked.
@@ -25,39 +144,39 @@ SOUND HUMAN.
 DO NOT BE ROBOTIC.
 DO NOT USE BULLET POINTS.
 DO NOT JUDGE TOO STRICKT.  
-IF THE ANSWER IS INCOMPLETE BUT TOUCHES SOME PARTS OF THE QUESTION JUST SAY 'yes'.
-
-Question: ```{question}```  
+IF THE ANSWER IS INCOMPLETE BUT TOUCHES SOME PARTS OF THE QUESTION JUST SAY 'yes'."""
+)
+validation_prompt = (
+    """Question: ```{question}```  
 Answer: {answer}"""
 )
-validation_chain = LLMChain(llm=llm, prompt=validation_prompt)
+validation_chain = cached_chain("validation", validation_system, validation_prompt)
 
 # Prompt for JSON creation
-json_prompt = PromptTemplate.from_template(
+json_system = (
     """You are an HR assistant.
-    Summarize the following interview transcript and output ONLY a valid JSON object.
+    Summarize the interview transcript you are given and output ONLY a valid JSON object.
     
     Required fields:
     - Name
     - Interest Level for joining the team (High, Medium, Low)
     - Notice period (Ready now, Needs some time (mention the time), Not ready)
     - Background (short description)
-    
-    Transcript:
-    ```{transcript}```
 
     Respond with JSON only, no explanations, no markdown, no text outside the JSON.
     """
 )
-json_chain = LLMChain(llm=llm, prompt=json_prompt)
+json_prompt = (
+    """Transcript:
+    ```{transcript}```
+    """
+)
+json_chain = cached_chain("json", json_system, json_prompt)
 
 # Summary Prompt
-summary_prompt = PromptTemplate.from_template(
+summary_system = (
     """You are an HR assistant.
-    Summarize the following interview transcript in a concise manner.
-
-    Transcript:
-    ```{transcript}```
+    Summarize the interview transcript you are given in a concise manner.
 
     Provide a brief summary of the candidate's responses.
     Do NOT include any headers, lists, or bullet points.
@@ -65,35 +184,62 @@ summary_prompt = PromptTemplate.from_template(
     DO NOT use any addition symbols like asterisk.
     """
 )
-summary_chain = LLMChain(llm=llm, prompt=summary_prompt)
+summary_prompt = (
+    """Transcript:
+    ```{transcript}```
+    """
+)
+summary_chain = cached_chain("summary", summary_system, summary_prompt)
 
-# Q&A Prompt
-qa_prompt = PromptTemplate.from_template(
+# Combined wrap-up Prompt: summary and structured JSON in one call
+wrap_up_system = (
     """You are an HR assistant.
-    Answer the following question based on the provided FAQ document.
+    Read the interview transcript you are given and output ONLY a valid JSON object with two keys:
+    - "summary": a brief plain-text summary of the candidate's responses, without headers, lists, bullet points or symbols like asterisk.
+    - "profile": an object with the fields
+        - Name
+        - Interest Level for joining the team (High, Medium, Low)
+        - Notice period (Ready now, Needs some time (mention the time), Not ready)
+        - Background (short description)
 
-    FAQ:
-    ```{FAQ_DOCUMENT}```
-
-    Question:
-    ```{question}```
+    Respond with JSON only, no explanations, no markdown, no text outside the JSON.
+    """
+)
+wrap_up_prompt = (
+    """Transcript:
+    ```{transcript}```
+    """
+)
+wrap_up_chain = cached_chain("wrap_up", wrap_up_system, wrap_up_prompt)
 
+# Q&A Prompt; the FAQ passages retrieved for each question go in the human part
+qa_system = (
+    """You are an HR assistant.
+    Answer the candidate's question based on the provided FAQ document.
     Provide a concise and relevant answer based on the context.
     Do not make up answers if the information is not available in the FAQ document, just tell that you do not know.
     Do not use any addition symbols like asterisk.
     """
 )
-qa_chain = LLMChain(llm=llm, prompt=qa_prompt)
+qa_prompt = (
+    """FAQ:
+    ```{FAQ_DOCUMENT}```
 
-# Question/No Question Prompt
-no_question_prompt = PromptTemplate.from_template( """You are a helpful assistant.
-    Decide if the following user input means they have no questions.
+    Question:
+    ```{question}```
+    """
+)
+qa_chain = cached_chain("qa", qa_system, qa_prompt)
 
-    User input:
-    "{user_input}"
+# Question/No Question Prompt
+no_question_system = ("""You are a helpful assistant.
+    Decide if the user input you are given means they have no questions.
 
     Answer with ONLY one word:
     - "no_question" if the user indicates they do not have any questions.
     - "has_question" if the user is actually asking something.
     """)
-no_question_chain = LLMChain(llm=llm, prompt=no_question_prompt)
\ No newline at end of file
+no_question_prompt = ("""User input:
+    "{user_input}"
+    """)
+no_question_chain = cached_chain("no_question", no_question_system, no_question_prompt)
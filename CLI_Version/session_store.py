@@ -0,0 +1,347 @@
+"""Indexed record of every interview, in one SQLite database.
+
+    python session_store.py list [--name Ann] [--interest high] [--since 2026-10-01]
+    python session_store.py export interviews.jsonl [--notice "ready now"] [--until 2026-11-01]
+    python session_store.py export interviews.csv
+
+Each finished interview is one row of `interviews` (who, when, interest level,
+notice period, the extracted profile), with its transcript, answers and
+summary in child tables. The filters used to look candidates up are indexed
+together with the start time, and results are paged by (started_at, id)
+rather than OFFSET, so queries stay fast with tens of thousands of
+interviews. The database runs in WAL mode: the export command and other
+readers never block an interview that is being saved, even from another
+process.
+"""
+import argparse
+import csv
+import json
+import os
+import sqlite3
+import sys
+import threading
+from datetime import date, datetime
+
+import metrics
+
+INTEREST_KEY = "Interest Level for joining the team"
+NOTICE_KEY = "Notice period"
+
+_SCHEMA = [
+    """CREATE TABLE IF NOT EXISTS interviews (
+        id INTEGER PRIMARY KEY,
+        session_id TEXT NOT NULL UNIQUE,
+        source TEXT NOT NULL,
+        started_at TEXT NOT NULL,
+        finished_at TEXT NOT NULL,
+        name TEXT COLLATE NOCASE,
+        interest_level TEXT COLLATE NOCASE,
+        notice_period TEXT COLLATE NOCASE,
+        profile TEXT NOT NULL,
+        output_dir TEXT
+    )""",
+    "CREATE INDEX IF NOT EXISTS interviews_name ON interviews (name, started_at)",
+    "CREATE INDEX IF NOT EXISTS interviews_started_at ON interviews (started_at)",
+    "CREATE INDEX IF NOT EXISTS interviews_interest ON interviews (interest_level, started_at)",
+    "CREATE INDEX IF NOT EXISTS interviews_notice ON interviews (notice_period, started_at)",
+    """CREATE TABLE IF NOT EXISTS transcripts (
+        interview_id INTEGER NOT NULL REFERENCES interviews (id) ON DELETE CASCADE,
+        seq INTEGER NOT NULL,
+        time TEXT,
+        speaker TEXT NOT NULL,
+        text TEXT NOT NULL,
+        PRIMARY KEY (interview_id, seq)
+    ) WITHOUT ROWID""",
+    """CREATE TABLE IF NOT EXISTS answers (
+        interview_id INTEGER NOT NULL REFERENCES interviews (id) ON DELETE CASCADE,
+        seq INTEGER NOT NULL,
+        question TEXT NOT NULL,
+        response TEXT,
+        PRIMARY KEY (interview_id, seq)
+    ) WITHOUT ROWID""",
+    """CREATE TABLE IF NOT EXISTS summaries (
+        interview_id INTEGER PRIMARY KEY REFERENCES interviews (id) ON DELETE CASCADE,
+        summary TEXT NOT NULL
+    )""",
+]
+
+_COLUMNS = "id, session_id, source, started_at, finished_at, name, interest_level, notice_period, output_dir"
+_SELECT = (
+    f"SELECT {_COLUMNS}, profile, "
+    "(SELECT summary FROM summaries WHERE interview_id = interviews.id) AS summary FROM interviews"
+)
+
+
+def _timestamp(value):
+    """ISO text for a datetime, a date or a string, so they compare as text."""
+    if isinstance(value, datetime):
+        return value.isoformat(sep=" ", timespec="seconds")
+    if isinstance(value, date):
+        return value.isoformat()
+    return value
+
+
+def _field(profile, key):
+    value = profile.get(key) if isinstance(profile, dict) else None
+    if value is None:
+        return None
+    return str(value).strip() or None
+
+
+def _escape_like(text):
+    return text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+class SessionStore:
+    """SQLite store of finished interviews.
+
+    Safe to share between interview threads; all access goes through one
+    connection guarded by a lock. The connection is opened on first use, and
+    again in a forked worker process, which must not reuse its parent's.
+    """
+
+    def __init__(self, path, busy_timeout=10.0):
+        self.path = path
+        self.busy_timeout = busy_timeout
+        self._lock = threading.Lock()
+        self._conn = None
+        self._pid = None
+
+    def _open(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # Autocommit; writes and exports open their own transactions
+        conn = sqlite3.connect(self.path, timeout=self.busy_timeout, check_same_thread=False,
+                               isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.execute("PRAGMA synchronous = NORMAL")  # durable at checkpoints, which is enough here
+        conn.execute("PRAGMA foreign_keys = ON")
+        for statement in _SCHEMA:
+            conn.execute(statement)
+        return conn
+
+    def _connection(self):
+        if self._conn is None or self._pid != os.getpid():
+            self._conn, self._pid = self._open(), os.getpid()
+        return self._conn
+
+    # Writing
+
+    def record(self, session_id, *, started_at, profile, summary="", answers=None, transcript=(),
+               source="cli", output_dir=None, finished_at=None):
+        """Saves one finished interview and returns its id.
+
+        profile is the structured data extracted from the interview, answers
+        maps each question to the candidate's response, and transcript is the
+        session log's resolved lines ({"Time", "Speaker", "Text"}). Recording
+        the same session_id again replaces the earlier record.
+        """
+        finished_at = finished_at or datetime.now()
+        with metrics.span("io.session_store"), self._lock:
+            conn = self._connection()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.execute("DELETE FROM interviews WHERE session_id = ?", (session_id,))
+                interview_id = conn.execute(
+                    "INSERT INTO interviews (session_id, source, started_at, finished_at, name, "
+                    "interest_level, notice_period, profile, output_dir) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        session_id, source, _timestamp(started_at), _timestamp(finished_at),
+                        _field(profile, "Name"), _field(profile, INTEREST_KEY), _field(profile, NOTICE_KEY),
+                        json.dumps(profile, ensure_ascii=False), output_dir,
+                    ),
+                ).lastrowid
+                conn.executemany(
+                    "INSERT INTO transcripts (interview_id, seq, time, speaker, text) VALUES (?, ?, ?, ?, ?)",
+                    [(interview_id, seq, line.get("Time"), line["Speaker"], line["Text"] or "")
+                     for seq, line in enumerate(transcript)],
+                )
+                conn.executemany(
+                    "INSERT INTO answers (interview_id, seq, question, response) VALUES (?, ?, ?, ?)",
+                    [(interview_id, seq, question, response)
+                     for seq, (question, response) in enumerate((answers or {}).items())],
+                )
+                conn.execute("INSERT INTO summaries (interview_id, summary) VALUES (?, ?)",
+                             (interview_id, summary or ""))
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        return interview_id
+
+    def delete(self, interview_id):
+        with self._lock:
+            self._connection().execute("DELETE FROM interviews WHERE id = ?", (interview_id,))
+
+    # Queries
+
+    @staticmethod
+    def _where(name=None, interest_level=None, notice_period=None, since=None, until=None):
+        clauses, params = [], []
+        if name:
+            # Prefix match; with the NOCASE column this is a range scan on interviews_name
+            clauses.append("name LIKE ? ESCAPE '\\'")
+            params.append(_escape_like(name) + "%")
+        if interest_level:
+            clauses.append("interest_level = ?")
+            params.append(interest_level)
+        if notice_period:
+            clauses.append("notice_period = ?")
+            params.append(notice_period)
+        if since:
+            clauses.append("started_at >= ?")
+            params.append(_timestamp(since))
+        if until:
+            clauses.append("started_at < ?")
+            params.append(_timestamp(until))
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def find(self, *, limit=50, after=None, **filters):
+        """Interviews matching the filters, newest first, at most limit of them.
+
+        Filters: name (case-insensitive prefix), interest_level and
+        notice_period (case-insensitive, exact), since (inclusive) and until
+        (exclusive) on the start time. For the next page pass after=the last
+        row of this one.
+        """
+        where, params = self._where(**filters)
+        if after is not None:
+            where += (" AND " if where else " WHERE ") + "(started_at, id) < (?, ?)"
+            params += [after["started_at"], after["id"]]
+        with self._lock:
+            rows = self._connection().execute(
+                f"SELECT {_COLUMNS} FROM interviews{where} ORDER BY started_at DESC, id DESC LIMIT ?",
+                params + [limit],
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def count(self, **filters):
+        where, params = self._where(**filters)
+        with self._lock:
+            return self._connection().execute(f"SELECT COUNT(*) FROM interviews{where}", params).fetchone()[0]
+
+    @staticmethod
+    def _expand(conn, rows, details=True):
+        """Rows of _SELECT as dicts, with answers and transcript fetched for all of them at once."""
+        interviews = []
+        for row in rows:
+            interview = dict(row)
+            interview["profile"] = json.loads(interview["profile"])
+            interview["summary"] = interview["summary"] or ""
+            interviews.append(interview)
+        if not details or not interviews:
+            return interviews
+        by_id = {}
+        for interview in interviews:
+            interview["answers"] = []
+            interview["transcript"] = []
+            by_id[interview["id"]] = interview
+        ids = ", ".join("?" * len(by_id))
+        for interview_id, question, response in conn.execute(
+            f"SELECT interview_id, question, response FROM answers WHERE interview_id IN ({ids}) "
+            "ORDER BY interview_id, seq", list(by_id),
+        ):
+            by_id[interview_id]["answers"].append({"question": question, "response": response})
+        for interview_id, time, speaker, text in conn.execute(
+            f"SELECT interview_id, time, speaker, text FROM transcripts WHERE interview_id IN ({ids}) "
+            "ORDER BY interview_id, seq", list(by_id),
+        ):
+            by_id[interview_id]["transcript"].append({"Time": time, "Speaker": speaker, "Text": text})
+        return interviews
+
+    def get(self, interview_id):
+        """One interview with its profile, summary, answers and transcript, or None."""
+        with self._lock:
+            conn = self._connection()
+            rows = conn.execute(f"{_SELECT} WHERE id = ?", (interview_id,)).fetchall()
+            return next(iter(self._expand(conn, rows)), None)
+
+    def iter_interviews(self, details=True, batch_size=500, **filters):
+        """Yields every matching interview, oldest first, as get() would return it.
+
+        Reads through a connection of its own, from one snapshot: a long export
+        sees a consistent database and does not hold up interviews being saved.
+        """
+        where, params = self._where(**filters)
+        conn = self._open()
+        try:
+            conn.execute("BEGIN")
+            cursor = conn.execute(f"{_SELECT}{where} ORDER BY started_at, id", params)
+            while True:
+                # batch_size stays under SQLite's limit of 999 parameters per statement
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield from self._expand(conn, rows, details)
+        finally:
+            conn.close()
+
+    # Export
+
+    @metrics.timed("io.export_sessions")
+    def export_jsonl(self, path, **filters):
+        """Writes one JSON object per interview, with transcript and answers; returns the count."""
+        count = 0
+        with open(path, "w", encoding="utf-8") as f:
+            for interview in self.iter_interviews(**filters):
+                f.write(json.dumps(interview, ensure_ascii=False) + "\n")
+                count += 1
+        return count
+
+    @metrics.timed("io.export_sessions")
+    def export_csv(self, path, **filters):
+        """Writes one row per interview with its summary (no transcript); returns the count."""
+        fields = [c.strip() for c in _COLUMNS.split(",")] + ["summary"]
+        count = 0
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=fields, extrasaction="ignore")
+            writer.writeheader()
+            for interview in self.iter_interviews(details=False, **filters):
+                writer.writerow(interview)
+                count += 1
+        return count
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None and self._pid == os.getpid():
+                self._conn.close()
+            self._conn = None
+
+
+def _add_filters(parser):
+    parser.add_argument("--name", help="name starts with (case-insensitive)")
+    parser.add_argument("--interest", dest="interest_level", help="interest level, e.g. High")
+    parser.add_argument("--notice", dest="notice_period", help='notice period, e.g. "Ready now"')
+    parser.add_argument("--since", help="started on or after, e.g. 2026-10-01")
+    parser.add_argument("--until", help="started before, e.g. 2026-11-01")
+
+
+if __name__ == "__main__":
+    from config import SESSION_DB_PATH
+
+    parser = argparse.ArgumentParser(description="Look up and export recorded interviews.")
+    parser.add_argument("--db", default=SESSION_DB_PATH, help="database file (default: %(default)s)")
+    commands = parser.add_subparsers(dest="command", required=True)
+    list_parser = commands.add_parser("list", help="print matching interviews, newest first")
+    _add_filters(list_parser)
+    list_parser.add_argument("--limit", type=int, default=20)
+    export_parser = commands.add_parser("export", help="write matching interviews to a .jsonl or .csv file")
+    export_parser.add_argument("out", help="output file; .csv writes one row per interview without transcripts")
+    _add_filters(export_parser)
+    args = parser.parse_args()
+
+    if not os.path.exists(args.db):
+        sys.exit(f"No interviews recorded yet ({args.db} does not exist)")
+    store = SessionStore(args.db)
+    filters = {key: getattr(args, key) for key in ("name", "interest_level", "notice_period", "since", "until")}
+    if args.command == "list":
+        for row in store.find(limit=args.limit, **filters):
+            print(f"{row['id']:>6}  {row['started_at']}  {row['name'] or '-':<24} "
+                  f"{row['interest_level'] or '-':<8} {row['notice_period'] or '-'}")
+        print(f"{store.count(**filters)} matching interviews")
+    else:
+        export = store.export_csv if args.out.lower().endswith(".csv") else store.export_jsonl
+        print(f"Exported {export(args.out, **filters)} interviews to {args.out}")
+    store.close()
@@ -0,0 +1,95 @@
+"""Where startup time goes: module imports and the warm-up steps.
+
+    python main.py --profile-startup
+    python app.py --profile-startup
+
+Imports are measured in a fresh interpreter with `python -X importtime`, so
+the numbers are not skewed by modules this process has already loaded. The
+warm-up steps (speech model, LLM client, ...) are timed with step() as they
+run.
+"""
+import importlib.util
+import os
+import re
+import subprocess
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+_IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)")
+
+_HERE = os.path.dirname(os.path.abspath(__file__))
+
+_steps = []
+_steps_lock = threading.Lock()
+
+
+@contextmanager
+def step(name):
+    """Records how long the block takes under name."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        with _steps_lock:
+            _steps.append((name, time.perf_counter() - start))
+
+
+def steps():
+    with _steps_lock:
+        return list(_steps)
+
+
+def import_times(module):
+    """Imports module in a fresh interpreter; returns [(name, self_s, cumulative_s, depth)]."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True,
+        cwd=_HERE,  # the repo's modules import by name from this directory, wherever we were started
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{result.stderr[-2000:]}")
+    entries = []
+    for line in result.stderr.splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            entries.append((name, int(self_us) / 1e6, int(cumulative_us) / 1e6, len(indent) // 2))
+    return entries
+
+
+def report(module, top=10):
+    """Import cost of module by package and by the repo's own modules, then the warm-up steps."""
+    entries = import_times(module)
+    total = next((cumulative for name, _self, cumulative, _depth in entries if name == module), 0.0)
+
+    by_package = {}
+    for name, self_seconds, _cumulative, _depth in entries:
+        package = name.split(".")[0]
+        by_package[package] = by_package.get(package, 0.0) + self_seconds
+    # The repo's modules are top-level files next to this one
+    own = {name: cumulative for name, _self, cumulative, depth in entries
+           if "." not in name and depth <= 1 and _is_local(name)}
+
+    lines = [f"import {module}: {total * 1000:.0f}ms", "  by package (self time):"]
+    for package, seconds in sorted(by_package.items(), key=lambda item: -item[1])[:top]:
+        lines.append(f"    {package:<24} {seconds * 1000:8.1f}ms")
+    lines.append("  repo modules (including what they import):")
+    for name, seconds in sorted(own.items(), key=lambda item: -item[1])[:top]:
+        lines.append(f"    {name:<24} {seconds * 1000:8.1f}ms")
+    recorded = steps()
+    if recorded:
+        lines.append("warm-up:")
+        for name, seconds in recorded:
+            lines.append(f"    {name:<24} {seconds * 1000:8.1f}ms")
+    return "\n".join(lines)
+
+
+def _is_local(name):
+    try:
+        spec = importlib.util.find_spec(name)
+    except (ImportError, ValueError):
+        return False
+    origin = spec.origin if spec else None
+    return bool(origin) and os.path.isfile(origin) and os.path.dirname(os.path.abspath(origin)) == _HERE
@@ -0,0 +1,217 @@
+"""Local stand-in for the Anthropic Messages API.
+
+    python stub_llm_server.py [--port 8089] [--latency 0.5] [--error-rate 0.1] [--hang-rate 0.05]
+    ANTHROPIC_API_KEY=stub ANTHROPIC_BASE_URL=http://127.0.0.1:8089 python main.py
+
+POST /v1/messages gets a well-formed reply for each of the interview's
+prompts after a configurable delay. A share of requests can be made to fail
+(529 overloaded, 500 or 429, as the real service does) or to hang past any
+client timeout, to exercise llm_client.LLMClient's timeouts and retries.
+Connections are kept alive and counted, so pooling can be checked:
+GET /stats returns the counters as JSON.
+
+Replies report usage as the real API does for prompts without cache markers
+(tokens are estimated at four characters each).
+"""
+import argparse
+import json
+import random
+import threading
+import time
+import uuid
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+FAKE_PROFILE = {
+    "Name": "Benchmark Candidate",
+    "Interest Level for joining the team": "High",
+    "Notice period": "Ready now",
+    "Background": "Synthetic candidate used for latency benchmarks.",
+}
+
+_ERRORS = [
+    (529, "overloaded_error", "Overloaded"),
+    (500, "api_error", "Internal server error"),
+    (429, "rate_limit_error", "Rate limited"),
+]
+
+
+def reply_for(prompt):
+    """A reply of the right shape for whichever of the interview's prompts this is."""
+    if "evaluate the user's answer" in prompt:
+        return "yes"
+    if "no_question" in prompt:
+        return "no_question"
+    if '"profile"' in prompt:
+        return json.dumps({"summary": "The candidate answered every question.", "profile": FAKE_PROFILE})
+    if "valid JSON" in prompt:
+        return json.dumps(FAKE_PROFILE)
+    if "Summarize" in prompt:
+        return "The candidate answered every question."
+    return "According to the FAQ, that is covered in the program description."
+
+
+def prompt_text(system, messages):
+    """The text of every part of a request, in the order the API reads them."""
+    parts = []
+    for content in [system or ""] + [m.get("content", "") for m in messages]:
+        if isinstance(content, str):
+            parts.append(content)
+        else:
+            parts += [b.get("text", "") for b in content if isinstance(b, dict)]
+    return "\n".join(parts)
+
+
+def estimate_tokens(text):
+    return (len(text) + 3) // 4
+
+
+def usage_for(prompt, output_text):
+    """The usage block of a reply to prompt."""
+    return {"input_tokens": estimate_tokens(prompt), "cache_creation_input_tokens": 0,
+            "cache_read_input_tokens": 0, "output_tokens": estimate_tokens(output_text)}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, like the real API
+
+    def setup(self):
+        super().setup()
+        self.server.stub.count("connections")
+
+    def log_message(self, *_args):
+        pass
+
+    def _send_json(self, status, body):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        if self.path == "/stats":
+            self._send_json(200, self.server.stub.stats())
+        else:
+            self._send_json(404, {"type": "error", "error": {"type": "not_found_error", "message": self.path}})
+
+    def do_POST(self):
+        stub = self.server.stub
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        if self.path.split("?")[0] != "/v1/messages":
+            self._send_json(404, {"type": "error", "error": {"type": "not_found_error", "message": self.path}})
+            return
+        stub.count("requests")
+        prompt = prompt_text(body.get("system"), body.get("messages", []))
+        outcome = stub.outcome()
+        if outcome == "hang":
+            stub.count("hangs")
+            time.sleep(stub.hang_seconds)
+            self.close_connection = True  # the client has given up by now
+            return
+        if outcome == "error":
+            status, kind, message = stub.random.choice(_ERRORS)
+            stub.count("errors")
+            self._send_json(status, {"type": "error", "error": {"type": kind, "message": message}})
+            return
+        time.sleep(stub.delay(prompt))
+        text = reply_for(prompt)
+        self._send_json(200, {
+            "id": f"msg_{uuid.uuid4().hex[:24]}",
+            "type": "message",
+            "role": "assistant",
+            "model": body.get("model", "stub"),
+            "content": [{"type": "text", "text": text}],
+            "stop_reason": "end_turn",
+            "stop_sequence": None,
+            "usage": usage_for(prompt, text),
+        })
+
+
+class StubLLMServer:
+    def __init__(self, host="127.0.0.1", port=0, latency=0.5, jitter=0.0, error_rate=0.0,
+                 hang_rate=0.0, hang_seconds=60.0, seed=None):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.hang_rate = hang_rate
+        self.hang_seconds = hang_seconds
+        self.random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._stats = {"connections": 0, "requests": 0, "errors": 0, "hangs": 0}
+        self._server = ThreadingHTTPServer((host, port), _Handler)
+        self._server.daemon_threads = True
+        self._server.stub = self
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def count(self, key):
+        with self._lock:
+            self._stats[key] += 1
+
+    def outcome(self):
+        with self._lock:
+            roll = self.random.random()
+        if roll < self.hang_rate:
+            return "hang"
+        if roll < self.hang_rate + self.error_rate:
+            return "error"
+        return "ok"
+
+    def delay(self, prompt):
+        # Derived from the prompt, like the benchmark's fake model, so runs are repeatable
+        spread = (zlib.crc32(prompt.encode("utf-8")) % 1000) / 1000 * 2 - 1
+        return max(self.latency + self.jitter * spread, 0)
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, name="stub-llm-server", daemon=True)
+        self._thread.start()
+        return self
+
+    def serve_forever(self):
+        self._server.serve_forever()
+
+    def close(self):
+        if self._thread is not None:
+            self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *_exc):
+        self.close()
+
+    def stats(self):
+        with self._lock:
+            return dict(self._stats)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve a stub of the Anthropic Messages API.")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--latency", type=float, default=0.5, help="seconds per reply")
+    parser.add_argument("--jitter", type=float, default=0.0, help="+/- seconds, derived from the prompt")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of requests answered with 529/500/429")
+    parser.add_argument("--hang-rate", type=float, default=0.0, help="share of requests that never answer in time")
+    parser.add_argument("--hang-seconds", type=float, default=60.0)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    server = StubLLMServer(
+        port=args.port, latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+        hang_rate=args.hang_rate, hang_seconds=args.hang_seconds, seed=args.seed,
+    )
+    print(f"Stub Messages API on {server.url}; set ANTHROPIC_BASE_URL={server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print(json.dumps(server.stats()))
+        server.close()
@@ -0,0 +1,69 @@
+import sys
+import types
+
+import pytest
+
+import audio_output
+from tts_cache import CachedAudio
+
+
+class FlakyStream:
+    def __init__(self, fail_after):
+        self.fail_after = fail_after
+        self.written = []
+
+    def write(self, data):
+        if len(self.written) >= self.fail_after:
+            raise OSError("device unplugged")
+        self.written.append(bytes(data))
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def pydub_played(monkeypatch):
+    played = []
+    playback = types.ModuleType("pydub.playback")
+    playback.play = lambda segment: played.append(segment.raw_data)
+    monkeypatch.setitem(sys.modules, "pydub.playback", playback)
+    return played
+
+
+def one_second():
+    return CachedAudio(bytes(range(256)) * 125, 16000, 2, 1)
+
+
+def test_fallback_plays_only_what_the_stream_did_not(pydub_played):
+    output = audio_output.AudioOutput()
+    stream = FlakyStream(fail_after=3)
+    output._checkout = lambda _format: stream
+    audio = one_second()
+
+    output.play(audio)
+
+    assert b"".join(stream.written) + pydub_played[0] == audio.pcm
+    assert output.stats()["bytes_streamed"] == 3 * 3200
+
+
+def test_failed_fallback_disables_output(monkeypatch, capsys):
+    playback = types.ModuleType("pydub.playback")
+
+    def no_player(_segment):
+        raise FileNotFoundError("ffplay")
+
+    playback.play = no_player
+    monkeypatch.setitem(sys.modules, "pydub.playback", playback)
+    output = audio_output.AudioOutput()
+
+    def no_device(_format):
+        raise OSError("no output device")
+
+    output._checkout = no_device
+
+    for _ in range(3):
+        output.play(one_second())
+
+    stats = output.stats()
+    assert (stats["fallback"], stats["skipped"]) == (1, 3)
+    assert capsys.readouterr().out.count("continuing without sound") == 1
@@ -0,0 +1,71 @@
+import numpy as np
+import pytest
+
+from endpointer import Endpointer
+
+RATE = 16000
+rng = np.random.default_rng(0)
+
+
+def noise(seconds, amplitude=100):
+    return rng.normal(0, amplitude, int(seconds * RATE)).astype(np.int16).tobytes()
+
+
+def speech(seconds):
+    t = np.arange(int(seconds * RATE)) / RATE
+    return (0.3 * 32767 * np.sin(2 * np.pi * 220 * t)).astype(np.int16).tobytes()
+
+
+def feed(endpointer, pcm, final=False, block_seconds=0.1):
+    """Feeds pcm in blocks as a source would; returns the first reason given, if any."""
+    block = int(block_seconds * RATE) * 2
+    for start in range(0, len(pcm), block):
+        reason = endpointer.update(pcm[start:start + block], final=final and start + block >= len(pcm))
+        if reason:
+            return reason
+    return None
+
+
+def test_trailing_silence_ends_the_turn_once_the_recognizer_finalized():
+    endpointer = Endpointer(trailing_silence=0.5)
+    assert feed(endpointer, noise(0.5) + speech(1.0), final=True) is None
+
+    assert feed(endpointer, noise(0.4)) is None
+    assert feed(endpointer, noise(0.2)) == "silence"
+
+
+def test_pause_the_recognizer_still_considers_open_needs_twice_the_silence():
+    endpointer = Endpointer(trailing_silence=0.5)
+    feed(endpointer, noise(0.5) + speech(1.0))
+
+    assert feed(endpointer, noise(0.8)) is None
+    assert feed(endpointer, noise(0.3)) == "silence"
+
+
+def test_too_little_speech_is_no_input():
+    endpointer = Endpointer(no_input_timeout=2.0, min_speech=0.3)
+    # A 0.1 s click is not an answer
+    assert feed(endpointer, noise(0.5) + speech(0.1) + noise(1.2)) is None
+    assert feed(endpointer, noise(0.3)) == "no input"
+
+
+def test_answer_is_cut_at_max_length():
+    endpointer = Endpointer(max_answer=2.0)
+    assert feed(endpointer, noise(0.5) + speech(1.4)) is None
+    assert feed(endpointer, speech(0.2)) == "max answer length"
+
+
+def test_answer_starting_on_the_first_frame_is_not_learnt_as_noise():
+    endpointer = Endpointer(trailing_silence=0.5)
+    assert feed(endpointer, speech(1.0), final=True) is None
+
+    assert endpointer.speech_seconds == pytest.approx(1.0)
+    assert feed(endpointer, noise(0.6)) == "silence"
+
+
+def test_noise_floor_starts_at_the_quietest_calibration_frame():
+    endpointer = Endpointer(calibration_seconds=0.2)
+    # A loud click on the first frame, then room noise
+    feed(endpointer, speech(0.02) + noise(0.18, amplitude=30), block_seconds=0.02)
+
+    assert endpointer.noise_floor_db < -55
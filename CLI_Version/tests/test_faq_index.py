@@ -0,0 +1,84 @@
+import os
+
+import pytest
+
+from faq_index import FAQIndex, chunk_text
+
+pytest.importorskip("scipy")
+
+FAQ = {
+    "program.md": "# Stipend\n\nInterns receive a monthly stipend of 800 euros.\n\n"
+                  "# Schedule\n\nThe program runs for six months, starting in September.",
+    "office.md": "# Office\n\nThe office is in Berlin; remote work is possible two days a week.",
+}
+
+
+@pytest.fixture
+def faq_dir(tmp_path):
+    directory = tmp_path / "faq"
+    directory.mkdir()
+    for name, text in FAQ.items():
+        (directory / name).write_text(text, encoding="utf-8")
+    return directory
+
+
+def counting_index(faq_dir, index_path):
+    index = FAQIndex(str(faq_dir), str(index_path))
+    index.chunked = []
+    chunk_file = index._chunk_file
+
+    def counted(path):
+        index.chunked.append(os.path.basename(path))
+        return chunk_file(path)
+
+    index._chunk_file = counted
+    return index
+
+
+def test_search_ranks_the_matching_passage_first(faq_dir, tmp_path):
+    index = FAQIndex(str(faq_dir), str(tmp_path / "index"))
+    index.refresh()
+
+    [(_score, best), *_rest] = index.search("How much is the stipend?", k=3)
+    assert best["source"] == "program.md" and best["text"].startswith("Stipend\n")
+    assert index.search("remote work", k=1)[0][1]["source"] == "office.md"
+    # Passages sharing no terms with the query are left out
+    assert index.search("parking", k=3) == []
+
+
+def test_refresh_rechunks_only_changed_files(faq_dir, tmp_path):
+    index = counting_index(faq_dir, tmp_path / "index")
+    assert index.refresh()
+    assert sorted(index.chunked) == ["office.md", "program.md"]
+
+    index.chunked.clear()
+    assert not index.refresh()
+    assert index.chunked == []
+
+    office = faq_dir / "office.md"
+    office.write_text(FAQ["office.md"].replace("Berlin", "Munich"), encoding="utf-8")
+    os.utime(office, (os.stat(office).st_atime, os.stat(office).st_mtime + 10))
+    assert index.refresh()
+    assert index.chunked == ["office.md"]
+    assert "Munich" in index.search("office", k=1)[0][1]["text"]
+
+    (faq_dir / "program.md").unlink()
+    assert index.refresh()
+    assert index.search("stipend", k=3) == []
+
+
+def test_persisted_index_is_reused_after_a_restart(faq_dir, tmp_path):
+    FAQIndex(str(faq_dir), str(tmp_path / "index")).refresh()
+
+    restarted = counting_index(faq_dir, tmp_path / "index")
+    assert not restarted.refresh()
+    assert restarted.chunked == []
+    assert len(restarted) == 3
+
+
+def test_long_paragraphs_are_windowed_with_overlap():
+    words = [f"w{i}" for i in range(250)]
+    passages = chunk_text("# Heading\n\n" + " ".join(words), chunk_words=100, overlap_words=20)
+
+    assert [p.split()[1] for p in passages] == ["w0", "w80", "w160"]
+    assert all(p.startswith("Heading\n") for p in passages)
@@ -0,0 +1,33 @@
+import pytest
+
+from intent_classifier import HAS_QUESTION, HOLDOUT_PATH, NO_QUESTION, IntentClassifier, evaluate, load_samples
+
+
+@pytest.fixture(scope="module")
+def classifier():
+    return IntentClassifier()
+
+
+@pytest.mark.parametrize("text", [
+    "I have no idea what to ask",
+    "i don't really know what else to ask",
+    "i can't think of anything to ask",
+    "nothing more to ask thank you",
+])
+def test_saying_there_is_nothing_to_ask_is_no_question(classifier, text):
+    assert classifier.predict(text) == (NO_QUESTION, "rule")
+
+
+def test_question_words_only_count_opening_a_clause(classifier):
+    assert classifier._rule("i think i have what i need") is None
+    assert classifier._rule("yes what is the schedule") == HAS_QUESTION
+
+
+def test_held_out_set_is_not_in_the_samples():
+    training = {text for text, _label in load_samples()}
+    holdout = load_samples(HOLDOUT_PATH)
+
+    assert holdout and not training & {text for text, _label in holdout}
+    report = evaluate()
+    assert report["samples"] == len(holdout)
+    assert report["rule_answers"] + report["model_answers"] <= len(holdout)
@@ -0,0 +1,146 @@
+import asyncio
+import threading
+
+import pytest
+
+from interview_engine import MAX_VALIDATION_ATTEMPTS, InterviewEngine
+
+LINES = {"greeting": "Hello.", "no_response": "Say again?", "validation_failed": "Once more?",
+         "qa_prompt": "Any questions?", "no_info": "No idea.", "closing": "Bye."}
+
+
+class Cancelled(Exception):
+    pass
+
+
+class Log:
+    def write(self, *_args, **_kwargs):
+        pass
+
+    def end_turn(self):
+        pass
+
+
+class Chain:
+    def __init__(self, text, fail=False):
+        self.text = text
+        self.fail = fail
+        self.calls = []
+
+    def invoke(self, inputs):
+        self.calls.append(inputs)
+        if self.fail:
+            raise ConnectionError("LLM unreachable")
+        return {**inputs, "text": self.text}
+
+
+class IntentChain(Chain):
+    """Says a reply is a question only when it ends with a question mark."""
+
+    def __init__(self):
+        super().__init__(None)
+
+    def invoke(self, inputs):
+        self.calls.append(inputs)
+        return {**inputs, "text": "question" if inputs["user_input"].endswith("?") else "no_question"}
+
+
+class FAQ:
+    def __len__(self):
+        return 1
+
+    def context_for(self, _question, k):
+        return "The stipend is paid monthly."
+
+    def refresh(self):
+        pass
+
+
+def engine(replies, cancel_after_line=None, **kwargs):
+    """An engine over fakes; the session is cancelled while cancel_after_line is spoken."""
+    replies = iter(replies)
+    heard = []
+    cancelled = threading.Event()
+    record = {"spoken": [], "synthesized": [], "heard": heard}
+
+    def transcribe(**_kwargs):
+        heard.append(next(replies, ""))
+        return heard[-1]
+
+    def speak(text):
+        record["spoken"].append(text)
+        if text == cancel_after_line:
+            cancelled.set()
+
+    def checkpoint():
+        if cancelled.is_set():
+            raise Cancelled()
+
+    chains = {"validation_chain": Chain("yes"), "qa_chain": Chain("Monthly."),
+              "no_question_chain": IntentChain()}
+    chains.update(kwargs.pop("chains", {}))
+    interview = InterviewEngine(
+        Log(), ["Q1", "Q2"], LINES,
+        speak=speak, speak_streaming=record["spoken"].append,
+        synthesize=record["synthesized"].append, transcribe=transcribe,
+        new_endpointer=lambda: None, faq_index=FAQ(), checkpoint=checkpoint,
+        **chains, **kwargs,
+    )
+    return interview, chains, record
+
+
+def test_full_interview():
+    interview, chains, record = engine(["Sam, physics", "I like data", "no questions"])
+
+    result = asyncio.run(interview.run(lambda responses: dict(responses)))
+
+    assert result == {"Q1": "Sam, physics", "Q2": "I like data"}
+    assert record["spoken"] == ["Hello.", "Q1", "Q2", "Any questions?", "Bye."]
+    assert len(chains["validation_chain"].calls) == 2
+    assert chains["qa_chain"].calls == []
+
+
+def test_cancelled_session_makes_no_further_calls():
+    interview, chains, record = engine(["Sam, physics", "I like data"], cancel_after_line="Q1")
+    finished = []
+
+    with pytest.raises(Cancelled):
+        asyncio.run(interview.run(finished.append))
+
+    # Ended while Q1 played: no listening, validation, further speech or wrap-up
+    assert record["heard"] == []
+    assert chains["validation_chain"].calls == []
+    assert record["spoken"] == ["Hello.", "Q1"]
+    assert finished == []
+
+
+def test_answers_only_questions():
+    interview, chains, record = engine(["Sam", "Data", "Is there a stipend?", "hmm"])
+
+    asyncio.run(interview.run(lambda responses: responses))
+
+    # The non-question after it got no (speculative) answer call
+    assert [call["question"] for call in chains["qa_chain"].calls] == ["Is there a stipend?"]
+    assert "Monthly." in record["spoken"]
+
+
+
+def test_failed_validation_asks_again_by_default():
+    replies = ["Sam"] * MAX_VALIDATION_ATTEMPTS + ["Data"] * MAX_VALIDATION_ATTEMPTS + ["no"]
+    interview, chains, record = engine(replies, chains={"validation_chain": Chain("yes", fail=True)})
+
+    result = asyncio.run(interview.run(lambda responses: dict(responses)))
+
+    assert record["spoken"].count("Once more?") == 2 * MAX_VALIDATION_ATTEMPTS
+    assert all(answer.startswith("No valid response") for answer in result.values())
+
+
+def test_answer_accepted_on_failed_validation_is_marked():
+    interview, chains, record = engine(["Sam", "Data", "no"], accept_on_validation_error=True,
+                                       chains={"validation_chain": Chain("yes", fail=True)})
+
+    result = asyncio.run(interview.run(lambda responses: dict(responses)))
+
+    assert result == {"Q1": "Not validated (validation call failed): Sam",
+                      "Q2": "Not validated (validation call failed): Data"}
+    assert "Once more?" not in record["spoken"]
@@ -0,0 +1,15 @@
+from llm_cache import LLMResponseCache
+
+
+def test_stats_since_a_snapshot(tmp_path):
+    cache = LLMResponseCache(str(tmp_path / "llm_cache.sqlite3"))
+    cache.put("qa", "stipend", "Yes, there is one.")
+    cache.get("qa", "stipend")
+    cache.get("validation", "salary")
+
+    start = cache.stats()
+    cache.get("qa", "stipend")
+    cache.get("qa", "housing")
+
+    assert cache.stats(since=start) == {"qa": {"hits": 1, "misses": 1}}
+    assert cache.stats()["qa"] == {"hits": 2, "misses": 1}
@@ -0,0 +1,131 @@
+"""LLMClient against stub_llm_server, through the same chat model main.py uses."""
+import time
+
+import pytest
+
+from llm_client import LLMBudgetExceeded, LLMClient
+from stub_llm_server import StubLLMServer
+
+langchain_anthropic = pytest.importorskip("langchain_anthropic")
+
+MESSAGES = [("human", "Does the program include a stipend?")]
+
+
+@pytest.fixture
+def stub():
+    with StubLLMServer(latency=0.0, hang_seconds=3.0, seed=0) as server:
+        yield server
+
+
+def chat_model(stub):
+    # As config.get_llm() builds it: retries are left to LLMClient
+    return langchain_anthropic.ChatAnthropic(
+        model="claude-sonnet-4-20250514",
+        temperature=0,
+        anthropic_api_key="stub",
+        anthropic_api_url=stub.url,
+        default_request_timeout=10.0,
+        max_retries=0,
+    )
+
+
+def request_for(stub, after_first=None):
+    """One attempt per call, as LazyChain.invoke makes it; after_first(stub) runs after the first."""
+    llm = chat_model(stub)
+    timeouts = []
+
+    def request(timeout):
+        timeouts.append(timeout)
+        try:
+            return llm.invoke(MESSAGES, timeout=timeout).content
+        finally:
+            if after_first is not None and len(timeouts) == 1:
+                after_first(stub)
+
+    return request, timeouts
+
+
+def test_call_succeeds_without_retries(stub):
+    client = LLMClient(timeouts={"qa": 2.0})
+    request, timeouts = request_for(stub)
+
+    assert "FAQ" in client.call("qa", request)
+    assert timeouts == [2.0]
+    assert client.stats()["retries"] == 0
+    assert stub.stats()["requests"] == 1
+
+
+def test_server_error_is_retried(stub):
+    stub.error_rate = 1.0
+    client = LLMClient(backoff=0.01)
+    request, timeouts = request_for(stub, after_first=lambda s: setattr(s, "error_rate", 0.0))
+
+    assert "FAQ" in client.call("qa", request)
+    assert len(timeouts) == 2
+    assert client.stats()["retries"] == 1
+    assert client.stats()["failures"] == 0
+    assert stub.stats()["errors"] == 1
+
+
+def test_timeout_is_retried_then_gives_up(stub):
+    stub.hang_rate = 1.0
+    client = LLMClient(timeouts={"validation": 0.3}, max_retries=1, backoff=0.01)
+    request, timeouts = request_for(stub)
+
+    start = time.perf_counter()
+    with pytest.raises(Exception) as raised:
+        client.call("validation", request)
+
+    assert type(raised.value).__name__ == "APITimeoutError"
+    assert timeouts == [0.3, 0.3]
+    assert time.perf_counter() - start < stub.hang_seconds
+    stats = client.stats()
+    assert (stats["attempts"], stats["retries"], stats["failures"]) == (2, 1, 1)
+    assert stub.stats()["hangs"] == 2
+
+
+def test_timeout_then_success(stub):
+    stub.hang_rate = 1.0
+    client = LLMClient(timeouts={"qa": 0.3}, backoff=0.01)
+    request, timeouts = request_for(stub, after_first=lambda s: setattr(s, "hang_rate", 0.0))
+
+    assert "FAQ" in client.call("qa", request)
+    assert timeouts == [0.3, 0.3]
+    assert client.stats()["retries"] == 1
+
+
+def test_turn_budget_cuts_the_attempt_short(stub):
+    stub.hang_rate = 1.0
+    client = LLMClient(timeouts={"qa": 10.0}, turn_budget=0.5, backoff=1.0)
+    request, timeouts = request_for(stub)
+
+    client.start_turn()
+    try:
+        start = time.perf_counter()
+        with pytest.raises(LLMBudgetExceeded):
+            client.call("qa", request)
+        elapsed = time.perf_counter() - start
+    finally:
+        client.clear_turn()
+
+    # The attempt got what was left of the budget, not the chain's 10s, and no retry followed
+    assert len(timeouts) == 1 and timeouts[0] <= 0.5
+    assert elapsed < 2.0
+    assert client.stats()["budget_exceeded"] == 1
+    assert stub.stats()["hangs"] == 1
+
+
+def test_spent_budget_makes_no_request(stub):
+    client = LLMClient(turn_budget=0.05)
+    request, timeouts = request_for(stub)
+
+    client.start_turn()
+    try:
+        time.sleep(0.1)
+        with pytest.raises(LLMBudgetExceeded):
+            client.call("qa", request)
+    finally:
+        client.clear_turn()
+
+    assert timeouts == []
+    assert stub.stats()["requests"] == 0
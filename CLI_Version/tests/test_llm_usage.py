@@ -0,0 +1,33 @@
+from llm_usage import TokenUsage, format_token_usage
+
+PRICES = {"input": 3.0, "cache_creation": 3.75, "cache_read": 0.30, "output": 15.0}
+
+
+def counters(input_tokens, cache_read=0, cache_creation=0, output=0):
+    return {"calls": 1, "input_tokens": input_tokens, "cache_read_tokens": cache_read,
+            "cache_creation_tokens": cache_creation, "output_tokens": output, "seconds": 1.0}
+
+
+def test_cache_writes_are_not_reported_as_savings():
+    usage = TokenUsage(prices=PRICES)
+    # One write and no read: caching cost more than it saved
+    stats = {"qa": counters(2_000_000, cache_creation=1_000_000)}
+
+    cost = usage.cost(stats["qa"])
+    report = format_token_usage(stats, usage)
+
+    assert cost["total"] == 3.0 + 3.75
+    assert (cost["cache_write"], cost["saved"]) == (3.75, 0.0)
+    assert "$3.7500 of it on prompt cache writes" in report
+    assert "saved" not in report
+
+
+def test_cache_reads_are_reported_as_savings():
+    usage = TokenUsage(prices=PRICES)
+    stats = {"qa": counters(3_000_000, cache_read=2_000_000, cache_creation=1_000_000)}
+
+    cost = usage.cost(stats["qa"])
+
+    # Without caching: 3M input at $3; with it: 2M read at $0.30 and 1M written at $3.75
+    assert round(cost["saved"], 6) == round(9.0 - (0.6 + 3.75), 6)
+    assert "saved by prompt caching" in format_token_usage(stats, usage)
@@ -0,0 +1,46 @@
+import threading
+
+import numpy as np
+
+from audio_source import RingBuffer
+
+
+def samples(start, count):
+    return np.arange(start, start + count, dtype=np.int16).tobytes()
+
+
+def as_array(data):
+    return np.frombuffer(data, dtype=np.int16).tolist()
+
+
+def test_reads_wrap_around_the_end_of_the_buffer():
+    ring = RingBuffer(8)
+    ring.write(samples(0, 6))
+    assert as_array(ring.read(4)) == [0, 1, 2, 3]
+
+    ring.write(samples(6, 6))  # positions 6, 7, then 0..3
+    assert len(ring) == 8
+    assert as_array(ring.read(8)) == list(range(4, 12))
+    assert (ring.overflows, ring.dropped_frames) == (0, 0)
+
+
+def test_full_buffer_drops_new_samples_and_counts_them():
+    ring = RingBuffer(8)
+    ring.write(samples(0, 6))
+    ring.write(samples(6, 5))  # room for 2 of them
+
+    assert (ring.overflows, ring.dropped_frames) == (1, 3)
+    # Unread audio was kept, not overwritten
+    assert as_array(ring.read(8)) == list(range(8))
+
+
+def test_read_waits_for_a_writer_and_stops_once_closed():
+    ring = RingBuffer(16)
+    writer = threading.Timer(0.05, ring.write, args=(samples(0, 4),))
+    writer.start()
+    assert as_array(ring.read(4, timeout=2)) == [0, 1, 2, 3]
+
+    ring.write(samples(4, 2))
+    ring.close()
+    assert as_array(ring.read(4, timeout=2)) == [4, 5]  # fewer than asked once closed
+    assert ring.read(4, timeout=2) == b""
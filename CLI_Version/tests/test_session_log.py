@@ -0,0 +1,42 @@
+import csv
+import json
+
+from session_log import BOT, CANDIDATE, SessionLog
+
+
+def lines_on_disk(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+def test_lines_reach_the_file_at_turn_boundaries(tmp_path):
+    path = tmp_path / "session.jsonl"
+    with SessionLog(str(path)) as log:
+        log.write("What is your name?", speaker=BOT)
+        log.write("Sam", speaker=CANDIDATE)
+        assert lines_on_disk(path) == []  # buffered until the turn ends
+
+        log.end_turn()
+        assert [r["text"] for r in lines_on_disk(path) if r["type"] == "line"] == ["What is your name?", "Sam"]
+
+        log.write("Thank you.", speaker=BOT)
+    # close() flushes the rest
+    assert lines_on_disk(path)[-1]["text"] == "Thank you."
+
+
+def test_speaker_names_are_resolved_at_export(tmp_path):
+    with SessionLog(str(tmp_path / "session.jsonl"), speaker_names={BOT: "Recruiter"}) as log:
+        log.write("What is your name?", speaker=BOT)
+        log.write("Sam", speaker=CANDIDATE)
+        log.set_speaker_name(CANDIDATE, "Sam")  # learnt mid-interview, applies to earlier lines too
+        log.write("I studied physics", speaker=CANDIDATE)
+        log.export_csv(str(tmp_path / "session.csv"))
+
+    with open(tmp_path / "session.csv", newline="", encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+    assert [(row["Speaker"], row["Text"]) for row in rows] == [
+        ("Recruiter", "What is your name?"), ("Sam", "Sam"), ("Sam", "I studied physics"),
+    ]
+    # The log itself keeps speaker ids; names are separate entries
+    records = lines_on_disk(tmp_path / "session.jsonl")
+    assert {r["speaker"] for r in records if r["type"] == "line"} == {BOT, CANDIDATE}
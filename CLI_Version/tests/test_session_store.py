@@ -0,0 +1,59 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from session_store import INTEREST_KEY, SessionStore
+
+START = datetime(2026, 3, 1, 9, 0)
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = SessionStore(str(tmp_path / "interviews.sqlite3"))
+    yield store
+    store.close()
+
+
+def record(store, n, started_at, interest="High"):
+    return store.record(f"session-{n}", started_at=started_at,
+                        profile={"Name": f"Candidate {n}", INTEREST_KEY: interest})
+
+
+def pages(store, limit, **filters):
+    after, result = None, []
+    while True:
+        page = store.find(limit=limit, after=after, **filters)
+        if not page:
+            return result
+        result.append([row["name"] for row in page])
+        after = page[-1]
+
+
+def test_pages_cover_every_interview_once_newest_first(store):
+    # Two share a start time, so the id has to break the tie across a page boundary
+    for n, minutes in enumerate([0, 10, 10, 20, 30]):
+        record(store, n, START + timedelta(minutes=minutes))
+
+    assert pages(store, limit=2) == [
+        ["Candidate 4", "Candidate 3"], ["Candidate 2", "Candidate 1"], ["Candidate 0"],
+    ]
+
+
+def test_interviews_saved_while_paging_do_not_shift_the_pages(store):
+    for n in range(4):
+        record(store, n, START + timedelta(minutes=n))
+    first = store.find(limit=2)
+    record(store, 4, START + timedelta(minutes=10))
+
+    second = store.find(limit=2, after=first[-1])
+
+    assert [row["name"] for row in second] == ["Candidate 1", "Candidate 0"]
+
+
+def test_paging_with_filters(store):
+    for n in range(6):
+        record(store, n, START + timedelta(minutes=n), interest="High" if n % 2 else "low")
+
+    assert pages(store, limit=2, interest_level="high") == [["Candidate 5", "Candidate 3"], ["Candidate 1"]]
+    assert pages(store, limit=10, name="candidate 4") == [["Candidate 4"]]
+    assert store.count(interest_level="LOW", since=START + timedelta(minutes=1)) == 2
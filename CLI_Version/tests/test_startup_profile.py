@@ -0,0 +1,9 @@
+import startup_profile
+
+
+def test_import_times_from_another_directory(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+
+    entries = startup_profile.import_times("metrics")
+
+    assert "metrics" in [name for name, _self, _cumulative, _depth in entries]
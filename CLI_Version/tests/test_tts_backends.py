@@ -0,0 +1,66 @@
+import threading
+import time
+
+import pytest
+
+from tts_backends import TTSEngine
+from tts_cache import CachedAudio
+
+
+class Backend:
+    def __init__(self, name, error=None, delay=0.0):
+        self.name = name
+        self.error = error
+        self.delay = delay
+        self.texts = []
+        self.release = threading.Event()
+
+    def available(self):
+        return True
+
+    def synthesize(self, text):
+        self.texts.append(text)
+        if self.delay:
+            self.release.wait(self.delay)
+        if self.error is not None:
+            raise self.error
+        return CachedAudio(b"\0\0", 16000, 2, 1)
+
+
+def test_failed_backend_falls_back_and_is_skipped_until_retry():
+    online = Backend("online", error=ConnectionError("no network"))
+    local = Backend("local")
+    engine = TTSEngine([online, local], retry_after=0.2)
+
+    assert engine.synthesize("Hello.")[1] is local
+    assert engine.synthesize("Q1")[1] is local
+    assert online.texts == ["Hello."]  # skipped while marked down
+    assert engine.preferred() is local
+
+    online.error = None
+    time.sleep(0.25)
+    assert engine.synthesize("Q2")[1] is online
+    stats = engine.stats()
+    assert (stats["online"]["failures"], stats["online"]["calls"], stats["local"]["calls"]) == (1, 2, 2)
+
+
+def test_slow_backend_times_out_without_blocking_the_fallback():
+    slow = Backend("slow", delay=5.0)
+    local = Backend("local")
+    engine = TTSEngine([slow, local], timeout=0.1)
+    try:
+        start = time.perf_counter()
+        _audio, backend = engine.synthesize("Hello.")
+        assert backend is local
+        assert time.perf_counter() - start < 1.0
+        assert engine.stats()["slow"]["timeouts"] == 1
+    finally:
+        slow.release.set()
+
+
+def test_last_backend_error_is_raised():
+    engine = TTSEngine([Backend("online", error=ConnectionError("no network")),
+                        Backend("local", error=OSError("espeak crashed"))])
+
+    with pytest.raises(OSError):
+        engine.synthesize("Hello.")
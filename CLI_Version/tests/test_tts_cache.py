@@ -0,0 +1,47 @@
+import os
+
+from tts_cache import _HEADER, CachedAudio, TTSCache
+
+
+def audio(n_bytes, synth_seconds=0.5):
+    return CachedAudio(b"\1" * n_bytes, 16000, 2, 1, synth_seconds)
+
+
+def test_memory_tier_evicts_least_recently_used():
+    cache = TTSCache(max_memory_items=2)
+    cache.put("a", audio(10))
+    cache.put("b", audio(10))
+    assert cache.get("a") is not None  # "b" is now the least recently used
+    cache.put("c", audio(10))
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
+    stats = cache.stats()
+    assert (stats["memory_items"], stats["memory_hits"], stats["misses"]) == (2, 3, 1)
+
+
+def test_disk_tier_survives_a_restart_and_stays_under_its_cap(tmp_path):
+    entry_bytes = _HEADER.size + 100
+    cache = TTSCache(cache_dir=str(tmp_path), max_disk_bytes=2 * entry_bytes)
+    for i, key in enumerate(["old", "mid"]):
+        cache.put(key, audio(100))
+        os.utime(tmp_path / f"{key}.pcm", (1000 + i, 1000 + i))
+    cache.put("new", audio(100))
+
+    assert sorted(os.listdir(tmp_path)) == ["mid.pcm", "new.pcm"]
+    assert cache.stats()["disk_bytes"] == 2 * entry_bytes
+
+    restarted = TTSCache(cache_dir=str(tmp_path), max_disk_bytes=2 * entry_bytes)
+    hit = restarted.get("mid")
+    assert (hit.pcm, hit.frame_rate, hit.synth_seconds) == (b"\1" * 100, 16000, 0.5)
+    assert restarted.get("old") is None
+    stats = restarted.stats()
+    assert (stats["disk_hits"], stats["misses"], stats["synthesis_seconds_saved"]) == (1, 1, 0.5)
+
+
+def test_entry_larger_than_the_cap_is_not_written(tmp_path):
+    cache = TTSCache(cache_dir=str(tmp_path), max_disk_bytes=50)
+    cache.put("big", audio(100))
+
+    assert os.listdir(tmp_path) == []
+    assert cache.get("big") is not None  # still served from memory
@@ -0,0 +1,37 @@
+import json
+import threading
+
+from utils import format_wrap_up_timings, wrap_up_interview
+
+RESPONSES = {"What is your name?": "Sam"}
+
+
+class Chain:
+    def __init__(self, text="", error=None, release=None):
+        self.text = text
+        self.error = error
+        self.release = release
+
+    def invoke(self, inputs):
+        if self.release is not None:
+            self.release.wait(5)
+        if self.error is not None:
+            raise self.error
+        return {**inputs, "text": self.text}
+
+
+def test_failure_and_timeout_are_reported_apart():
+    release = threading.Event()
+    try:
+        summary, data, timings = wrap_up_interview(
+            RESPONSES, Chain(error=ValueError("bad request")), Chain(json.dumps({}), release=release), timeout=0.2,
+        )
+    finally:
+        release.set()
+
+    assert summary == ""
+    assert timings["summary"] == "failed: ValueError"
+    assert timings["json"] == "timed out after 0.2s"
+    assert data == {"error": "JSON chain timed out after 0.2s"}
+    report = format_wrap_up_timings(timings)
+    assert "summary failed: ValueError, json timed out after 0.2s, total " in report
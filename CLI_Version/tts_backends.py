@@ -0,0 +1,180 @@
+import contextvars
+import io
+import shutil
+import struct
+import subprocess
+import threading
+import time
+import wave
+from concurrent.futures import Future, TimeoutError
+
+import metrics
+from audio_output import decode_mp3
+from tts_cache import CachedAudio
+
+
+class TTSBackend:
+    """Turns text into decoded speech (CachedAudio)."""
+
+    name = None
+
+    def available(self):
+        return True
+
+    def synthesize(self, text):
+        raise NotImplementedError
+
+
+class GTTSBackend(TTSBackend):
+    """Google Translate's TTS service; needs network access."""
+
+    name = "gtts"
+
+    def __init__(self, lang="en", tld="co.uk", timeout=30.0):
+        self.lang = lang
+        self.tld = tld
+        self.timeout = timeout  # per HTTP request, so a stalled connection ends
+
+    def synthesize(self, text):
+        from gtts import gTTS  # imports requests; only needed once gTTS is used
+
+        mp3_fp = io.BytesIO()
+        with metrics.span("tts.synthesize"):
+            gTTS(text=text, lang=self.lang, tld=self.tld, timeout=self.timeout).write_to_fp(mp3_fp)
+        with metrics.span("tts.decode"):
+            return CachedAudio(*decode_mp3(mp3_fp.getvalue()))
+
+
+def _wav_to_audio(data):
+    """Parses WAV bytes from a pipe, whose header may not carry the real data size."""
+    with wave.open(io.BytesIO(data), "rb") as wav:
+        frame_rate, sample_width, channels = wav.getframerate(), wav.getsampwidth(), wav.getnchannels()
+    offset = 12
+    while offset + 8 <= len(data):
+        chunk_id, size = struct.unpack_from("<4sI", data, offset)
+        if chunk_id == b"data":
+            return CachedAudio(data[offset + 8:], frame_rate, sample_width, channels)
+        offset += 8 + size + size % 2
+    raise ValueError("WAV output has no data chunk")
+
+
+class EspeakBackend(TTSBackend):
+    """espeak-ng (or espeak) running locally; works offline."""
+
+    name = "espeak"
+
+    def __init__(self, voice="en-gb", speed=165, executable=None, timeout=30.0):
+        self.voice = voice
+        self.speed = speed
+        self.timeout = timeout
+        self.executable = executable or shutil.which("espeak-ng") or shutil.which("espeak")
+
+    def available(self):
+        return self.executable is not None
+
+    def synthesize(self, text):
+        if self.executable is None:
+            raise RuntimeError("espeak-ng is not installed")
+        with metrics.span("tts.synthesize"):
+            # Text on stdin, so a line starting with "-" is not read as an option
+            result = subprocess.run(
+                [self.executable, "-v", self.voice, "-s", str(self.speed), "--stdout", "--stdin"],
+                input=text.encode("utf-8"), capture_output=True, check=True, timeout=self.timeout,
+            )
+        return _wav_to_audio(result.stdout)
+
+
+def make_backend(name, lang="en", tld="co.uk", espeak_voice="en-gb"):
+    if name == "gtts":
+        return GTTSBackend(lang=lang, tld=tld)
+    if name == "espeak":
+        return EspeakBackend(voice=espeak_voice)
+    raise ValueError(f"Unknown TTS backend {name!r}")
+
+
+class TTSEngine:
+    """Synthesizes with the first healthy backend, falling back on errors and timeouts.
+
+    A backend that fails or takes longer than timeout seconds is skipped for
+    retry_after seconds, so an unreachable service costs one timeout rather
+    than one per utterance. The last backend is waited on without a timeout:
+    late speech is better than none.
+
+    Each attempt runs in a thread of its own rather than in a shared pool: a
+    backend that hangs past its timeout keeps only its own thread busy (until
+    the backend's own request timeout ends it), never the next attempt's.
+    """
+
+    def __init__(self, backends, timeout=5.0, retry_after=60.0):
+        for backend in backends:
+            if not backend.available():
+                print(f"TTS backend {backend.name} is not installed; skipping it")
+        self.backends = [b for b in backends if b.available()] or list(backends)
+        self.timeout = timeout
+        self.retry_after = retry_after
+        self._down_until = {}
+        self._lock = threading.Lock()
+        self._stats = {b.name: {"calls": 0, "failures": 0, "timeouts": 0, "seconds": 0.0} for b in self.backends}
+
+    def _healthy(self):
+        now = time.monotonic()
+        with self._lock:
+            healthy = [b for b in self.backends if self._down_until.get(b.name, 0) <= now]
+        return healthy or self.backends[-1:]
+
+    def preferred(self):
+        """The backend the next synthesis will try first."""
+        return self._healthy()[0]
+
+    def _record(self, backend, outcome, seconds=0.0):
+        with self._lock:
+            stats = self._stats[backend.name]
+            stats["calls"] += 1
+            stats["seconds"] += seconds
+            if outcome != "ok":
+                stats[outcome] += 1
+                self._down_until[backend.name] = time.monotonic() + self.retry_after
+
+    @staticmethod
+    def _submit(backend, text):
+        future = Future()
+        context = contextvars.copy_context()
+
+        def run():
+            if not future.set_running_or_notify_cancel():
+                return
+            try:
+                future.set_result(context.run(backend.synthesize, text))
+            except BaseException as e:
+                future.set_exception(e)
+
+        threading.Thread(target=run, name=f"tts-{backend.name}", daemon=True).start()
+        return future
+
+    def synthesize(self, text):
+        """Returns (CachedAudio, backend) from the first backend that succeeds in time."""
+        candidates = self._healthy()
+        for i, backend in enumerate(candidates):
+            last = i == len(candidates) - 1
+            start = time.perf_counter()
+            future = self._submit(backend, text)
+            try:
+                audio = future.result(timeout=None if last else self.timeout)
+            except TimeoutError:
+                self._record(backend, "timeouts")
+                print(f"TTS backend {backend.name} timed out after {self.timeout:.1f}s, falling back")
+                continue
+            except Exception as e:
+                self._record(backend, "failures")
+                if last:
+                    raise
+                print(f"TTS backend {backend.name} failed ({e}), falling back")
+                continue
+            audio.synth_seconds = time.perf_counter() - start
+            self._record(backend, "ok", audio.synth_seconds)
+            return audio, backend
+        raise RuntimeError("No TTS backend is available")
+
+    def stats(self):
+        with self._lock:
+            return {name: dict(stats) for name, stats in self._stats.items()}
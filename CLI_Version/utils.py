@@ -1,92 +1,360 @@
 import os
-import io
+import sys
 import time
-from gtts import gTTS
-from pydub import AudioSegment
-from pydub.playback import play
-import sounddevice as sd
-import vosk
-import json
-import csv
-from datetime import datetime
-
-
-import vosk
-import sounddevice as sd
+import re
 import json
 import threading
+import contextvars
+from concurrent.futures import ThreadPoolExecutor, wait
+from queue import Queue, Empty
 from dotenv import load_dotenv
+from tts_cache import TTSCache
+from tts_backends import TTSEngine, make_backend
+from audio_output import AudioOutput, format_audio_output_stats
+from config import TTS_BACKENDS, TTS_TIMEOUT, TTS_RETRY_AFTER, TTS_LANG, TTS_TLD, ESPEAK_VOICE
+from audio_source import MicrophoneSource
+import metrics
 
 load_dotenv()
 
 VOSK_PATH = os.getenv("VOSK_PATH")
 
+# Vosk model registry: one model per process, shared by every turn and thread
+_vosk_model = None
+_vosk_model_lock = threading.Lock()
+_vosk_model_info = {
+    "path": None,
+    "load_seconds": None,
+    "memory_bytes": None,
+    "disk_bytes": None,
+    "loads": 0,
+}
+
+
+def _current_rss_bytes():
+    """Returns the resident memory of this process in bytes, or None if unknown."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is reported in bytes on macOS and in kilobytes on Linux
+        return peak if sys.platform == "darwin" else peak * 1024
+    except (ImportError, OSError):
+        return None
+
+
+def _directory_size(path):
+    total = 0
+    for root, _dirs, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                pass
+    return total
+
+
+def load_vosk_model(model_path=None, reload=False):
+    """Loads the Vosk model once and returns the shared instance.
+
+    Passing a different model_path (or reload=True) hot-swaps the model; turns
+    already in progress keep the recognizer they were created with.
+    """
+    global _vosk_model
+    model_path = model_path or VOSK_PATH
+    with _vosk_model_lock:
+        if (_vosk_model is not None and not reload
+                and model_path == _vosk_model_info["path"]):
+            return _vosk_model
+
+        import vosk  # deferred: loading its native library slows down startup
+
+        rss_before = _current_rss_bytes()
+        start = time.perf_counter()
+        model = vosk.Model(model_path)
+        load_seconds = time.perf_counter() - start
+        rss_after = _current_rss_bytes()
+
+        _vosk_model = model
+        _vosk_model_info.update(
+            path=model_path,
+            load_seconds=load_seconds,
+            memory_bytes=(rss_after - rss_before
+                          if rss_before is not None and rss_after is not None else None),
+            disk_bytes=_directory_size(model_path) if model_path else None,
+            loads=_vosk_model_info["loads"] + 1,
+        )
+        print(f"Loaded Vosk model from {model_path} in {load_seconds:.2f}s")
+        return model
+
+
+def get_vosk_model():
+    """Returns the shared Vosk model, loading it on first use."""
+    model = _vosk_model
+    if model is not None:
+        return model
+    return load_vosk_model()
+
+
+def reload_vosk_model(model_path=None):
+    """Reloads the model, optionally from a different directory."""
+    return load_vosk_model(model_path, reload=True)
+
+
+def vosk_model_info():
+    """Returns load time, memory and disk usage of the current model."""
+    with _vosk_model_lock:
+        return dict(_vosk_model_info)
+
+# TTS backends and cache of decoded speech
+tts_engine = TTSEngine(
+    [make_backend(name, lang=TTS_LANG, tld=TTS_TLD, espeak_voice=ESPEAK_VOICE) for name in TTS_BACKENDS],
+    timeout=TTS_TIMEOUT,
+    retry_after=TTS_RETRY_AFTER,
+)
+
+tts_cache = TTSCache(
+    cache_dir=os.getenv("TTS_CACHE_DIR", ".tts_cache"),
+    max_memory_items=int(os.getenv("TTS_CACHE_MEMORY_ITEMS", "64")),
+    max_disk_bytes=int(os.getenv("TTS_CACHE_MAX_DISK_MB", "200")) * 1024 * 1024,
+)
+
+
+def synthesize_speech(text):
+    """Returns decoded speech for text, synthesizing it only on a cache miss.
+
+    Audio is cached under the backend that produced it, so speech from a
+    fallback backend is not replayed once the preferred one has recovered.
+    """
+    key = TTSCache.make_key(text, TTS_LANG, TTS_TLD, tts_engine.preferred().name)
+    entry = tts_cache.get(key)
+    if entry is None:
+        entry, backend = tts_engine.synthesize(text)
+        tts_cache.put(TTSCache.make_key(text, TTS_LANG, TTS_TLD, backend.name), entry)
+    return entry
+
+
+def warm_tts_cache(texts):
+    """Synthesizes fixed prompts ahead of time so they play without delay."""
+    for text in texts:
+        try:
+            synthesize_speech(text)
+        except Exception as e:
+            print(f"TTS warm-up failed for {text!r}: {e}")
+
+
+def format_tts_engine_stats(stats):
+    return "TTS backends: " + ", ".join(
+        f"{name} {s['calls']} calls ({s['timeouts']} timeouts, {s['failures']} failures)"
+        for name, s in stats.items()
+    )
+
+
+def format_tts_cache_stats(stats):
+    return (
+        f"TTS cache: {stats['memory_hits']} memory hits, {stats['disk_hits']} disk hits, "
+        f"{stats['misses']} misses ({stats['hit_rate']:.0%} hit rate), "
+        f"{stats['synthesis_seconds_saved']:.1f}s of synthesis saved"
+    )
+
+
+# Speaker output through persistent streams; tools replace play() to silence it
+audio_output = AudioOutput()
+play = audio_output.play
+
+
 # TTS function
+@metrics.timed("tts.speak")
 def speak_text_in_memory(text):
     """Generates and plays speech in memory without saving a file."""
-    mp3_fp = io.BytesIO()
-    tts = gTTS(text=text, lang="en", tld="co.uk")
-    tts.write_to_fp(mp3_fp)
-    mp3_fp.seek(0)
-    audio = AudioSegment.from_file(mp3_fp, format="mp3")
-    play(audio)
+    audio = synthesize_speech(text)
+    with metrics.span("tts.playback"):
+        play(audio)
+
+
+# Streaming TTS: sentence-sized chunks so playback starts after the first one
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+_CLAUSE_END = re.compile(r"(?<=[,;:])\s+")
+
+
+def split_speech_chunks(text, max_chars=200):
+    """Splits text into sentences, breaking long sentences at clause boundaries."""
+    chunks = []
+    for sentence in _SENTENCE_END.split(text.strip()):
+        sentence = sentence.strip()
+        if not sentence:
+            continue
+        if len(sentence) <= max_chars:
+            chunks.append(sentence)
+            continue
+        current = ""
+        for clause in _CLAUSE_END.split(sentence):
+            if current and len(current) + 1 + len(clause) > max_chars:
+                chunks.append(current)
+                current = clause
+            else:
+                current = f"{current} {clause}".strip()
+        if current:
+            chunks.append(current)
+    return chunks
+
+
+@metrics.timed("tts.speak_streaming")
+def speak_text_streaming(text, on_chunk=None):
+    """Speaks text chunk by chunk, synthesizing chunk N+1 while chunk N plays.
+
+    on_chunk(chunk) is called right before each chunk starts playing.
+    Returns the time to first audio in seconds (None if nothing was spoken).
+    """
+    chunks = split_speech_chunks(text)
+    if not chunks:
+        return None
+
+    ready = Queue(maxsize=2)
+    stop = threading.Event()
+
+    def synthesize_chunks():
+        for chunk in chunks:
+            if stop.is_set():
+                break
+            try:
+                ready.put((chunk, synthesize_speech(chunk)))
+            except Exception as e:
+                ready.put((chunk, e))
+        ready.put(None)
+
+    # Run the worker in a copy of this context so its spans count towards this session
+    worker = threading.Thread(target=contextvars.copy_context().run, args=(synthesize_chunks,), daemon=True)
+    start = time.perf_counter()
+    first_audio = None
+    worker.start()
+    try:
+        while (item := ready.get()) is not None:
+            chunk, audio = item
+            if isinstance(audio, Exception):
+                print(f"TTS failed for {chunk!r}: {audio}")
+                continue
+            if first_audio is None:
+                first_audio = time.perf_counter() - start
+            if on_chunk:
+                on_chunk(chunk)
+            with metrics.span("tts.playback"):
+                play(audio)
+    finally:
+        stop.set()
+        # Unblock the worker if playback stopped early
+        while worker.is_alive():
+            try:
+                ready.get(timeout=0.1)
+            except Empty:
+                pass
+    return first_audio
 
 
 # Speech-to-text function
-def transcribe_audio_input():
-    model_path = VOSK_PATH  # Path to the Vosk model directory
+# Factory for the default input; replaced by tools that feed recorded audio
+audio_source_factory = MicrophoneSource
+
+# Enter presses are read by one long-lived thread, so an input() left waiting
+# by a turn that ended on its own never swallows a later key press
+_enter_events = Queue()
+_enter_listener = None
+
+
+def _listen_for_enter():
+    while sys.stdin.readline():
+        _enter_events.put("enter")
+
+
+def get_enter_events():
+    """Returns the queue of Enter presses, starting the stdin reader on first use."""
+    global _enter_listener
+    if _enter_listener is None:
+        _enter_listener = threading.Thread(target=_listen_for_enter, daemon=True)
+        _enter_listener.start()
+    return _enter_events
+
+
+def _end_turn_requested(events):
+    """Drains pending turn-control events; True if one of them ends the turn."""
+    requested = False
+    while True:
+        try:
+            requested = events.get_nowait() == "enter" or requested
+        except Empty:
+            return requested
+
+
+@metrics.timed("stt.transcribe")
+def transcribe_audio_input(on_segment=None, source=None, endpointer=None):
+    """Transcribes one answer from source (the microphone by default).
+
+    The turn ends when the endpointer detects the end of the answer, when the
+    candidate presses Enter (live sources only) or when a recorded source runs
+    out. on_segment(text_so_far) is called whenever the recognizer finalizes a
+    segment.
+    """
     full_transcription = ""
-    stop_flag = {"stop": False}  # Use a mutable object for thread-safe flag
+    source = source or audio_source_factory()
 
-    # 1. Load the Vosk model
+    # 1. Get the shared Vosk model (loaded once per process)
     try:
-        model = vosk.Model(model_path)
+        model = get_vosk_model()
     except Exception as e:
         print(f"Failed to load Vosk model: {e}")
         return ""
 
-    # 2. Configure audio input
-    samplerate = 16000
+    # 2. Open the audio input
     try:
-        device_info = sd.query_devices(None, 'input')
-        device_id = device_info['index']
+        source.open()
     except Exception as e:
         print(f"Audio input device error: {e}")
         return ""
 
-    # 3. Function to detect Enter key press
-    def wait_for_enter():
-        input("Press Enter to stop transcription...\n")
-        stop_flag["stop"] = True
+    # 3. Enter still ends the turn by hand; presses made before the turn started are dropped
+    turn_events = None
+    if source.live:
+        turn_events = get_enter_events()
+        _end_turn_requested(turn_events)
+        print("Press Enter to stop transcription...")
 
-    # Start the Enter key listener in a separate thread
-    threading.Thread(target=wait_for_enter, daemon=True).start()
+    import vosk
 
-    recognizer = vosk.KaldiRecognizer(model, samplerate)
+    recognizer = vosk.KaldiRecognizer(model, source.sample_rate)
     print("Listening for continuous speech...")
 
     try:
-        with sd.RawInputStream(samplerate=samplerate, blocksize=2000,
-                               device=device_id, dtype='int16', channels=1) as stream:
-            while not stop_flag["stop"]:
-                data, overflow = stream.read(stream.blocksize)
-                if overflow:
-                    print("Audio buffer overflow detected.")
-
-                wav_data = bytes(data)
-
-                if recognizer.AcceptWaveform(wav_data):
-                    result = json.loads(recognizer.Result())
-                    text = result.get('text', '')
-                    if text:
-                        full_transcription += " " + text
-                else:
-                    partial_result = json.loads(recognizer.PartialResult())
-                    partial_text = partial_result.get('partial', '')
+        while True:
+            if turn_events is not None and _end_turn_requested(turn_events):
+                print("Turn ended manually.")
+                break
+            wav_data = source.read(2000)
+            if not wav_data:
+                break
+
+            text = ""
+            if recognizer.AcceptWaveform(wav_data):
+                result = json.loads(recognizer.Result())
+                text = result.get('text', '')
+                if text:
+                    full_transcription += " " + text
+                    if on_segment:
+                        on_segment(full_transcription.strip())
+
+            if endpointer is not None:
+                reason = endpointer.update(wav_data, final=bool(text))
+                if reason:
+                    print(f"End of turn detected ({reason}).")
+                    break
 
     except Exception as e:
         print(f"\nAn error occurred: {e}")
     finally:
+        source.close()
         # Get any remaining transcription
         final_result = json.loads(recognizer.FinalResult())
         text = final_result.get('text', '')
@@ -97,51 +365,111 @@ def transcribe_audio_input():
 
 
 # JSON output function
-def json_output_responses(responses, json_chain, filename="interview_responses.json"):
-    transcript = "\n".join([f"{q}\n{a}" for q, a in responses.items()])
-    result = json_chain.invoke({"transcript": transcript})
-    summary_text = result.get("text", "").strip()
+def format_transcript(responses):
+    return "\n".join([f"{q}\n{a}" for q, a in responses.items()])
+
 
-    summary_text = summary_text.replace("```json", "").replace("```", "").strip()
+def parse_json_output(text):
+    """Parses the JSON object an LLM returned, tolerating markdown code fences.
 
+    Anything but an object (a list, a bare string, ...) counts as a parse error.
+    """
+    text = text.strip().replace("```json", "").replace("```", "").strip()
     try:
-        structured_data = json.loads(summary_text)
+        data = json.loads(text)
     except json.JSONDecodeError:
-        structured_data = {"error": "Could not parse JSON", "raw_output": summary_text}
+        return {"error": "Could not parse JSON", "raw_output": text}
+    if not isinstance(data, dict):
+        return {"error": f"Expected a JSON object, got {type(data).__name__}", "raw_output": text}
+    return data
 
+
+@metrics.timed("io.write_json")
+def write_json_output(structured_data, filename="interview_responses.json"):
     with open(filename, "w", encoding="utf-8") as f:
         json.dump(structured_data, f, ensure_ascii=False, indent=2)
 
-# CSV output function
-def csv_log_responses(text, speaker, filename="interview_session.csv"):
-    with open(filename, mode="a", newline="", encoding="utf-8") as f:
-        writer = csv.writer(f)
-        if f.tell() == 0:
-            writer.writerow(["Time", "Speaker", "Text"])
-
-        current_time = datetime.now().strftime("%H:%M:%S")
-        writer.writerow([current_time, speaker, text])
-
-# CSV speaker name overwrite function
-def overwrite_csv(filename="interview_session.csv"):
-    if not os.path.exists('interview_responses.json'):
-        print("interview_responses.json not found. Cannot overwrite CSV.")
-        return
-
-    with open('interview_responses.json', 'r') as f:
-        data = json.load(f)
-
-    name = data.get("Name", "User")
-    rows = []
-
-    with open(filename, mode="r", newline="", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            if row["Speaker"] == "User":
-                row["Speaker"] = name
-            rows.append(row)
-
-    with open(filename, mode="w", newline="", encoding="utf-8") as f:
-        writer = csv.DictWriter(f, fieldnames=["Time", "Speaker", "Text"])
-        writer.writeheader()
-        writer.writerows(rows)
\ No newline at end of file
+
+def json_output_responses(responses, json_chain, filename="interview_responses.json"):
+    result = json_chain.invoke({"transcript": format_transcript(responses)})
+    structured_data = parse_json_output(result.get("text", ""))
+    write_json_output(structured_data, filename)
+
+
+# End-of-interview LLM work, run concurrently on a small shared pool
+_wrap_up_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="wrap-up")
+
+
+def wrap_up_interview(responses, summary_chain, json_chain, wrap_up_chain=None, timeout=60):
+    """Produces the summary and the structured JSON for a finished interview.
+
+    The summary and JSON chains run in parallel; with wrap_up_chain a single call
+    returns both. Returns (summary, structured_data, timings) where timings holds
+    seconds per chain plus the wall-clock total; a chain that missed the timeout
+    or raised has "timed out after Ns" or "failed: <exception type>" instead.
+    Either way it yields an empty summary or an error entry instead of blocking
+    the session.
+
+    A call that has not started by then is cancelled. One already in flight
+    cannot be interrupted: it runs on (and is billed) until the LLM client's
+    own timeout, LLM_TIMEOUT per attempt, releases its worker.
+    """
+    transcript = format_transcript(responses)
+    timings = {}
+
+    def timed(chain):
+        start = time.perf_counter()
+        text = chain.invoke({"transcript": transcript}).get("text", "")
+        return text, time.perf_counter() - start
+
+    if wrap_up_chain is not None:
+        calls = {"wrap_up": wrap_up_chain}
+    else:
+        calls = {"summary": summary_chain, "json": json_chain}
+
+    start = time.perf_counter()
+    futures = {
+        name: _wrap_up_executor.submit(contextvars.copy_context().run, timed, chain)
+        for name, chain in calls.items()
+    }
+    wait(futures.values(), timeout=timeout)
+
+    outputs = {}
+    for name, future in futures.items():
+        if not future.done():
+            future.cancel()
+            print(f"{name} chain timed out after {timeout}s")
+            timings[name] = f"timed out after {timeout:g}s"
+            continue
+        try:
+            outputs[name], timings[name] = future.result()
+        except Exception as e:
+            print(f"{name} chain failed: {e}")
+            timings[name] = f"failed: {type(e).__name__}"
+    timings["total"] = time.perf_counter() - start
+
+    if wrap_up_chain is not None:
+        if "wrap_up" not in outputs:
+            return "", {"error": f"Wrap-up chain {timings['wrap_up']}"}, timings
+        combined = parse_json_output(outputs["wrap_up"])
+        if "error" in combined:
+            return "", combined, timings
+        profile = combined.get("profile", {})
+        if not isinstance(profile, dict):
+            profile = {"error": "Expected profile to be a JSON object", "raw_output": outputs["wrap_up"]}
+        return str(combined.get("summary", "")).strip(), profile, timings
+
+    summary = outputs.get("summary", "").strip()
+    if "json" in outputs:
+        structured_data = parse_json_output(outputs["json"])
+    else:
+        structured_data = {"error": f"JSON chain {timings['json']}"}
+    return summary, structured_data, timings
+
+
+def format_wrap_up_timings(timings):
+    parts = [
+        f"{name} {f'{seconds:.2f}s' if isinstance(seconds, float) else seconds}"
+        for name, seconds in timings.items()
+    ]
+    return "Wrap-up timings: " + ", ".join(parts)
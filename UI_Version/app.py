@@ -1,66 +1,191 @@
-from flask import Flask, render_template
-from flask_socketio import SocketIO
-import threading
+import argparse
 import os
-import signal
-import sys
-from global_control import event_queue
+import threading
+
+import numpy as np
+from flask import Flask, Response, render_template, request
+from flask_socketio import SocketIO, emit
+from config import (
+    MAX_CONCURRENT_INTERVIEWS,
+    SESSION_OUTPUT_DIR,
+    TRANSCRIPT_PARTIAL_INTERVAL,
+    AUDIO_INPUT,
+    AUDIO_OUTPUT,
+    STT_WORKERS,
+    WARM_UP,
+    FLASK_DEBUG,
+)
+from global_control import check_cancelled, get_current_session
+from session_manager import SessionManager, SessionLimitReached
 import main
-from main import speak_text_in_memory
+import utils
+from main import speak_text_in_memory, speak_text_streaming, transcribe_audio_input
+from metrics import render_prometheus
+from stt_pool import STTWorkerPool
+import startup_profile
 
 app = Flask(__name__)
 app.config['SECRET_KEY'] = 'secret!'
+app.debug = FLASK_DEBUG
 socketio = SocketIO(app, cors_allowed_origins="*")
 
-# Keep a reference to the interview thread
-interview_thread = None
+# One interview per connected browser tab, keyed by Socket.IO session id
+session_manager = SessionManager(
+    max_sessions=MAX_CONCURRENT_INTERVIEWS, output_root=SESSION_OUTPUT_DIR
+)
 
 @app.route("/")
 def index():
     return render_template("index.html")
 
 
+@app.route("/metrics")
+def metrics():
+    """Per-stage latency histograms and LLM token counts for Prometheus to scrape."""
+    text = render_prometheus()
+    if utils.stt_pool is not None:
+        text += utils.stt_pool.render_prometheus()
+    text += main.token_usage.render_prometheus()
+    return Response(text, mimetype="text/plain; version=0.0.4")
+
+
+def emit_to_session(event, data):
+    """Emits to the room of the interview this code runs for."""
+    session = get_current_session()
+    if session is not None:
+        socketio.emit(event, data, to=session.sid)
+    else:
+        socketio.emit(event, data)
+
+
+# With browser output, the bot's voice goes to the tab as 16-bit PCM, like its subtitles
+original_play = utils.play
+def play_in_browser(audio):
+    session = get_current_session()
+    if AUDIO_OUTPUT != "browser" or session is None:
+        return original_play(audio)
+    pcm = np.frombuffer(audio.pcm, dtype={1: np.uint8, 2: "<i2", 4: "<i4"}[audio.sample_width])
+    if audio.sample_width == 1:
+        pcm = (pcm.astype(np.int16) - 128) << 8
+    elif audio.sample_width == 4:
+        pcm = pcm >> 16
+    pcm = pcm.astype("<i2").tobytes()
+    socketio.emit("bot_audio", {"pcm": pcm, "sample_rate": audio.frame_rate, "channels": audio.channels},
+                  to=session.sid)
+    # Return once the page has played it, as the server speakers would, so
+    # listening does not start while the bot is still talking
+    duration = len(pcm) / (2 * audio.channels * audio.frame_rate)
+    session.cancelled.wait(duration)
+
+utils.play = play_in_browser
+
+
 # Patch speak_text_in_memory to emit to frontend
 original_speak = speak_text_in_memory
 def speak_and_emit(text):
-    socketio.emit("bot_speaking", {"text": text})
+    check_cancelled()
+    emit_to_session("bot_speaking", {"text": text})
     original_speak(text)
 
 main.speak_text_in_memory = speak_and_emit
 
 
-def run_interview_thread():
-    main.run_interview()
+# Long answers are streamed; emit a subtitle as each sentence starts playing
+original_speak_streaming = speak_text_streaming
+def speak_streaming_and_emit(text):
+    check_cancelled()
+    original_speak_streaming(
+        text, on_chunk=lambda chunk: emit_to_session("bot_speaking", {"text": chunk})
+    )
+
+main.speak_text_streaming = speak_streaming_and_emit
+
+
+# Show the candidate's words while they speak; partials are throttled in the recognizer loop.
+# With browser audio, each session transcribes what its own tab streams in.
+original_transcribe = transcribe_audio_input
+def transcribe_and_emit(*args, **kwargs):
+    session = get_current_session()
+    if AUDIO_INPUT == "browser" and session is not None and kwargs.get("source") is None:
+        kwargs["source"] = session.audio
+
+    def on_transcript(text, final):
+        emit_to_session("user_transcript", {"text": text, "final": final})
+    return original_transcribe(
+        *args, on_transcript=on_transcript, partial_interval=TRANSCRIPT_PARTIAL_INTERVAL, **kwargs
+    )
+
+main.transcribe_audio_input = transcribe_and_emit
+
+
+async def run_interview_session(session):
+    # Tell the page (or a test client) when to start talking
+    session.audio.on_open = lambda: emit_to_session("listening", {})
+    await main.run_interview_async(output_dir=session.output_dir)
+    emit_to_session("interview_finished", {"text": "The interview is complete. Thank you!"})
 
 
 @socketio.on("start_interview")
 def handle_start(_data):
-    global interview_thread
-    if interview_thread is None or not interview_thread.is_alive():
-        interview_thread = threading.Thread(target=run_interview_thread)
-        interview_thread.start()
+    try:
+        session_manager.start(request.sid, run_interview_session)
+    except SessionLimitReached:
+        emit("server_busy", {"text": "All interviewers are busy right now. Please try again shortly."})
 
 
 @socketio.on("user_end_turn")
 def handle_user_end_turn(_data):
-    """Simulate pressing Enter for user"""
-    event_queue.put("enter")
-    socketio.emit("user_speaking", {"text": "⏎ Enter pressed"})
+    """Simulate pressing Enter for this tab's candidate only"""
+    session = session_manager.get(request.sid)
+    if session is not None:
+        session.end_turn()
+        emit("user_speaking", {"text": "⏎ Enter pressed"})
+
+
+@socketio.on("audio_chunk")
+def handle_audio_chunk(data):
+    """16 kHz mono int16 PCM from the tab's microphone.
+
+    The return value is the acknowledgement the client waits for before
+    sending more, which bounds how much audio can be in flight.
+    """
+    session = session_manager.get(request.sid)
+    if session is None or not isinstance(data, (bytes, bytearray)):
+        return {"listening": False, "buffered": 0.0}
+    buffered = session.audio.push(bytes(data))
+    return {"listening": session.audio.listening, "buffered": buffered}
 
 
 @socketio.on("end_call")
 def handle_end_call(_data):
-    """Safely terminate the interview and stop the server"""
-    # Attempt to stop interview thread if running
-    if interview_thread and interview_thread.is_alive():
-        os.kill(os.getpid(), signal.SIGINT)  # raises KeyboardInterrupt in main thread
+    """Stop this tab's interview; other sessions keep running"""
+    session_manager.end(request.sid)
+    emit("call_ended", {"text": "Call has ended."})
 
-    # Emit a message to clients (optional)
-    socketio.emit("call_ended", {"text": "Call has ended."})
 
-    # Exit the process after short delay
-    threading.Timer(1.0, lambda: sys.exit(0)).start()
+@socketio.on("disconnect")
+def handle_disconnect(*_args):
+    session_manager.end(request.sid)
 
 
 if __name__ == "__main__":
-    socketio.run(app, host="0.0.0.0", port=5001, debug=True)
+    parser = argparse.ArgumentParser(description="Serve the interview page.")
+    parser.add_argument("--profile-startup", action="store_true",
+                        help="report import and warm-up time per module, then exit")
+    args = parser.parse_args()
+    if args.profile_startup:
+        main.warm_up(main.fixed_lines())
+        print(startup_profile.report("app"))
+        raise SystemExit
+    # Under the debug reloader only the child process serves requests; the
+    # watcher process must not fork a pool or load models of its own
+    if not app.debug or os.environ.get("WERKZEUG_RUN_MAIN") == "true":
+        if STT_WORKERS:
+            # Forked while the process has no other threads: before the warm-up
+            # thread, and before the first interview starts the session loop
+            utils.stt_pool = STTWorkerPool(STT_WORKERS).start()
+        if WARM_UP:
+            # The server takes requests right away; the first interview finds
+            # the models loaded and its fixed lines synthesized
+            threading.Thread(target=main.warm_up, args=(main.fixed_lines(),), name="warm-up", daemon=True).start()
+    socketio.run(app, host="0.0.0.0", port=5001, debug=app.debug, allow_unsafe_werkzeug=True)
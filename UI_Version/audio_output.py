@@ -0,0 +1,179 @@
+import importlib.util
+import io
+import threading
+import time
+
+try:
+    import miniaudio  # optional: decodes MP3 in-process instead of spawning ffmpeg
+except ImportError:
+    miniaudio = None
+
+
+_decode_lock = threading.Lock()
+_decode_stats = {"in_process": 0, "ffmpeg": 0, "decode_seconds": 0.0}
+
+
+def decode_mp3(data):
+    """Decodes MP3 bytes to (pcm, frame_rate, sample_width, channels).
+
+    Uses miniaudio when it is installed and falls back to pydub, which runs
+    one ffmpeg process per call.
+    """
+    start = time.perf_counter()
+    if miniaudio is not None:
+        decoded = miniaudio.decode(data, output_format=miniaudio.SampleFormat.SIGNED16)
+        result = (decoded.samples.tobytes(), decoded.sample_rate, 2, decoded.nchannels)
+        kind = "in_process"
+    else:
+        from pydub import AudioSegment
+
+        audio = AudioSegment.from_file(io.BytesIO(data), format="mp3")
+        result = (audio.raw_data, audio.frame_rate, audio.sample_width, audio.channels)
+        kind = "ffmpeg"
+    with _decode_lock:
+        _decode_stats[kind] += 1
+        _decode_stats["decode_seconds"] += time.perf_counter() - start
+    return result
+
+
+def _pydub_player():
+    """What pydub.playback.play would use here; only ffplay needs a temp file and a process."""
+    for module in ("simpleaudio", "pyaudio"):
+        if importlib.util.find_spec(module) is not None:
+            return module
+    return "ffplay"
+
+
+WRITE_CHUNK_SECONDS = 0.1
+
+
+class AudioOutput:
+    """Plays decoded speech through long-lived sounddevice output streams.
+
+    PCM is written straight from the cached buffer, so an utterance costs no
+    AudioSegment copy, no temp WAV and no player process. Streams are kept
+    open between utterances, one per audio format and concurrent speaker
+    (interview sessions in the UI each speak on their own). Without a usable
+    output device, playback falls back to pydub; when that fails too, output
+    is disabled and the interview goes on with subtitles only.
+
+    PCM is written in short chunks, so when a stream fails partway the
+    fallback plays only what the device has not been given yet.
+    """
+
+    def __init__(self, device=None):
+        self.device = device
+        self._idle = {}  # (frame_rate, sample_width, channels) -> open streams not in use
+        self._fallback = False
+        self._disabled = False  # no way to play audio here; utterances are skipped
+        self._lock = threading.Lock()
+        self._pydub_player = None
+        self._stats = {"utterances": 0, "streamed": 0, "fallback": 0, "stream_opens": 0,
+                       "skipped": 0, "bytes_streamed": 0, "seconds_played": 0.0}
+
+    def _checkout(self, audio_format):
+        with self._lock:
+            idle = self._idle.get(audio_format)
+            if idle:
+                return idle.pop()
+            self._stats["stream_opens"] += 1
+        import sounddevice as sd
+
+        frame_rate, sample_width, channels = audio_format
+        stream = sd.RawOutputStream(samplerate=frame_rate, channels=channels,
+                                    dtype=f"int{8 * sample_width}", device=self.device)
+        stream.start()
+        return stream
+
+    def play(self, audio):
+        """Plays a CachedAudio and returns once it has been handed to the device."""
+        with self._lock:
+            self._stats["utterances"] += 1
+            self._stats["seconds_played"] += (
+                len(audio.pcm) / (audio.frame_rate * audio.sample_width * audio.channels)
+            )
+            fallback = self._fallback
+            if self._disabled:
+                self._stats["skipped"] += 1
+                return
+        pcm = memoryview(audio.pcm)
+        if not fallback:
+            audio_format = (audio.frame_rate, audio.sample_width, audio.channels)
+            frame_bytes = audio.sample_width * audio.channels
+            chunk = max(1, int(audio.frame_rate * WRITE_CHUNK_SECONDS)) * frame_bytes
+            written = 0
+            stream = None
+            try:
+                stream = self._checkout(audio_format)
+                while written < len(pcm):
+                    stream.write(pcm[written:written + chunk])
+                    written = min(written + chunk, len(pcm))
+            except Exception as e:
+                print(f"Audio output stream unavailable, falling back to pydub: {e}")
+                with self._lock:
+                    self._fallback = True
+                    self._stats["bytes_streamed"] += written
+                if stream is not None:
+                    try:
+                        stream.close()
+                    except Exception:
+                        pass
+                pcm = pcm[written:]
+                if not pcm:
+                    return
+            else:
+                with self._lock:
+                    self._idle.setdefault(audio_format, []).append(stream)
+                    self._stats["streamed"] += 1
+                    self._stats["bytes_streamed"] += len(audio.pcm)
+                return
+        with self._lock:
+            self._stats["fallback"] += 1
+        try:
+            from pydub import AudioSegment
+            from pydub.playback import play
+
+            play(AudioSegment(data=bytes(pcm), sample_width=audio.sample_width,
+                              frame_rate=audio.frame_rate, channels=audio.channels))
+        except Exception as e:
+            # A missing speaker must not end the interview
+            with self._lock:
+                already_disabled, self._disabled = self._disabled, True
+                self._stats["skipped"] += 1
+            if not already_disabled:
+                print(f"Audio playback failed, continuing without sound (subtitles only): {e}")
+
+    def close(self):
+        with self._lock:
+            streams = [stream for idle in self._idle.values() for stream in idle]
+            self._idle = {}
+        for stream in streams:
+            stream.close()
+
+    def stats(self):
+        """Playback and decode counts, with the work the pydub path would have done."""
+        with self._lock:
+            stats = dict(self._stats)
+        with _decode_lock:
+            stats["decode_in_process"] = _decode_stats["in_process"]
+            stats["decode_ffmpeg"] = _decode_stats["ffmpeg"]
+            stats["decode_seconds"] = _decode_stats["decode_seconds"]
+        if self._pydub_player is None:
+            self._pydub_player = _pydub_player()
+        stats["pydub_player"] = self._pydub_player
+        # pydub copies the PCM into an AudioSegment, and ffplay also gets it as a temp WAV
+        copies = 2 if self._pydub_player == "ffplay" else 1
+        stats["bytes_not_copied"] = stats["bytes_streamed"] * copies
+        stats["processes_avoided"] = stats["decode_in_process"] + (
+            stats["streamed"] if self._pydub_player == "ffplay" else 0
+        )
+        return stats
+
+
+def format_audio_output_stats(stats):
+    return (
+        f"Audio output: {stats['streamed']}/{stats['utterances']} utterances streamed "
+        f"({stats['stream_opens']} stream opens, {stats['skipped']} skipped without an output device), {stats['decode_in_process']} in-process and "
+        f"{stats['decode_ffmpeg']} ffmpeg decodes; {stats['processes_avoided']} process launches and "
+        f"{stats['bytes_not_copied'] / 1e6:.1f} MB of copies avoided"
+    )
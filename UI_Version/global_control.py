@@ -1,3 +1,33 @@
+import contextvars
 from queue import Queue
 
-event_queue = Queue()
\ No newline at end of file
+# Turn-control channel used when no interview session is active (e.g. `python main.py`)
+event_queue = Queue()
+
+# Interview session owning the current thread, set by the session manager
+_current_session = contextvars.ContextVar("current_session", default=None)
+
+
+class InterviewCancelled(Exception):
+    """Raised inside an interview thread once its session has been ended."""
+
+
+def set_current_session(session):
+    return _current_session.set(session)
+
+
+def get_current_session():
+    return _current_session.get()
+
+
+def get_event_queue():
+    """Returns the turn-control queue of the current session."""
+    session = _current_session.get()
+    return session.event_queue if session is not None else event_queue
+
+
+def check_cancelled():
+    """Stops the current interview if its session has been ended."""
+    session = _current_session.get()
+    if session is not None and session.cancelled.is_set():
+        raise InterviewCancelled(session.sid)
@@ -0,0 +1,202 @@
+import csv
+import os
+import random
+import re
+import threading
+
+import numpy as np
+
+NO_QUESTION = "no_question"
+HAS_QUESTION = "has_question"
+LABELS = (NO_QUESTION, HAS_QUESTION)
+
+_HERE = os.path.dirname(os.path.abspath(__file__))
+# The model is trained on SAMPLES_PATH; HOLDOUT_PATH was written apart from the
+# rules and samples and is only used to measure them
+SAMPLES_PATH = os.path.join(_HERE, "intent_samples.csv")
+HOLDOUT_PATH = os.path.join(_HERE, "intent_holdout.csv")
+
+# Vosk transcripts are lowercase without punctuation, so the rules look at words
+_FILLERS = {"uh", "um", "erm", "hmm", "well", "so", "okay", "ok"}
+_QUESTION_WORDS = {"what", "what's", "how", "when", "where", "who", "which", "why", "whom"}
+_AUXILIARY_OPENERS = {"is", "are", "do", "does", "did", "can", "could", "would",
+                      "will", "should", "may", "am"}
+_CLAUSE_OPENERS = {"but", "yes", "yeah", "actually", "also", "and", "except"}
+_QUESTION_PHRASES = re.compile(
+    r"\b(i was wondering|i wanted to ask|i'd like to know|i would like to know"
+    r"|(a|one|few|couple of) questions?|i have (a|some|few|couple of) questions?"
+    r"|tell me (about|more)|any chance)\b"
+)
+# Saying there is nothing to ask, which the question words in it must not outweigh
+_NEGATED_QUESTION_PHRASES = re.compile(
+    r"\b((i )?(have )?no idea|(i )?(don't|do not)( really)? know|(i'm |i am )?not sure"
+    r"|(i )?(can't|cannot) think of)( \w+)? (what|anything)( else| more)? to ask"
+    r"|\bnothing( else| more)? to ask\b"
+)
+_NO_QUESTION_PHRASES = re.compile(
+    r"^(no|nope|nah|none|nothing|not really|not (at the moment|right now|for now))\b"
+    r"|\b(no (more )?questions|i (don't|do not) have any( more)? questions"
+    r"|i have no (more )?questions|that's (all|it|everything)|that is all"
+    r"|(i'm|i am) (good|fine|all set)|all (good|set)|everything is clear|it's all clear"
+    r"|covered everything|answered everything|(let's|we can) (proceed|move on|finish))\b"
+)
+
+
+def tokenize(text):
+    return [t for t in re.findall(r"[a-z']+", text.lower()) if t not in _FILLERS]
+
+
+def _features(text):
+    tokens = tokenize(text)
+    features = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+    if "?" in text:
+        features.append("<?>")
+    return features
+
+
+def load_samples(path=SAMPLES_PATH):
+    """Loads (text, label) pairs from the labeled sample set."""
+    with open(path, newline="", encoding="utf-8") as f:
+        return [(row["text"], row["label"]) for row in csv.DictReader(f)]
+
+
+class IntentClassifier:
+    """Decides no_question vs has_question locally when it is confident.
+
+    Clear-cut inputs are settled by rules; the rest go through a multinomial
+    naive Bayes model over word unigrams and bigrams. predict() returns None
+    when neither is confident, and the caller falls back to the LLM chain.
+    """
+
+    def __init__(self, samples=None, threshold=0.9):
+        self.threshold = threshold
+        self._lock = threading.Lock()
+        self._counts = {"rule": 0, "model": 0, "llm": 0}
+        self._fit(samples if samples is not None else load_samples())
+
+    def _fit(self, samples, alpha=1.0):
+        vocabulary = {}
+        rows = []
+        for text, _label in samples:
+            rows.append([vocabulary.setdefault(f, len(vocabulary)) for f in _features(text)])
+        counts = np.zeros((len(LABELS), len(vocabulary)))
+        doc_counts = np.zeros(len(LABELS))
+        for indices, (_text, label) in zip(rows, samples):
+            k = LABELS.index(label)
+            np.add.at(counts[k], indices, 1)
+            doc_counts[k] += 1
+        self._vocabulary = vocabulary
+        self._log_prior = np.log((doc_counts + alpha) / (doc_counts.sum() + alpha * len(LABELS)))
+        smoothed = counts + alpha
+        self._log_likelihood = np.log(smoothed / smoothed.sum(axis=1, keepdims=True))
+
+    def _rule(self, text):
+        tokens = tokenize(text)
+        if not tokens:
+            return NO_QUESTION
+        normalized = " ".join(tokens)
+        negated = _NEGATED_QUESTION_PHRASES.search(normalized)
+        if negated is not None:
+            tokens = tokenize(normalized[:negated.start()] + " " + normalized[negated.end():])
+            normalized = " ".join(tokens)
+        # Question words and auxiliaries only count opening a clause: "what is
+        # the salary" asks, "i think i have what i need" does not
+        asks = ("?" in text
+                or any((t in _AUXILIARY_OPENERS or t in _QUESTION_WORDS)
+                       and (i == 0 or tokens[i - 1] in _CLAUSE_OPENERS)
+                       for i, t in enumerate(tokens))
+                or _QUESTION_PHRASES.search(normalized) is not None)
+        declines = negated is not None or _NO_QUESTION_PHRASES.search(normalized) is not None
+        if declines and not asks:
+            return NO_QUESTION
+        if asks and not declines:
+            return HAS_QUESTION
+        return None
+
+    def _model(self, text):
+        x = np.zeros(len(self._vocabulary))
+        for f in _features(text):
+            index = self._vocabulary.get(f)
+            if index is not None:
+                x[index] += 1
+        scores = self._log_prior + self._log_likelihood @ x
+        posterior = np.exp(scores - scores.max())
+        posterior /= posterior.sum()
+        best = int(posterior.argmax())
+        return LABELS[best], float(posterior[best])
+
+    def predict(self, text):
+        """Returns (label, source) with source "rule" or "model", or (None, None)."""
+        label = self._rule(text)
+        if label is not None:
+            return label, "rule"
+        label, confidence = self._model(text)
+        if confidence >= self.threshold:
+            return label, "model"
+        return None, None
+
+    def classify(self, text, no_question_chain):
+        """Returns the intent of text, asking the LLM only for ambiguous input."""
+        label, source = self.predict(text)
+        if label is None:
+            source = "llm"
+            label = no_question_chain.invoke({"user_input": text})["text"].strip().lower()
+        with self._lock:
+            self._counts[source] += 1
+        return label
+
+    def stats(self, since=None):
+        """Replies settled by each source, optionally relative to an earlier snapshot."""
+        with self._lock:
+            counts = dict(self._counts)
+        if since:
+            for source in counts:
+                counts[source] -= since.get(source, 0)
+        total = sum(counts.values())
+        counts["fast_path_rate"] = (counts["rule"] + counts["model"]) / total if total else 0.0
+        return counts
+
+
+def evaluate(samples=None, holdout=None, threshold=0.9):
+    """Measures the fast path on the held-out set, with the model trained on samples.
+
+    Cross-validating on samples would flatter the rules, which were written
+    against them. Returns the fast-path hit rate and the accuracy of the
+    answers it gave, overall and split by rule and model, and the held-out
+    inputs it got wrong.
+    """
+    samples = samples if samples is not None else load_samples()
+    holdout = holdout if holdout is not None else load_samples(HOLDOUT_PATH)
+    classifier = IntentClassifier(samples, threshold=threshold)
+    results = {"rule": [0, 0], "model": [0, 0]}  # [answered, correct]
+    errors = []
+    for text, label in holdout:
+        predicted, source = classifier.predict(text)
+        if predicted is not None:
+            results[source][0] += 1
+            results[source][1] += predicted == label
+            if predicted != label:
+                errors.append((text, label, predicted, source))
+    answered = sum(r[0] for r in results.values())
+    correct = sum(r[1] for r in results.values())
+    return {
+        "samples": len(holdout),
+        "fast_path_rate": answered / len(holdout) if holdout else 0.0,
+        "accuracy": correct / answered if answered else 0.0,
+        "rule_answers": results["rule"][0],
+        "rule_accuracy": results["rule"][1] / results["rule"][0] if results["rule"][0] else 0.0,
+        "model_answers": results["model"][0],
+        "model_accuracy": results["model"][1] / results["model"][0] if results["model"][0] else 0.0,
+        "errors": errors,
+    }
+
+
+if __name__ == "__main__":
+    report = evaluate()
+    print(f"Held-out samples: {report['samples']}")
+    print(f"Fast-path hit rate: {report['fast_path_rate']:.1%}")
+    print(f"Fast-path accuracy: {report['accuracy']:.1%}")
+    print(f"  rules: {report['rule_answers']} answers, {report['rule_accuracy']:.1%} accurate")
+    print(f"  model: {report['model_answers']} answers, {report['model_accuracy']:.1%} accurate")
+    for text, label, predicted, source in report["errors"]:
+        print(f"  wrong ({source}): {text!r} is {label}, not {predicted}")
@@ -0,0 +1,136 @@
+"""Call policy shared by every chain: timeouts, bounded concurrency and retries.
+
+All chains use one chat model (config.get_llm()), so they share one HTTP
+client and its keep-alive connection pool. LLMClient.call() adds what the
+client lacks:
+
+- a timeout per chain, passed to each request;
+- at most max_concurrency requests in flight across all interviews, which also
+  bounds the connections the pool keeps open;
+- retries of timeouts, connection errors, 429 and 5xx responses, after a
+  jittered exponential backoff;
+- a latency budget per turn: once the candidate has answered, everything the
+  bot does before replying (waiting for a slot, every attempt and backoff)
+  must fit in turn_budget seconds.
+"""
+import contextvars
+import random
+import threading
+import time
+
+import metrics
+
+_turn_deadline = contextvars.ContextVar("llm_turn_deadline", default=None)
+
+
+class LLMBudgetExceeded(TimeoutError):
+    """Raised when a call cannot finish within the current turn's budget."""
+
+
+def is_retryable(error):
+    status = getattr(error, "status_code", None)
+    if status is not None:
+        return status in (408, 409, 429) or status >= 500
+    # anthropic.APITimeoutError subclasses APIConnectionError
+    return isinstance(error, (TimeoutError, ConnectionError)) or type(error).__name__ in (
+        "APIConnectionError", "APITimeoutError",
+    )
+
+
+class LLMClient:
+    def __init__(self, max_concurrency=8, timeout=20.0, timeouts=None, max_retries=2,
+                 backoff=0.5, max_backoff=4.0, turn_budget=None):
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.timeouts = dict(timeouts or {})  # chain name -> seconds
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.turn_budget = turn_budget
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._stats = {"calls": 0, "attempts": 0, "retries": 0, "failures": 0,
+                       "budget_exceeded": 0, "max_in_flight": 0, "wait_seconds": 0.0}
+
+    # Turn budget
+
+    def start_turn(self):
+        """Starts the budget for the bot's reply; called once the candidate has answered."""
+        _turn_deadline.set(time.monotonic() + self.turn_budget if self.turn_budget else None)
+
+    def clear_turn(self):
+        """Lifts the budget, e.g. while the candidate speaks or for end-of-interview work."""
+        _turn_deadline.set(None)
+
+    def remaining(self):
+        """Seconds left in the current turn's budget, or None without one."""
+        deadline = _turn_deadline.get()
+        return None if deadline is None else deadline - time.monotonic()
+
+    # Calls
+
+    def _count(self, key, amount=1):
+        with self._lock:
+            self._stats[key] += amount
+
+    def _budget_exceeded(self, name):
+        self._count("budget_exceeded")
+        return LLMBudgetExceeded(f"{name} call does not fit in the {self.turn_budget:.0f}s turn budget")
+
+    def call(self, name, request):
+        """Runs request(timeout) under the policy and returns its result.
+
+        request performs one attempt, giving up after timeout seconds.
+        """
+        self._count("calls")
+        timeout = self.timeouts.get(name, self.timeout)
+        attempt = 0
+        while True:
+            remaining = self.remaining()
+            if remaining is not None and remaining <= 0:
+                raise self._budget_exceeded(name)
+            start = time.perf_counter()
+            if not self._slots.acquire(timeout=remaining):
+                raise self._budget_exceeded(name)
+            waited = time.perf_counter() - start
+            self._count("wait_seconds", waited)
+            metrics.observe("llm.queue_wait", waited, top_level=False)
+            with self._lock:
+                self._in_flight += 1
+                self._stats["attempts"] += 1
+                self._stats["max_in_flight"] = max(self._stats["max_in_flight"], self._in_flight)
+            try:
+                remaining = self.remaining()
+                return request(timeout if remaining is None else max(min(timeout, remaining), 0.1))
+            except Exception as e:
+                if attempt >= self.max_retries or not is_retryable(e):
+                    self._count("failures")
+                    raise
+                error = e
+            finally:
+                with self._lock:
+                    self._in_flight -= 1
+                self._slots.release()
+
+            # Full jitter keeps sessions that failed together from retrying together
+            delay = random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+            remaining = self.remaining()
+            if remaining is not None and remaining <= delay:
+                raise self._budget_exceeded(name) from error
+            attempt += 1
+            self._count("retries")
+            print(f"LLM {name} call failed ({type(error).__name__}: {error}), retry {attempt} in {delay:.1f}s")
+            time.sleep(delay)
+
+    def stats(self):
+        with self._lock:
+            return dict(self._stats, in_flight=self._in_flight)
+
+
+def format_llm_client_stats(stats):
+    return (
+        f"LLM calls: {stats['calls']} ({stats['attempts']} attempts, {stats['retries']} retries, "
+        f"{stats['failures']} failed, {stats['budget_exceeded']} over the turn budget), "
+        f"at most {stats['max_in_flight']} in flight, {stats['wait_seconds']:.2f}s waiting for a slot"
+    )
@@ -0,0 +1,124 @@
+"""Token and latency accounting for every LLM call, per chain and per interview.
+
+Each call that reaches the model records its usage_metadata as reported by
+the API: input tokens (in total, and how many of them were read from or
+written to Anthropic's prompt cache), output tokens, and how long the call
+took. Calls answered by llm_cache never reach the model and are not counted.
+"""
+import threading
+from collections import OrderedDict
+
+import metrics
+
+MAX_TRACKED_SESSIONS = 1000
+_FIELDS = ("calls", "input_tokens", "cache_read_tokens", "cache_creation_tokens", "output_tokens", "seconds")
+# Kind of token, as priced and exported, -> counter
+_TOKEN_FIELDS = {
+    "input": "input_tokens",
+    "cache_read": "cache_read_tokens",
+    "cache_creation": "cache_creation_tokens",
+    "output": "output_tokens",
+}
+
+
+def _empty():
+    return dict.fromkeys(_FIELDS, 0)
+
+
+def usage_counts(usage):
+    """Token counts from a message's usage_metadata (None when the model reports none)."""
+    usage = usage or {}
+    details = usage.get("input_token_details") or {}
+    return {
+        "input_tokens": usage.get("input_tokens") or 0,  # includes cached tokens
+        "cache_read_tokens": details.get("cache_read") or 0,
+        "cache_creation_tokens": details.get("cache_creation") or 0,
+        "output_tokens": usage.get("output_tokens") or 0,
+    }
+
+
+class TokenUsage:
+    """Thread-safe token and latency totals per chain, overall and per metrics session."""
+
+    def __init__(self, prices=None):
+        self.prices = dict(prices or {})  # USD per million tokens, by kind
+        self._lock = threading.Lock()
+        self._totals = {}  # chain -> counters
+        self._sessions = OrderedDict()  # session id -> {chain -> counters}
+
+    def record(self, chain, usage, seconds):
+        counts = dict(usage_counts(usage), calls=1, seconds=seconds)
+        session_id = metrics.current_session()
+        with self._lock:
+            targets = [self._totals.setdefault(chain, _empty())]
+            if session_id:
+                if session_id not in self._sessions:
+                    self._sessions[session_id] = {}
+                    while len(self._sessions) > MAX_TRACKED_SESSIONS:
+                        self._sessions.popitem(last=False)
+                targets.append(self._sessions[session_id].setdefault(chain, _empty()))
+            for counters in targets:
+                for field, value in counts.items():
+                    counters[field] += value
+
+    def stats(self, session_id=None):
+        """Counters per chain, for one session or since startup."""
+        with self._lock:
+            source = self._totals if session_id is None else self._sessions.get(session_id, {})
+            return {chain: dict(counters) for chain, counters in source.items()}
+
+    def cost(self, counters):
+        """Estimated USD for counters: in total, spent on cache writes, and saved by prompt caching.
+
+        Cache writes cost more than plain input, so caching only saves what
+        the reads save beyond that; saved is never below zero.
+        """
+        price = {kind: self.prices.get(kind, 0.0) / 1e6 for kind in _TOKEN_FIELDS}
+        uncached_input = counters["input_tokens"] - counters["cache_read_tokens"] - counters["cache_creation_tokens"]
+        cache_write = counters["cache_creation_tokens"] * price["cache_creation"]
+        total = (uncached_input * price["input"]
+                 + counters["cache_read_tokens"] * price["cache_read"]
+                 + cache_write
+                 + counters["output_tokens"] * price["output"])
+        without_caching = counters["input_tokens"] * price["input"] + counters["output_tokens"] * price["output"]
+        return {"total": total, "cache_write": cache_write, "saved": max(without_caching - total, 0.0)}
+
+    def render_prometheus(self):
+        stats = self.stats()
+        lines = [
+            "# HELP hr_agent_llm_tokens_total Tokens sent to and received from the LLM, by chain.",
+            "# TYPE hr_agent_llm_tokens_total counter",
+        ]
+        for chain, counters in sorted(stats.items()):
+            for kind, field in _TOKEN_FIELDS.items():
+                lines.append(f'hr_agent_llm_tokens_total{{chain="{chain}",kind="{kind}"}} {counters[field]}')
+        lines += [
+            "# HELP hr_agent_llm_calls_total LLM calls that reached the model, by chain.",
+            "# TYPE hr_agent_llm_calls_total counter",
+        ]
+        lines += [f'hr_agent_llm_calls_total{{chain="{chain}"}} {c["calls"]}' for chain, c in sorted(stats.items())]
+        return "\n".join(lines) + "\n"
+
+
+def format_token_usage(stats, usage=None):
+    """One line per chain, plus the estimated cost when usage has prices."""
+    if not stats:
+        return "LLM tokens: no calls reached the model"
+    lines = ["LLM tokens (input / cached read / cache write / output, mean latency):"]
+    total = _empty()
+    for chain, c in sorted(stats.items()):
+        lines.append(
+            f"  {chain:<12} {c['calls']:>3} calls  {c['input_tokens']:>7} / {c['cache_read_tokens']:>7} / "
+            f"{c['cache_creation_tokens']:>6} / {c['output_tokens']:>6}  {c['seconds'] / c['calls']:.2f}s"
+        )
+        for field in _FIELDS:
+            total[field] += c[field]
+    if usage is not None and usage.prices:
+        cost = usage.cost(total)
+        line = f"  estimated cost ${cost['total']:.4f}"
+        if total["cache_creation_tokens"]:
+            line += f", ${cost['cache_write']:.4f} of it on prompt cache writes"
+        if cost["saved"] > 0:
+            line += f" (${cost['saved']:.4f} saved by prompt caching)"
+        lines.append(line)
+    return "\n".join(lines)
@@ -1,100 +1,276 @@
+import argparse
+import asyncio
 import os
-import subprocess
-import time
+import threading
+import uuid
+from datetime import datetime
 from itertools import tee
-from global_control import event_queue
+from global_control import check_cancelled, get_current_session
 
 # Import everything from other files
-from config import interview_questions, FAQ_DOCUMENT
+from config import (
+    interview_questions,
+    FAQ_DOCUMENT,
+    FAQ_DIR,
+    FAQ_INDEX_PATH,
+    FAQ_TOP_K,
+    SPECULATIVE_VALIDATION,
+    SPECULATIVE_MIN_SIMILARITY,
+    VALIDATION_FAILURE_ACCEPTS,
+    SPECULATIVE_QA_ANSWER,
+    WRAP_UP_TIMEOUT,
+    WRAP_UP_SINGLE_CALL,
+    INTENT_FAST_PATH,
+    INTENT_CONFIDENCE_THRESHOLD,
+    ENDPOINTING,
+    ENDPOINT_TRAILING_SILENCE,
+    ENDPOINT_MAX_ANSWER_SECONDS,
+    ENDPOINT_NO_INPUT_TIMEOUT,
+    WARM_UP,
+    SESSION_OUTPUT_DIR,
+    SESSION_DB_PATH,
+)
 from prompts import (
     validation_chain,
     json_chain,
     summary_chain,
+    wrap_up_chain,
     qa_chain,
     no_question_chain,
+    llm_cache,
+    llm_client,
+    token_usage,
+    build_chains,
 )
+from speculation import SpeculativeValidator
+from interview_engine import InterviewEngine
+from intent_classifier import IntentClassifier
+from faq_index import FAQIndex
+from endpointer import Endpointer
+from llm_cache import format_cache_stats
+from llm_client import format_llm_client_stats
+from llm_usage import format_token_usage
+import metrics
+import startup_profile
+from session_log import SessionLog, BOT, CANDIDATE
+from session_store import SessionStore
 from utils import (
     speak_text_in_memory,
+    speak_text_streaming,
     transcribe_audio_input,
-    json_output_responses,
-    csv_log_responses,
-    overwrite_csv,
+    wrap_up_interview,
+    write_json_output,
+    format_wrap_up_timings,
+    load_vosk_model,
+    synthesize_speech,
+    warm_tts_cache,
+    format_tts_cache_stats,
+    tts_cache,
+    tts_engine,
+    format_tts_engine_stats,
+    audio_output,
+    format_audio_output_stats,
 )
 
-def run_interview():
-    """Main function to run the interview process."""
-    user_responses = {}
-    speak_text_in_memory("Hello! Welcome to the program interview.")
-
-    if os.path.exists("interview_session.csv"):
-        subprocess.call(['rm', '-rf', 'interview_session.csv'])
-
-    for question in interview_questions:
-        csv_log_responses(question, speaker="Bot")
-        speak_text_in_memory(question)
-        time.sleep(1)
-
-        transcription = None
-        is_valid = False
-        validation_attempts = 0
-
-        while not is_valid and validation_attempts < 4:
-            transcription = transcribe_audio_input()
-            if transcription:
-                validation_response = validation_chain.invoke(
-                    {"question": question, "answer": transcription}
-                )["text"]
-
-                if validation_response.strip().lower().startswith("yes"):
-                    is_valid = True
-                else:
-                    feedback = validation_response.lstrip("no").strip()
-                    speak_text_in_memory(f"{feedback}.")
-                    validation_attempts += 1
-            else:
-                speak_text_in_memory("I didn't hear a response. Please try again.")
-                validation_attempts += 1
-
-        if is_valid:
-            csv_log_responses(transcription, speaker="User")
-            user_responses[question] = transcription
-        else:
-            user_responses[question] = (
-                f"No valid response after {validation_attempts} attempts: {transcription}"
+# Fixed lines the bot speaks; they are synthesized ahead of time into the TTS cache
+GREETING = "Hello! Welcome to the program interview."
+NO_RESPONSE_PROMPT = "I didn't hear a response. Please try again."
+VALIDATION_FAILED_PROMPT = "Sorry, I couldn't process that answer. Could you answer again?"
+QA_PROMPT = "If you have any questions for me, feel free to ask now. If not, you can say 'no questions' to proceed."
+NO_INFO_RESPONSE = "Sorry, I don't have any information to answer your question. We will check it later and let you know."
+CLOSING_LINE = "Thank you for completing the interview!"
+
+# Local fast path in front of no_question_chain
+intent_classifier = IntentClassifier(threshold=INTENT_CONFIDENCE_THRESHOLD) if INTENT_FAST_PATH else None
+
+# Retrieval index over the FAQ files
+faq_index = FAQIndex(FAQ_DIR, FAQ_INDEX_PATH)
+
+# Indexed record of every finished interview
+session_store = SessionStore(SESSION_DB_PATH) if SESSION_DB_PATH else None
+
+
+def fixed_lines():
+    """Everything the bot says word for word, in speaking order."""
+    return [GREETING, *interview_questions, NO_RESPONSE_PROMPT, VALIDATION_FAILED_PROMPT, QA_PROMPT,
+            NO_INFO_RESPONSE, CLOSING_LINE]
+
+
+def warm_up(tts_lines=()):
+    """Loads what the first turns need ahead of time instead of on first use.
+
+    Each step is timed for --profile-startup. A failed step is left to fail
+    again, with the usual error handling, when it is first needed.
+    """
+    steps = [
+        ("speech model", load_vosk_model),
+        ("llm client + chains", build_chains),
+        ("faq index", faq_index.refresh),
+    ]
+    if tts_lines:
+        steps.append(("tts cache", lambda: warm_tts_cache(tts_lines)))
+    for name, load in steps:
+        with startup_profile.step(name):
+            try:
+                load()
+            except Exception as e:
+                print(f"Warm-up of {name} failed: {e}")
+
+
+def new_output_dir():
+    """A folder of its own for one interview's files, so no run overwrites another's."""
+    return os.path.join(SESSION_OUTPUT_DIR, f"{datetime.now():%Y%m%d-%H%M%S}-{uuid.uuid4().hex[:8]}")
+
+
+def new_endpointer():
+    """Detects the end of one answer, or None to leave it to Enter / End Turn."""
+    if not ENDPOINTING:
+        return None
+    return Endpointer(
+        trailing_silence=ENDPOINT_TRAILING_SILENCE,
+        max_answer=ENDPOINT_MAX_ANSWER_SECONDS,
+        no_input_timeout=ENDPOINT_NO_INPUT_TIMEOUT,
+    )
+
+
+def new_speculation(question):
+    """Validates the answer while it is spoken, or None when speculation is off."""
+    if not SPECULATIVE_VALIDATION:
+        return None
+    return SpeculativeValidator(validation_chain, question, min_similarity=SPECULATIVE_MIN_SIMILARITY)
+
+
+def run_interview(output_dir=None):
+    """Main function to run the interview process.
+
+    All output files are written to output_dir so concurrent sessions don't
+    collide; by default a new folder under SESSION_OUTPUT_DIR.
+    """
+    asyncio.run(run_interview_async(output_dir))
+
+
+async def run_interview_async(output_dir=None):
+    """run_interview() as a coroutine, for servers that run many interviews on one event loop."""
+    # Timing spans are attributed to the socket session when there is one
+    session = get_current_session()
+    metrics.start_session(session.sid if session else None)
+    output_dir = output_dir or new_output_dir()
+    os.makedirs(output_dir, exist_ok=True)
+    started_at = session.started_at if session and session.started_at else datetime.now()
+    with SessionLog(os.path.join(output_dir, "interview_session.jsonl")) as session_log:
+        # Counters are process-wide; the report shows what changed during this interview
+        stats_start = {
+            "tts": tts_cache.stats(),
+            "faq": faq_index.stats(),
+            "intent": intent_classifier.stats() if intent_classifier else None,
+            "llm_cache": llm_cache.stats() if llm_cache else None,
+        }
+        # Looked up here rather than imported by the engine, so patches applied to main take effect
+        engine = InterviewEngine(
+            session_log,
+            interview_questions,
+            {
+                "greeting": GREETING,
+                "no_response": NO_RESPONSE_PROMPT,
+                "validation_failed": VALIDATION_FAILED_PROMPT,
+                "qa_prompt": QA_PROMPT,
+                "no_info": NO_INFO_RESPONSE,
+                "closing": CLOSING_LINE,
+            },
+            speak=speak_text_in_memory,
+            speak_streaming=speak_text_streaming,
+            synthesize=synthesize_speech,
+            transcribe=transcribe_audio_input,
+            new_endpointer=new_endpointer,
+            validation_chain=validation_chain,
+            qa_chain=qa_chain,
+            no_question_chain=no_question_chain,
+            faq_index=faq_index,
+            faq_document=FAQ_DOCUMENT,
+            faq_top_k=FAQ_TOP_K,
+            intent_classifier=intent_classifier,
+            new_speculation=new_speculation,
+            llm_client=llm_client,
+            checkpoint=check_cancelled,
+            speculative_answer=SPECULATIVE_QA_ANSWER,
+            accept_on_validation_error=VALIDATION_FAILURE_ACCEPTS,
+        )
+        await engine.run(
+            lambda user_responses: _finish_interview(
+                session_log, user_responses, stats_start, output_dir, started_at
             )
-        print("-" * 50)
-
-    # Q&A Section
-    speak_text_in_memory("If you have any questions for me, feel free to ask now. If not, you can say 'no questions' to proceed.")
-    csv_log_responses("If you have any questions for me, feel free to ask now. If not, you can say 'no questions' to proceed.", speaker="Bot")
-    while True:
-        user_question = transcribe_audio_input()
-        csv_log_responses(user_question, speaker="User")
-        intent = no_question_chain.invoke({"user_input": user_question})["text"].strip().lower()
-        if intent == "no_question":
-            break
-        if FAQ_DOCUMENT:
-            answer = qa_chain.invoke({"FAQ_DOCUMENT": FAQ_DOCUMENT, "question": user_question})["text"]
-            speak_text_in_memory(answer)
-            csv_log_responses(answer, speaker="Bot")
-        else:
-            speak_text_in_memory("Sorry, I don't have any information to answer your question. We will check it later and let you know.")
-            csv_log_responses("No information available to answer the question.", speaker="Bot")
-
-    # Final summary and output
-    speak_text_in_memory("Thank you for completing the interview!")
+        )
+
+
+def _finish_interview(session_log, user_responses, stats_start, output_dir, started_at):
+    csv_path = os.path.join(output_dir, "interview_session.csv")
+    json_path = os.path.join(output_dir, "interview_responses.json")
+    summary_path = os.path.join(output_dir, "interview_summary.txt")
 
     for question, response in user_responses.items():
         print(f"- {question}")
         print(f"  Response: {response}\n")
+    print(format_tts_cache_stats(tts_cache.stats(since=stats_start["tts"])))
+    print(format_tts_engine_stats(tts_engine.stats()))
+    print(format_audio_output_stats(audio_output.stats()))
+    if intent_classifier:
+        intent_stats = intent_classifier.stats(since=stats_start["intent"])
+        print(f"Intent fast path: {intent_stats['fast_path_rate']:.0%} of replies answered locally")
+    if llm_cache:
+        print(format_cache_stats(llm_cache.stats(since=stats_start["llm_cache"])))
+    print(format_llm_client_stats(llm_client.stats()))
+    faq_stats = faq_index.stats(since=stats_start["faq"])
+    if faq_stats["queries"]:
+        print(f"FAQ retrieval: {faq_stats['queries']} queries, p50 {faq_stats['p50_ms']:.2f}ms, p95 {faq_stats['p95_ms']:.2f}ms")
+    print(metrics.session_report(metrics.current_session()))
 
-    summary = summary_chain.invoke({"transcript": "\n".join([f"{q}\n{a}" for q, a in user_responses.items()])})["text"]
+    # Summary and JSON come from the same transcript, so they are generated concurrently
+    summary, structured_data, timings = wrap_up_interview(
+        user_responses,
+        summary_chain,
+        json_chain,
+        wrap_up_chain=wrap_up_chain if WRAP_UP_SINGLE_CALL else None,
+        timeout=WRAP_UP_TIMEOUT,
+    )
+    print(format_wrap_up_timings(timings))
+    print(format_token_usage(token_usage.stats(metrics.current_session()), token_usage))
 
-    with open("interview_summary.txt", "w", encoding="utf-8") as f:
+    with open(summary_path, "w", encoding="utf-8") as f:
         f.write(summary)
 
-    json_output_responses(user_responses, json_chain)
-    overwrite_csv()
+    write_json_output(structured_data, filename=json_path)
+
+    # The candidate's name is only known now; it is resolved when exporting the log
+    session_log.set_speaker_name(CANDIDATE, structured_data.get("Name") or "User")
+    session_log.export_csv(csv_path)
+
+    if session_store:
+        try:
+            session_store.record(
+                os.path.basename(os.path.normpath(output_dir)),
+                started_at=started_at,
+                profile=structured_data,
+                summary=summary,
+                answers=user_responses,
+                transcript=session_log.resolved_lines(),
+                source="web",
+                output_dir=output_dir,
+            )
+        except Exception as e:
+            # The files above are still there; the database is only the index
+            print(f"Could not record the interview in {session_store.path}: {e}")
 
 if __name__ == "__main__":
-    run_interview()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Run the interview in the terminal.")
+    parser.add_argument("--profile-startup", action="store_true",
+                        help="report import and warm-up time per module, then exit")
+    args = parser.parse_args()
+    if args.profile_startup:
+        warm_up(fixed_lines())
+        print(startup_profile.report("main"))
+    else:
+        if WARM_UP:
+            # The speech model and LLM client load while the greeting plays; the
+            # interview itself prefetches its speech
+            threading.Thread(target=warm_up, name="warm-up", daemon=True).start()
+        run_interview()
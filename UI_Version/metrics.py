@@ -0,0 +1,144 @@
+import contextvars
+import functools
+import math
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from contextlib import contextmanager
+
+# Histogram bucket upper bounds in seconds
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, math.inf)
+MAX_TRACKED_SESSIONS = 1000
+
+
+class _SpanContext:
+    """Session and turn that spans in this context are attributed to."""
+
+    def __init__(self, session_id):
+        self.session_id = session_id
+        self.turn = 0
+
+
+_context = contextvars.ContextVar("metrics_context", default=None)
+# Nesting depth of spans; only top-level spans count towards per-turn totals
+_depth = contextvars.ContextVar("metrics_span_depth", default=0)
+_lock = threading.Lock()
+_histograms = {}  # stage -> {"buckets": [...], "sum": float, "count": int}
+_sessions = OrderedDict()  # session id -> [(turn, stage, seconds, top_level)]
+
+
+def start_session(session_id=None):
+    """Attributes spans in the current context to a session; returns its id."""
+    session_id = session_id or uuid.uuid4().hex[:12]
+    _context.set(_SpanContext(session_id))
+    with _lock:
+        _sessions[session_id] = []
+        while len(_sessions) > MAX_TRACKED_SESSIONS:
+            _sessions.popitem(last=False)
+    return session_id
+
+
+def current_session():
+    ctx = _context.get()
+    return ctx.session_id if ctx else None
+
+
+def next_turn():
+    ctx = _context.get()
+    if ctx:
+        ctx.turn += 1
+
+
+def observe(stage, seconds, top_level=True):
+    ctx = _context.get()
+    with _lock:
+        histogram = _histograms.get(stage)
+        if histogram is None:
+            histogram = _histograms[stage] = {"buckets": [0] * len(BUCKETS), "sum": 0.0, "count": 0}
+        for i, bound in enumerate(BUCKETS):
+            if seconds <= bound:
+                histogram["buckets"][i] += 1
+                break
+        histogram["sum"] += seconds
+        histogram["count"] += 1
+        if ctx and ctx.session_id in _sessions:
+            _sessions[ctx.session_id].append((ctx.turn, stage, seconds, top_level))
+
+
+@contextmanager
+def span(stage):
+    """Times the enclosed block as one observation of stage."""
+    depth = _depth.get()
+    token = _depth.set(depth + 1)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(stage, time.perf_counter() - start, top_level=depth == 0)
+        _depth.reset(token)
+
+
+def timed(stage):
+    """Decorator form of span()."""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(stage):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def render_prometheus():
+    """All stage histograms in the Prometheus text exposition format.
+
+    Session and turn ids are kept out of the labels to bound cardinality; they
+    are available per session through session_report().
+    """
+    lines = [
+        "# HELP hr_agent_stage_seconds Time spent in each interview pipeline stage.",
+        "# TYPE hr_agent_stage_seconds histogram",
+    ]
+    with _lock:
+        histograms = {stage: dict(h, buckets=list(h["buckets"])) for stage, h in _histograms.items()}
+        active_sessions = len(_sessions)
+    for stage, histogram in sorted(histograms.items()):
+        cumulative = 0
+        for bound, count in zip(BUCKETS, histogram["buckets"]):
+            cumulative += count
+            le = "+Inf" if bound == math.inf else repr(bound)
+            lines.append(f'hr_agent_stage_seconds_bucket{{stage="{stage}",le="{le}"}} {cumulative}')
+        lines.append(f'hr_agent_stage_seconds_sum{{stage="{stage}"}} {histogram["sum"]}')
+        lines.append(f'hr_agent_stage_seconds_count{{stage="{stage}"}} {histogram["count"]}')
+    lines += [
+        "# HELP hr_agent_tracked_sessions Interview sessions with timing data in memory.",
+        "# TYPE hr_agent_tracked_sessions gauge",
+        f"hr_agent_tracked_sessions {active_sessions}",
+    ]
+    return "\n".join(lines) + "\n"
+
+
+def session_spans(session_id):
+    with _lock:
+        return list(_sessions.get(session_id, []))
+
+
+def session_report(session_id):
+    """Per-stage and per-turn timing table for one interview."""
+    spans = session_spans(session_id)
+    if not spans:
+        return f"No timing data for session {session_id}."
+    stages = {}
+    turns = {}
+    for turn, stage, seconds, top_level in spans:
+        stages.setdefault(stage, []).append(seconds)
+        if top_level:
+            turns[turn] = turns.get(turn, 0.0) + seconds
+    lines = [f"Timing report for session {session_id}",
+             f"{'stage':<24}{'count':>7}{'total s':>10}{'mean s':>10}{'max s':>10}"]
+    for stage, samples in sorted(stages.items(), key=lambda item: -sum(item[1])):
+        lines.append(f"{stage:<24}{len(samples):>7}{sum(samples):>10.2f}"
+                     f"{sum(samples) / len(samples):>10.2f}{max(samples):>10.2f}")
+    lines.append("Time per turn (s): " + ", ".join(f"{t}: {s:.2f}" for t, s in sorted(turns.items())))
+    return "\n".join(lines)
@@ -0,0 +1,89 @@
+import csv
+import json
+import threading
+from datetime import datetime
+
+import metrics
+
+BOT = "bot"
+CANDIDATE = "candidate"
+
+DEFAULT_SPEAKER_NAMES = {BOT: "Bot", CANDIDATE: "User"}
+
+
+class SessionLog:
+    """Append-only JSONL transcript of one interview.
+
+    The file stays open for the whole interview; lines are buffered and only
+    flushed at turn boundaries (end_turn) and on close. Speakers are logged by
+    id, and their display names are recorded as separate "speaker" entries that
+    are resolved at export time, so the log never has to be rewritten.
+    """
+
+    def __init__(self, path, speaker_names=None):
+        self.path = path
+        self._lock = threading.Lock()
+        self._file = open(path, "w", encoding="utf-8", buffering=64 * 1024)
+        for speaker_id, name in {**DEFAULT_SPEAKER_NAMES, **(speaker_names or {})}.items():
+            self.set_speaker_name(speaker_id, name)
+
+    def _append(self, record):
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+        with self._lock:
+            self._file.write(line)
+
+    def write(self, text, speaker):
+        self._append({
+            "type": "line",
+            "time": datetime.now().strftime("%H:%M:%S"),
+            "speaker": speaker,
+            "text": text,
+        })
+
+    def set_speaker_name(self, speaker_id, name):
+        self._append({"type": "speaker", "id": speaker_id, "name": name})
+
+    def end_turn(self):
+        with metrics.span("io.session_log_flush"), self._lock:
+            self._file.flush()
+
+    def close(self):
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_exc):
+        self.close()
+
+    # Export
+    def resolved_lines(self):
+        """Every line so far as {"Time", "Speaker", "Text"}, with speaker names resolved."""
+        self.end_turn()
+        names = {}
+        lines = []
+        with open(self.path, encoding="utf-8") as f:
+            for raw in f:
+                record = json.loads(raw)
+                if record["type"] == "speaker":
+                    names[record["id"]] = record["name"]
+                else:
+                    lines.append(record)
+        return [
+            {"Time": r["time"], "Speaker": names.get(r["speaker"], r["speaker"]), "Text": r["text"]}
+            for r in lines
+        ]
+
+    @metrics.timed("io.export_csv")
+    def export_csv(self, path):
+        with open(path, mode="w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=["Time", "Speaker", "Text"])
+            writer.writeheader()
+            writer.writerows(self.resolved_lines())
+
+    def export_jsonl(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            for row in self.resolved_lines():
+                f.write(json.dumps(row, ensure_ascii=False) + "\n")
@@ -0,0 +1,133 @@
+import asyncio
+import os
+import threading
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from queue import Queue
+
+from audio_source import BrowserAudioSource
+from global_control import InterviewCancelled, set_current_session
+
+
+class SessionLimitReached(Exception):
+    """Raised when the server already runs the maximum number of interviews."""
+
+
+class InterviewSession:
+    """State of one candidate's interview, keyed by Socket.IO session id."""
+
+    def __init__(self, sid, output_dir):
+        self.sid = sid
+        self.output_dir = output_dir
+        self.event_queue = Queue()
+        self.audio = BrowserAudioSource()  # fed by the tab's audio_chunk events
+        self.cancelled = threading.Event()
+        self.state = "idle"  # idle -> running -> finished | cancelled | failed
+        self.started_at = None
+        self.future = None
+
+    def start(self, target, loop, on_exit=None):
+        """Runs the coroutine target(session) on loop, bound to this session."""
+        async def run():
+            # Each task has its own context, and worker threads started with
+            # asyncio.to_thread inherit it
+            set_current_session(self)
+            self.state = "running"
+            try:
+                await target(self)
+                self.state = "finished"
+            except InterviewCancelled:
+                self.state = "cancelled"
+            except Exception:
+                self.state = "failed"
+                traceback.print_exc()
+            finally:
+                if on_exit:
+                    on_exit(self)
+
+        os.makedirs(self.output_dir, exist_ok=True)
+        self.started_at = datetime.now()
+        self.future = asyncio.run_coroutine_threadsafe(run(), loop)
+
+    def is_alive(self):
+        return self.future is not None and not self.future.done()
+
+    def end_turn(self):
+        self.event_queue.put("enter")
+
+    def cancel(self):
+        """Ends the interview at the next turn boundary."""
+        self.cancelled.set()
+        # Release a pending transcription so the interview notices the cancellation:
+        # the transcriber checks cancelled, and closing the buffer wakes its read
+        self.event_queue.put("enter")
+        self.audio.ring.close()
+
+
+class SessionManager:
+    """Runs one interview per Socket.IO session, up to max_sessions at a time.
+
+    Interviews are coroutines on one event loop thread. Their blocking stages
+    run in the loop's worker threads, sized so every session can have a few
+    (playback, transcription, LLM calls, prefetching) in flight at once.
+
+    The loop thread starts with the first interview, not on construction, so
+    the server can fork its STT workers before it has any threads.
+    """
+
+    WORKERS_PER_SESSION = 4
+
+    def __init__(self, max_sessions, output_root):
+        self.max_sessions = max_sessions
+        self.output_root = output_root
+        self._sessions = {}
+        self._lock = threading.Lock()
+        self.loop = None
+
+    def _ensure_loop(self):
+        # Called with self._lock held
+        if self.loop is None:
+            self.loop = asyncio.new_event_loop()
+            self.loop.set_default_executor(ThreadPoolExecutor(
+                max_workers=self.max_sessions * self.WORKERS_PER_SESSION, thread_name_prefix="interview"
+            ))
+            threading.Thread(target=self.loop.run_forever, name="interview-loop", daemon=True).start()
+        return self.loop
+
+    def start(self, sid, target):
+        """Starts an interview for sid, or returns the one already running."""
+        with self._lock:
+            session = self._sessions.get(sid)
+            if session is not None and session.is_alive():
+                return session
+            if self.active_count() >= self.max_sessions:
+                raise SessionLimitReached(
+                    f"{self.max_sessions} interviews are already running."
+                )
+            output_dir = os.path.join(
+                self.output_root, f"{datetime.now():%Y%m%d-%H%M%S}-{sid}"
+            )
+            session = InterviewSession(sid, output_dir)
+            self._sessions[sid] = session
+            session.start(target, self._ensure_loop(), on_exit=self._discard)
+            return session
+
+    def get(self, sid):
+        with self._lock:
+            return self._sessions.get(sid)
+
+    def end(self, sid):
+        """Cancels the interview belonging to sid, if any."""
+        session = self.get(sid)
+        if session is not None:
+            session.cancel()
+        return session
+
+    def active_count(self):
+        return sum(1 for s in list(self._sessions.values()) if s.is_alive())
+
+    def _discard(self, session):
+        with self._lock:
+            if self._sessions.get(session.sid) is session:
+                del self._sessions[session.sid]
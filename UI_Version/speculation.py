@@ -0,0 +1,94 @@
+import contextvars
+import difflib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# Shared by all interviews; each validator keeps at most one call in flight
+_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="speculative-validation")
+
+
+def transcript_similarity(a, b):
+    """Word-level similarity between two transcripts, from 0.0 to 1.0."""
+    if a == b:
+        return 1.0
+    return difflib.SequenceMatcher(None, a.lower().split(), b.lower().split()).ratio()
+
+
+class SpeculativeValidator:
+    """Validates the answer-so-far in the background while the candidate speaks.
+
+    submit() is called with the accumulated transcript whenever the recognizer
+    finalizes a segment. Once the turn ends, verdict_for() returns the latest
+    speculative verdict if it was computed on nearly the same text, so the bot
+    can respond without another LLM round-trip.
+    """
+
+    def __init__(self, validation_chain, question, min_similarity=0.9):
+        self.validation_chain = validation_chain
+        self.question = question
+        self.min_similarity = min_similarity
+        self.calls = 0
+        self.hits = 0
+        self.misses = 0
+        self._cond = threading.Condition()
+        self._running_text = None
+        self._pending_text = None
+        self._verdict = None  # (text, validation response)
+        self._closed = False
+
+    def submit(self, answer_so_far):
+        answer_so_far = answer_so_far.strip()
+        if not answer_so_far:
+            return
+        with self._cond:
+            if self._closed:
+                return
+            if self._running_text is not None:
+                # Only the newest text matters; it runs once the current call returns
+                self._pending_text = answer_so_far
+                return
+            self._start(answer_so_far)
+
+    def close(self):
+        """Starts no further calls; one already running finishes on its own."""
+        with self._cond:
+            self._pending_text = None
+            self._closed = True
+
+    def verdict_for(self, final_text, timeout=30):
+        """Returns a reusable validation response for final_text, or None."""
+        with self._cond:
+            self._pending_text = None
+            self._closed = True
+            # A call on nearly the same text is already running: waiting is cheaper than a new one
+            if (self._running_text is not None
+                    and transcript_similarity(self._running_text, final_text) >= self.min_similarity):
+                self._cond.wait_for(lambda: self._running_text is None, timeout=timeout)
+            if (self._verdict is not None
+                    and transcript_similarity(self._verdict[0], final_text) >= self.min_similarity):
+                self.hits += 1
+                return self._verdict[1]
+            self.misses += 1
+            return None
+
+    def _start(self, text):
+        self._running_text = text
+        self.calls += 1
+        _executor.submit(contextvars.copy_context().run, self._validate, text)
+
+    def _validate(self, text):
+        try:
+            response = self.validation_chain.invoke(
+                {"question": self.question, "answer": text}
+            )["text"]
+        except Exception as e:
+            print(f"Speculative validation failed: {e}")
+            response = None
+        with self._cond:
+            if response is not None:
+                self._verdict = (text, response)
+            self._running_text = None
+            if self._pending_text is not None and not self._closed:
+                next_text, self._pending_text = self._pending_text, None
+                self._start(next_text)
+            self._cond.notify_all()
@@ -0,0 +1,43 @@
+// Turns microphone input into 16 kHz mono int16 chunks of 100 ms for the server.
+// Each output sample averages the input samples it covers, which also serves as
+// a simple low-pass filter before decimation.
+const TARGET_RATE = 16000;
+const CHUNK_SAMPLES = 1600;
+
+class PcmDownsampler extends AudioWorkletProcessor {
+    constructor() {
+        super();
+        this.ratio = sampleRate / TARGET_RATE;
+        this.nextOutputAt = this.ratio;  // input position at which the next sample is due
+        this.consumed = 0;
+        this.sum = 0;
+        this.count = 0;
+        this.chunk = new Int16Array(CHUNK_SAMPLES);
+        this.filled = 0;
+    }
+
+    process(inputs) {
+        const channel = inputs[0] && inputs[0][0];
+        if (!channel) return true;
+        for (let i = 0; i < channel.length; i++) {
+            this.sum += channel[i];
+            this.count++;
+            this.consumed++;
+            if (this.consumed < this.nextOutputAt) continue;
+
+            const value = Math.max(-1, Math.min(1, this.sum / this.count));
+            this.chunk[this.filled++] = value * 0x7fff;
+            this.sum = 0;
+            this.count = 0;
+            this.nextOutputAt += this.ratio;
+            if (this.filled === CHUNK_SAMPLES) {
+                this.port.postMessage(this.chunk.buffer, [this.chunk.buffer]);
+                this.chunk = new Int16Array(CHUNK_SAMPLES);
+                this.filled = 0;
+            }
+        }
+        return true;
+    }
+}
+
+registerProcessor("pcm-downsampler", PcmDownsampler);
@@ -8,11 +8,92 @@ const agentSubtitle = document.getElementById("agentSubtitle");
 const startBtn = document.getElementById("startBtn");
 const endBtn = document.getElementById("endBtn");
 
+// Microphone: captured here, downsampled to 16 kHz int16 by pcm-worklet.js and
+// streamed to the server. At most MAX_CHUNKS_IN_FLIGHT unacknowledged chunks are
+// outstanding; if the server or network falls behind, newer chunks are dropped
+// instead of queueing up ever-growing latency.
+const MAX_CHUNKS_IN_FLIGHT = 10;  // 1 s of audio
+let audioContext = null;
+let micStream = null;
+let chunksInFlight = 0;
+let droppedChunks = 0;
+
+async function startMicrophone() {
+    micStream = await navigator.mediaDevices.getUserMedia({
+        audio: { channelCount: 1, echoCancellation: true, noiseSuppression: true },
+    });
+    audioContext = new AudioContext();
+    await audioContext.audioWorklet.addModule("/static/pcm-worklet.js");
+    const downsampler = new AudioWorkletNode(audioContext, "pcm-downsampler");
+    downsampler.port.onmessage = (event) => sendAudioChunk(event.data);
+    audioContext.createMediaStreamSource(micStream).connect(downsampler);
+    downsampler.connect(audioContext.destination);  // keeps the node running; it outputs silence
+}
+
+function sendAudioChunk(buffer) {
+    if (chunksInFlight >= MAX_CHUNKS_IN_FLIGHT) {
+        droppedChunks++;
+        return;
+    }
+    chunksInFlight++;
+    socket.emit("audio_chunk", buffer, () => { chunksInFlight--; });
+}
+
+function stopMicrophone() {
+    if (micStream) micStream.getTracks().forEach((track) => track.stop());
+    if (audioContext) audioContext.close();
+    if (droppedChunks) console.warn(`Dropped ${droppedChunks} audio chunks while the server was behind`);
+    micStream = null;
+    audioContext = null;
+    chunksInFlight = 0;
+    droppedChunks = 0;
+}
+
+// Bot voice: 16-bit PCM per utterance from the server, queued back to back.
+// The context is created on the Start click, since browsers only allow audio
+// to start after a user gesture.
+let playbackContext = null;
+let playbackEnd = 0;
+
+function startPlayback() {
+    playbackContext = new AudioContext();
+    playbackEnd = 0;
+}
+
+function stopPlayback() {
+    if (playbackContext) playbackContext.close();
+    playbackContext = null;
+}
+
+socket.on("bot_audio", (data) => {
+    if (!playbackContext) return;
+    const samples = new Int16Array(data.pcm);
+    const frames = samples.length / data.channels;
+    if (!frames) return;
+    const buffer = playbackContext.createBuffer(data.channels, frames, data.sample_rate);
+    for (let channel = 0; channel < data.channels; channel++) {
+        const output = buffer.getChannelData(channel);
+        for (let i = 0; i < frames; i++) output[i] = samples[i * data.channels + channel] / 32768;
+    }
+    const source = playbackContext.createBufferSource();
+    source.buffer = buffer;
+    source.connect(playbackContext.destination);
+    playbackEnd = Math.max(playbackEnd, playbackContext.currentTime);
+    source.start(playbackEnd);
+    playbackEnd += buffer.duration;
+});
+
 // Start Interview
-function startInterview() {
-    socket.emit("start_interview", {});
+async function startInterview() {
     startBtn.style.display = "none";
     endBtn.style.display = "inline-block";
+    startPlayback();
+    try {
+        await startMicrophone();
+    } catch (err) {
+        alert(`Microphone unavailable: ${err.message}`);
+    }
+    socket.emit("start_interview", {});
 }
 
 // End Turn
@@ -26,10 +107,13 @@ function endCall() {
 }
 
 // Green border and subtitle updates
+// Streamed answers arrive one sentence at a time; keep the border lit between them
+let botSpeakingTimer = null;
 socket.on("bot_speaking", (data) => {
     agentBox.classList.add("speaking");
     agentSubtitle.textContent = data.text;
-    setTimeout(() => agentBox.classList.remove("speaking"), 1500);
+    clearTimeout(botSpeakingTimer);
+    botSpeakingTimer = setTimeout(() => agentBox.classList.remove("speaking"), 1500);
 });
 
 socket.on("user_speaking", (data) => {
@@ -38,6 +122,39 @@ socket.on("user_speaking", (data) => {
     setTimeout(() => localBox.classList.remove("speaking"), 1500);
 });
 
+// Live transcript: partial hypotheses are shown dimmed until the recognizer finalizes them
+socket.on("user_transcript", (data) => {
+    if (!data.text) return;
+    localBox.classList.toggle("speaking", !data.final);
+    userSubtitle.textContent = data.text;
+    userSubtitle.classList.toggle("partial", !data.final);
+});
+
+socket.on("listening", () => {
+    localBox.classList.add("speaking");
+    userSubtitle.textContent = "";
+});
+
+socket.on("interview_finished", (data) => {
+    stopMicrophone();
+    stopPlayback();
+    agentSubtitle.textContent = data.text;
+    startBtn.style.display = "inline-block";
+    endBtn.style.display = "none";
+});
+
 socket.on("call_ended", (data) => {
+    stopMicrophone();
+    stopPlayback();
+    alert(data.text);
+    startBtn.style.display = "inline-block";
+    endBtn.style.display = "none";
+});
+
+socket.on("server_busy", (data) => {
+    stopMicrophone();
+    stopPlayback();
     alert(data.text);
+    startBtn.style.display = "inline-block";
+    endBtn.style.display = "none";
 });
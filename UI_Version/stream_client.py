@@ -0,0 +1,93 @@
+"""Drives a full interview on a running app.py by streaming WAV files as the candidate.
+
+    python stream_client.py ANSWER.wav [ANSWER.wav ...] [--url http://localhost:5001]
+
+Connects like the browser page does: each time the server starts listening,
+the next WAV is streamed as 100 ms chunks of 16 kHz int16 at speaking speed
+(--speed to go faster), followed by End Turn. Once the files run out, every
+further turn gets an immediate End Turn with no audio. Bot lines and the live
+transcript are printed as they arrive.
+"""
+import argparse
+import threading
+import time
+
+import socketio
+
+from audio_source import read_wav_pcm, SAMPLE_RATE
+
+CHUNK_SAMPLES = 1600
+MAX_CHUNKS_IN_FLIGHT = 10
+
+
+class InterviewClient:
+    def __init__(self, url, answers, speed=1.0):
+        self.url = url
+        self.answers = list(answers)
+        self.speed = speed
+        self.sio = socketio.Client()
+        self.done = threading.Event()
+        self.in_flight = threading.Semaphore(MAX_CHUNKS_IN_FLIGHT)
+        self.sent_chunks = 0
+        self.dropped_chunks = 0
+
+        self.sio.on("bot_speaking", lambda data: print(f"BOT: {data['text']}"))
+        self.sio.on("user_transcript", self._on_transcript)
+        self.sio.on("listening", self._on_listening)
+        self.sio.on("interview_finished", self._on_finished)
+        self.sio.on("call_ended", self._on_finished)
+        self.sio.on("server_busy", self._on_finished)
+
+    def _on_transcript(self, data):
+        if data["final"] and data["text"]:
+            print(f"  ASR: {data['text']}")
+
+    def _on_finished(self, data):
+        print(data.get("text", ""))
+        self.done.set()
+
+    def _on_listening(self, _data):
+        answer = self.answers.pop(0) if self.answers else None
+        # Socket.IO handlers must return quickly; stream from a separate thread
+        threading.Thread(target=self._answer, args=(answer,), daemon=True).start()
+
+    def _ack(self, *_args):
+        self.in_flight.release()
+
+    def _answer(self, path):
+        if path is not None:
+            print(f"YOU: <{path}>")
+            pcm = read_wav_pcm(path)
+            interval = CHUNK_SAMPLES / SAMPLE_RATE / self.speed
+            due = time.perf_counter()
+            for offset in range(0, len(pcm), CHUNK_SAMPLES * 2):
+                # Same backpressure as the page: drop rather than queue behind a slow server
+                if self.in_flight.acquire(blocking=False):
+                    self.sio.emit("audio_chunk", pcm[offset:offset + CHUNK_SAMPLES * 2], callback=self._ack)
+                    self.sent_chunks += 1
+                else:
+                    self.dropped_chunks += 1
+                due += interval
+                time.sleep(max(due - time.perf_counter(), 0))
+        self.sio.emit("user_end_turn", {})
+
+    def run(self, timeout=None):
+        self.sio.connect(self.url)
+        try:
+            self.sio.emit("start_interview", {})
+            finished = self.done.wait(timeout)
+        finally:
+            self.sio.disconnect()
+        print(f"Sent {self.sent_chunks} audio chunks, dropped {self.dropped_chunks}")
+        return finished
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run an interview by streaming recorded answers.")
+    parser.add_argument("answers", nargs="+", help="WAV files, one per turn in order")
+    parser.add_argument("--url", default="http://localhost:5001")
+    parser.add_argument("--speed", type=float, default=1.0, help="playback speed of the answers")
+    parser.add_argument("--timeout", type=float, default=None, help="give up after this many seconds")
+    args = parser.parse_args()
+    if not InterviewClient(args.url, args.answers, speed=args.speed).run(timeout=args.timeout):
+        raise SystemExit("Interview did not finish in time")
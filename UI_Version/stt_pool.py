@@ -0,0 +1,289 @@
+"""Pool of speech-to-text worker processes shared by all interview sessions.
+
+Each worker holds the Vosk model (inherited copy-on-write when the platform
+forks, loaded again otherwise) and runs the recognizers of the streams
+assigned to it, so decoding for concurrent interviews is spread across cores
+instead of competing with the web server in one interpreter. Sessions use
+pool.recognizer(sample_rate), a drop-in for vosk.KaldiRecognizer.
+
+    python stt_pool.py ANSWER.wav [--workers 1 2 4] [--streams 8]
+
+measures decoding throughput for each pool size.
+"""
+import argparse
+import itertools
+import multiprocessing
+import threading
+import time
+from queue import Queue
+
+from utils import load_vosk_model
+
+
+def _worker_main(conn, model_path):
+    import vosk
+
+    model = load_vosk_model(model_path)  # already loaded when forked from a parent that loaded it
+    recognizers = {}
+    busy = 0.0
+    while True:
+        try:
+            message = conn.recv()
+        except EOFError:
+            break
+        if message is None:
+            break
+        op, stream_id, payload = message
+        start = time.perf_counter()
+        try:
+            if op == "open":
+                recognizers[stream_id] = vosk.KaldiRecognizer(model, payload)
+                value = None
+            elif op == "accept":
+                value = recognizers[stream_id].AcceptWaveform(payload)
+            elif op == "result":
+                value = recognizers[stream_id].Result()
+            elif op == "partial":
+                value = recognizers[stream_id].PartialResult()
+            elif op == "final":
+                value = recognizers.pop(stream_id).FinalResult()
+            elif op == "close":
+                recognizers.pop(stream_id, None)
+                value = None
+            else:
+                raise ValueError(f"unknown operation {op!r}")
+            ok = True
+        except Exception as e:
+            ok, value = False, f"{type(e).__name__}: {e}"
+        busy += time.perf_counter() - start
+        conn.send((stream_id, ok, value, busy))
+    conn.close()
+
+
+class _Worker:
+    """Parent-side handle of one worker process."""
+
+    def __init__(self, index, context, model_path):
+        self.index = index
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(
+            target=_worker_main, args=(child_conn, model_path), name=f"stt-worker-{index}", daemon=True
+        )
+        self.process.start()
+        child_conn.close()
+        self.started = time.perf_counter()
+        self.busy_seconds = 0.0
+        self.requests = 0
+        self.streams = 0  # currently open
+        self.alive = True
+        self._send_lock = threading.Lock()
+        self._streams_lock = threading.Lock()
+        self._waiting = {}  # stream id -> Queue for its one outstanding reply
+        self._receiver = threading.Thread(target=self._receive, name=f"stt-receiver-{index}", daemon=True)
+        self._receiver.start()
+
+    def _receive(self):
+        while True:
+            try:
+                stream_id, ok, value, busy = self.conn.recv()
+            except (EOFError, OSError):
+                break
+            self.busy_seconds = busy
+            waiting = self._waiting.get(stream_id)
+            if waiting is not None:
+                waiting.put((ok, value))
+        self.alive = False
+        for waiting in list(self._waiting.values()):
+            waiting.put((False, f"STT worker {self.index} exited"))
+
+    def add_stream(self, stream_id):
+        with self._streams_lock:
+            self._waiting[stream_id] = Queue(maxsize=1)
+            self.streams += 1
+
+    def remove_stream(self, stream_id, discard=False):
+        """Frees the stream's slot; discard=True also drops its recognizer in the worker."""
+        with self._streams_lock:
+            if self._waiting.pop(stream_id, None) is None:
+                return
+            self.streams -= 1
+        if discard and self.alive:
+            # Fire and forget: the reply is ignored since nobody waits for this stream any more
+            with self._send_lock:
+                try:
+                    self.conn.send(("close", stream_id, None))
+                except OSError:
+                    pass
+
+    def call(self, op, stream_id, payload=None):
+        if not self.alive:
+            raise RuntimeError(f"STT worker {self.index} is not running")
+        waiting = self._waiting[stream_id]
+        with self._send_lock:
+            self.conn.send((op, stream_id, payload))
+            self.requests += 1
+        ok, value = waiting.get()
+        if not ok:
+            raise RuntimeError(value)
+        return value
+
+    def utilization(self):
+        elapsed = time.perf_counter() - self.started
+        return self.busy_seconds / elapsed if elapsed > 0 else 0.0
+
+    def stop(self, timeout=5):
+        with self._send_lock:
+            try:
+                self.conn.send(None)
+            except (BrokenPipeError, OSError):
+                pass
+        self.process.join(timeout)
+        if self.process.is_alive():
+            self.process.terminate()
+        self.conn.close()
+
+
+class RemoteRecognizer:
+    """KaldiRecognizer interface for a stream decoded by a pool worker."""
+
+    def __init__(self, worker, stream_id, sample_rate):
+        self._worker = worker
+        self._stream_id = stream_id
+        worker.add_stream(stream_id)
+        try:
+            worker.call("open", stream_id, sample_rate)
+        except Exception:
+            worker.remove_stream(stream_id)
+            raise
+
+    def AcceptWaveform(self, data):
+        return self._worker.call("accept", self._stream_id, bytes(data))
+
+    def Result(self):
+        return self._worker.call("result", self._stream_id)
+
+    def PartialResult(self):
+        return self._worker.call("partial", self._stream_id)
+
+    def FinalResult(self):
+        try:
+            return self._worker.call("final", self._stream_id)
+        finally:
+            self._worker.remove_stream(self._stream_id)
+
+    def __del__(self):
+        # A stream abandoned without FinalResult() still frees its slot and recognizer
+        self._worker.remove_stream(self._stream_id, discard=True)
+
+
+class STTWorkerPool:
+    def __init__(self, size, model_path=None):
+        self.size = size
+        self.model_path = model_path
+        self.start_method = "fork" if "fork" in multiprocessing.get_all_start_methods() else "spawn"
+        self._workers = []
+        self._ids = itertools.count()
+        self._lock = threading.Lock()
+
+    def start(self):
+        if self.start_method == "fork":
+            # Loaded once here, the model's pages are shared with every worker
+            load_vosk_model(self.model_path)
+        context = multiprocessing.get_context(self.start_method)
+        self._workers = [_Worker(i, context, self.model_path) for i in range(self.size)]
+        print(f"Started {self.size} STT workers ({self.start_method})")
+        return self
+
+    def close(self):
+        for worker in self._workers:
+            worker.stop()
+        self._workers = []
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *_exc):
+        self.close()
+
+    def recognizer(self, sample_rate):
+        """A recognizer on the live worker with the fewest open streams."""
+        with self._lock:
+            workers = [w for w in self._workers if w.alive]
+            if not workers:
+                raise RuntimeError("No STT workers are running")
+            worker = min(workers, key=lambda w: (w.streams, w.utilization()))
+            stream_id = next(self._ids)
+        return RemoteRecognizer(worker, stream_id, sample_rate)
+
+    def stats(self):
+        return [
+            {
+                "worker": w.index,
+                "pid": w.process.pid,
+                "alive": w.alive,
+                "streams": w.streams,
+                "requests": w.requests,
+                "busy_seconds": w.busy_seconds,
+                "utilization": w.utilization(),
+            }
+            for w in self._workers
+        ]
+
+    def render_prometheus(self):
+        stats = self.stats()
+        lines = [
+            "# HELP hr_agent_stt_worker_utilization Share of time each STT worker spent decoding.",
+            "# TYPE hr_agent_stt_worker_utilization gauge",
+        ]
+        lines += [f'hr_agent_stt_worker_utilization{{worker="{s["worker"]}"}} {s["utilization"]}' for s in stats]
+        lines += [
+            "# HELP hr_agent_stt_worker_streams Audio streams currently assigned to each STT worker.",
+            "# TYPE hr_agent_stt_worker_streams gauge",
+        ]
+        lines += [f'hr_agent_stt_worker_streams{{worker="{s["worker"]}"}} {s["streams"]}' for s in stats]
+        return "\n".join(lines) + "\n"
+
+
+def _decode(make_recognizer, pcm, block_bytes=4000):
+    recognizer = make_recognizer(16000)
+    for offset in range(0, len(pcm), block_bytes):
+        recognizer.AcceptWaveform(pcm[offset:offset + block_bytes])
+    recognizer.FinalResult()
+
+
+def measure_throughput(pcm, streams, pool=None):
+    """Decodes pcm on `streams` concurrent threads; returns seconds of audio per second."""
+    if pool is not None:
+        make_recognizer = pool.recognizer
+    else:
+        import vosk
+
+        model = load_vosk_model()
+        def make_recognizer(rate):
+            return vosk.KaldiRecognizer(model, rate)
+    threads = [threading.Thread(target=_decode, args=(make_recognizer, pcm)) for _ in range(streams)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    audio_seconds = streams * len(pcm) / 2 / 16000
+    return audio_seconds / (time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    from audio_source import read_wav_pcm
+
+    parser = argparse.ArgumentParser(description="Measure STT throughput per worker pool size.")
+    parser.add_argument("wav", help="speech sample decoded by every stream")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--streams", type=int, default=8, help="concurrent streams per measurement")
+    args = parser.parse_args()
+
+    pcm = read_wav_pcm(args.wav)
+    print(f"in-process threads: {measure_throughput(pcm, args.streams):.1f}x real time")
+    for size in args.workers:
+        with STTWorkerPool(size) as pool:
+            throughput = measure_throughput(pcm, args.streams, pool)
+            utilization = ", ".join(f"{s['utilization']:.0%}" for s in pool.stats())
+        print(f"{size} workers: {throughput:.1f}x real time (utilization {utilization})")
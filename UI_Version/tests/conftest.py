@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The modules live next to each other in UI_Version and import each other by name
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
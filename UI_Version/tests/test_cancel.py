@@ -0,0 +1,75 @@
+"""End Call / disconnect stop a session's transcription at once, whenever they arrive."""
+import contextvars
+import sys
+import threading
+import time
+import types
+
+import pytest
+
+from global_control import set_current_session
+from session_manager import InterviewSession
+
+
+class SilentRecognizer:
+    def __init__(self, _model, _sample_rate):
+        pass
+
+    def AcceptWaveform(self, _data):
+        return False
+
+    def PartialResult(self):
+        return '{"partial": ""}'
+
+    def FinalResult(self):
+        return '{"text": ""}'
+
+
+@pytest.fixture
+def utils(monkeypatch):
+    monkeypatch.setitem(sys.modules, "vosk", types.SimpleNamespace(KaldiRecognizer=SilentRecognizer))
+    import utils
+
+    monkeypatch.setattr(utils, "stt_pool", None)
+    monkeypatch.setattr(utils, "get_vosk_model", lambda: None)
+    return utils
+
+
+def transcribe_in_session(utils, session):
+    """Starts session's transcription in a thread; returns the thread and its result list."""
+    result = []
+
+    def run():
+        set_current_session(session)
+        result.append(utils.transcribe_audio_input(source=session.audio))
+
+    thread = threading.Thread(target=run, daemon=True)
+    contextvars.copy_context().run(thread.start)
+    return thread, result
+
+
+def test_cancel_while_listening_stops_the_turn(utils, tmp_path):
+    session = InterviewSession("sid", str(tmp_path))
+    thread, result = transcribe_in_session(utils, session)
+    time.sleep(0.3)
+    assert thread.is_alive()
+
+    start = time.perf_counter()
+    session.cancel()
+    thread.join(2)
+
+    assert not thread.is_alive()
+    assert time.perf_counter() - start < 0.5
+    assert result == [""]
+
+
+def test_cancel_between_turns_is_not_drained(utils, tmp_path):
+    session = InterviewSession("sid", str(tmp_path))
+    # Cancelled while the bot was speaking: the turn-start drain would drop the "enter"
+    session.cancel()
+    thread, result = transcribe_in_session(utils, session)
+    thread.join(2)
+
+    assert not thread.is_alive()
+    assert result == [""]
+    assert not session.audio.listening
@@ -0,0 +1,20 @@
+import threading
+
+from session_manager import SessionManager
+
+
+def test_loop_starts_with_the_first_interview(tmp_path):
+    manager = SessionManager(max_sessions=1, output_root=str(tmp_path))
+    # Nothing runs yet, so the server can still fork its STT workers safely
+    assert manager.loop is None
+    ran = threading.Event()
+
+    async def interview(_session):
+        ran.set()
+
+    session = manager.start("sid", interview)
+
+    assert ran.wait(5)
+    assert manager.loop.is_running()
+    session.future.result(5)
+    assert session.state == "finished"
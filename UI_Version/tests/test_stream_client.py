@@ -0,0 +1,155 @@
+"""stream_client.py against app.py: a whole interview over Socket.IO with browser audio.
+
+Speech recognition, speech synthesis and the LLM chains are replaced by
+fakes; everything between them (the Socket.IO handlers, the session's audio
+ring buffer, transcription, the interview engine, playback in the browser,
+wrap-up) is the real code.
+"""
+import json
+import os
+import sys
+import threading
+import types
+import wave
+
+import numpy as np
+import pytest
+
+pytest.importorskip("flask_socketio")
+pytest.importorskip("socketio")
+
+ANSWER_TEXT = "my name is sam and i studied physics"
+
+
+class FakeRecognizer:
+    """Stands in for vosk.KaldiRecognizer: hears ANSWER_TEXT once it has been sent any sound.
+
+    The source pads stalls with silence, which it must not mistake for speech.
+    """
+
+    def __init__(self, _model, _sample_rate):
+        self.received = 0
+
+    def AcceptWaveform(self, data):
+        self.received += int(np.count_nonzero(np.frombuffer(data, dtype=np.int16)))
+        return False
+
+    def PartialResult(self):
+        return json.dumps({"partial": ANSWER_TEXT.split()[0] if self.received else ""})
+
+    def FinalResult(self):
+        return json.dumps({"text": ANSWER_TEXT if self.received else ""})
+
+
+class FakeChain:
+    def __init__(self, text):
+        self.text = text
+        self.calls = []
+
+    def invoke(self, inputs):
+        self.calls.append(inputs)
+        return {**inputs, "text": self.text}
+
+
+class SilentBackend:
+    name = "silent"
+
+    def available(self):
+        return True
+
+    def synthesize(self, text):
+        from tts_cache import CachedAudio
+
+        return CachedAudio(b"\0\0" * 160, 16000, 2, 1)
+
+
+@pytest.fixture
+def answer_wav(tmp_path):
+    """Half a second of a 16 kHz mono tone, loud enough not to count as silence."""
+    path = tmp_path / "answer.wav"
+    t = np.arange(8000) / 16000
+    samples = (0.3 * 32767 * np.sin(2 * np.pi * 220 * t)).astype("<i2")
+    with wave.open(str(path), "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(16000)
+        wav.writeframes(samples.tobytes())
+    return str(path)
+
+
+@pytest.fixture
+def server(tmp_path, monkeypatch):
+    monkeypatch.setenv("SESSION_OUTPUT_DIR", str(tmp_path / "sessions"))
+    monkeypatch.setenv("LLM_CACHE_ENABLED", "0")
+    monkeypatch.setenv("TTS_CACHE_DIR", str(tmp_path / "tts_cache"))
+    monkeypatch.setenv("FAQ_DIR", str(tmp_path / "faq"))
+    monkeypatch.setenv("FAQ_INDEX_PATH", str(tmp_path / "faq_index"))
+    monkeypatch.setenv("AUDIO_INPUT", "browser")
+    monkeypatch.setenv("AUDIO_OUTPUT", "browser")
+    monkeypatch.setitem(sys.modules, "vosk", types.SimpleNamespace(KaldiRecognizer=FakeRecognizer))
+    from werkzeug.serving import make_server
+
+    import app
+    import main
+    import utils
+    from session_store import SessionStore
+    from tts_backends import TTSEngine
+    from tts_cache import TTSCache
+
+    monkeypatch.setattr(utils, "get_vosk_model", lambda: None)
+    monkeypatch.setattr(utils, "tts_engine", TTSEngine([SilentBackend()]))
+    monkeypatch.setattr(utils, "tts_cache", TTSCache(cache_dir=None))
+    monkeypatch.setattr(main, "tts_cache", utils.tts_cache)
+    monkeypatch.setattr(main, "session_store", SessionStore(str(tmp_path / "interviews.sqlite3")))
+    monkeypatch.setattr(app.session_manager, "output_root", str(tmp_path / "sessions"))
+    chains = {
+        "validation_chain": FakeChain("yes"),
+        "no_question_chain": FakeChain("no_question"),
+        "qa_chain": FakeChain("It is in the FAQ."),
+        "summary_chain": FakeChain("The candidate answered every question."),
+        "json_chain": FakeChain(json.dumps({"Name": "Sam", "Background": "Physics"})),
+    }
+    for name, chain in chains.items():
+        monkeypatch.setattr(main, name, chain)
+
+    http = make_server("127.0.0.1", 0, app.app, threaded=True)
+    thread = threading.Thread(target=http.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield types.SimpleNamespace(url=f"http://127.0.0.1:{http.server_port}", chains=chains, main=main)
+    finally:
+        http.shutdown()
+        main.session_store.close()
+
+
+def test_interview_over_socketio(server, answer_wav, tmp_path):
+    from stream_client import InterviewClient
+
+    questions = server.main.interview_questions
+    client = InterviewClient(server.url, [answer_wav] * len(questions), speed=4.0)
+    transcripts, finished, subtitles, bot_audio = [], [], [], []
+    client.sio.on("user_transcript", lambda data: transcripts.append(data))
+    client.sio.on("bot_speaking", lambda data: subtitles.append(data["text"]))
+    client.sio.on("bot_audio", lambda data: bot_audio.append(data))
+    client.sio.on("interview_finished", lambda data: (finished.append(data), client.done.set()))
+
+    assert client.run(timeout=60), "interview did not finish"
+
+    assert finished == [{"text": "The interview is complete. Thank you!"}]
+    final = [event["text"] for event in transcripts if event["final"] and event["text"]]
+    assert final == [ANSWER_TEXT] * len(questions)
+    assert client.sent_chunks > 0
+    # The bot's voice reached the page with every line it spoke
+    assert len(bot_audio) == len(subtitles)
+    assert all(data["pcm"] == b"\0\0" * 160 and data["sample_rate"] == 16000 for data in bot_audio)
+    # Every answer reached validation, and the silent last turn ended the Q&A unanswered
+    assert [call["answer"] for call in server.chains["validation_chain"].calls] == [ANSWER_TEXT] * len(questions)
+    assert server.chains["qa_chain"].calls == []
+
+    sessions = tmp_path / "sessions"
+    [output_dir] = [entry for entry in sessions.iterdir() if entry.is_dir()]
+    with open(output_dir / "interview_responses.json", encoding="utf-8") as f:
+        assert json.load(f)["Name"] == "Sam"
+    with open(output_dir / "interview_summary.txt", encoding="utf-8") as f:
+        assert f.read() == "The candidate answered every question."
+    assert os.path.exists(output_dir / "interview_session.csv")
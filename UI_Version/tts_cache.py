@@ -0,0 +1,182 @@
+import hashlib
+import json
+import os
+import struct
+import threading
+import time
+from collections import OrderedDict
+
+# On-disk entry: magic, frame rate, sample width, channels, synthesis seconds, then raw PCM
+_HEADER = struct.Struct("<4sIHHd")
+_MAGIC = b"PCM1"
+
+
+class CachedAudio:
+    """Decoded PCM for one utterance plus how long it took to synthesize."""
+
+    __slots__ = ("pcm", "frame_rate", "sample_width", "channels", "synth_seconds")
+
+    def __init__(self, pcm, frame_rate, sample_width, channels, synth_seconds=0.0):
+        self.pcm = pcm
+        self.frame_rate = frame_rate
+        self.sample_width = sample_width
+        self.channels = channels
+        self.synth_seconds = synth_seconds
+
+
+class TTSCache:
+    """Two-tier (memory LRU + size-capped disk) cache of synthesized speech.
+
+    Entries are content-addressed by (text, lang, tld, backend), so a changed
+    prompt or voice never plays stale audio.
+    """
+
+    def __init__(self, cache_dir=None, max_memory_items=64, max_disk_bytes=200 * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.max_memory_items = max_memory_items
+        self.max_disk_bytes = max_disk_bytes
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "synthesis_seconds": 0.0,
+            "synthesis_seconds_saved": 0.0,
+        }
+        self._disk_bytes = 0
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+            self._disk_bytes = sum(size for _path, size, _mtime in self._disk_entries())
+
+    @staticmethod
+    def make_key(text, lang, tld, backend):
+        payload = json.dumps([text, lang, tld, backend], ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key):
+        """Returns the cached audio for key, or None on a miss."""
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+                self._stats["memory_hits"] += 1
+                self._stats["synthesis_seconds_saved"] += entry.synth_seconds
+                return entry
+
+        entry = self._read_disk(key)
+        with self._lock:
+            if entry is None:
+                self._stats["misses"] += 1
+                return None
+            self._stats["disk_hits"] += 1
+            self._stats["synthesis_seconds_saved"] += entry.synth_seconds
+            self._remember(key, entry)
+            return entry
+
+    def put(self, key, entry):
+        with self._lock:
+            self._stats["synthesis_seconds"] += entry.synth_seconds
+            self._remember(key, entry)
+        self._write_disk(key, entry)
+
+    def get_or_synthesize(self, key, synthesize):
+        """Returns cached audio, calling synthesize() -> CachedAudio on a miss."""
+        entry = self.get(key)
+        if entry is None:
+            start = time.perf_counter()
+            entry = synthesize()
+            entry.synth_seconds = time.perf_counter() - start
+            self.put(key, entry)
+        return entry
+
+    def stats(self, since=None):
+        """Returns hit/miss counters, optionally relative to an earlier snapshot."""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["memory_items"] = len(self._memory)
+            stats["disk_bytes"] = self._disk_bytes
+        if since:
+            for name in ("memory_hits", "disk_hits", "misses",
+                         "synthesis_seconds", "synthesis_seconds_saved"):
+                stats[name] -= since.get(name, 0)
+        lookups = stats["memory_hits"] + stats["disk_hits"] + stats["misses"]
+        stats["hit_rate"] = (stats["memory_hits"] + stats["disk_hits"]) / lookups if lookups else 0.0
+        return stats
+
+    def _remember(self, key, entry):
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_items:
+            self._memory.popitem(last=False)
+
+    # Disk tier
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.pcm")
+
+    def _disk_entries(self):
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(".pcm"):
+                continue
+            path = os.path.join(self.cache_dir, name)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            yield path, st.st_size, st.st_mtime
+
+    def _read_disk(self, key):
+        if not self.cache_dir:
+            return None
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                header = f.read(_HEADER.size)
+                pcm = f.read()
+            os.utime(path)  # mark as recently used for eviction
+        except OSError:
+            return None
+        if len(header) != _HEADER.size:
+            return None
+        magic, frame_rate, sample_width, channels, synth_seconds = _HEADER.unpack(header)
+        if magic != _MAGIC:
+            return None
+        return CachedAudio(pcm, frame_rate, sample_width, channels, synth_seconds)
+
+    def _write_disk(self, key, entry):
+        if not self.cache_dir:
+            return
+        size = _HEADER.size + len(entry.pcm)
+        if size > self.max_disk_bytes:
+            return
+        path = self._path(key)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        try:
+            existed = os.path.exists(path)
+            with open(tmp_path, "wb") as f:
+                f.write(_HEADER.pack(_MAGIC, entry.frame_rate, entry.sample_width,
+                                     entry.channels, entry.synth_seconds))
+                f.write(entry.pcm)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"TTS cache write failed: {e}")
+            return
+        with self._lock:
+            if not existed:
+                self._disk_bytes += size
+            if self._disk_bytes > self.max_disk_bytes:
+                self._evict_disk()
+
+    def _evict_disk(self):
+        """Removes least recently used files until the disk tier fits its cap."""
+        entries = sorted(self._disk_entries(), key=lambda e: e[2])
+        total = sum(size for _path, size, _mtime in entries)
+        for path, size, _mtime in entries:
+            if total <= self.max_disk_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+        self._disk_bytes = total